@@ -0,0 +1,149 @@
+"""
+Modo batch: evalúa varias iteraciones de uno o más proyectos sin ninguna interacción.
+
+Solo usa la configuración de variables de entorno (src.config.settings), así que no
+carga las librerías de prompts ni pregunta nada; pensado para ejecuciones programadas.
+
+Cada objetivo tiene la forma 'organizacion/proyecto/ruta-de-iteración' o, para evaluar
+todas las iteraciones en curso del proyecto, 'organizacion/proyecto'. Ejemplos:
+
+    python batch.py "MiOrg/MiProyecto/\\MiProyecto\\Iteration\\Sprint 14"
+    python batch.py MiOrg/ProyectoA MiOrg/ProyectoB --paralelo 4
+    python batch.py --archivo objetivos.txt --salida reportes
+"""
+import argparse
+import hashlib
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from src.config import settings
+from src.azure.api import obtener_iteraciones_actuales
+from src.evaluation.cache import CacheEvaluaciones
+from src.evaluation.historial import HistorialEvaluaciones
+from src.pipeline import EvaluacionIteracion
+
+def _leer_objetivos(args):
+    objetivos = list(args.objetivos)
+    if args.archivo:
+        with open(args.archivo, "r", encoding="utf-8") as f:
+            objetivos += [linea.strip() for linea in f if linea.strip() and not linea.startswith("#")]
+    return objetivos
+
+def _expandir_objetivos(objetivos, pat):
+    """
+    Convierte los objetivos en tuplas (org, proyecto, iteración), resolviendo las iteraciones en curso.
+
+    Devuelve (expandidos, fallidos); `fallidos` son los objetivos cuyas iteraciones no se
+    pudieron consultar, como resúmenes {"objetivo", "error"}, para no detener el resto del lote.
+    """
+    expandidos, fallidos = [], []
+    for objetivo in objetivos:
+        partes = objetivo.split("/", 2)
+        if len(partes) < 2:
+            raise ValueError(f"Objetivo no válido '{objetivo}': se espera 'organizacion/proyecto[/iteración]'.")
+        org, project = partes[0], partes[1]
+        if len(partes) == 3 and partes[2]:
+            expandidos.append((org, project, partes[2]))
+            continue
+
+        try:
+            actuales = obtener_iteraciones_actuales(project, org, pat)
+        except requests.RequestException as e:
+            fallidos.append({"objetivo": f"{org}/{project}", "error": f"no se pudieron leer sus iteraciones ({e})"})
+            continue
+        if not actuales:
+            print(f"⚠️ {org}/{project}: no hay iteraciones en curso.")
+        expandidos += [(org, project, iteration_path) for iteration_path in actuales]
+    return expandidos, fallidos
+
+def _ruta_reporte(directorio, org, project, iteration_path):
+    """Nombre de archivo legible y único por objetivo."""
+    sprint = iteration_path.split("\\")[-1]
+    nombre = re.sub(r"[^\w.-]+", "_", f"{org}_{project}_{sprint}").strip("_")
+    sufijo = hashlib.sha1(f"{org}|{project}|{iteration_path}".encode("utf-8")).hexdigest()[:8]
+    return f"{directorio}/{nombre}_{sufijo}.json"
+
+def evaluar_objetivo(org, project, iteration_path, pat, cache, historial, directorio):
+    """Ejecuta el pipeline obtener → evaluar → estimar → escribir para una iteración."""
+    inicio = time.perf_counter()
+    evaluacion = EvaluacionIteracion(org, project, iteration_path, pat)
+    if not evaluacion.obtener():
+        return {"objetivo": f"{org}/{project}/{iteration_path}", "historias": 0, "evaluadas": 0, "reporte": None}
+
+    resultados = evaluacion.evaluar(cache)
+    if not resultados:
+        raise RuntimeError("no se obtuvieron evaluaciones de Gemini")
+    evaluacion.estimar()
+    ruta = _ruta_reporte(directorio, org, project, iteration_path)
+    evaluacion.escribir(ruta, historial)
+
+    return {
+        "objetivo": f"{org}/{project}/{iteration_path}",
+        "historias": len(evaluacion.historias),
+        "evaluadas": len(resultados),
+        "reporte": ruta,
+        "bytes_ahorrados": evaluacion.metadata["compactacion"]["bytes_ahorrados"],
+        "segundos": round(time.perf_counter() - inicio, 1),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evalúa historias de varias iteraciones sin interacción.")
+    parser.add_argument("objetivos", nargs="*", help="organizacion/proyecto[/iteración]")
+    parser.add_argument("--archivo", help="Archivo con un objetivo por línea")
+    parser.add_argument("--salida", default="reportes", help="Directorio donde escribir los reportes")
+    parser.add_argument("--paralelo", type=int, default=2, help="Número de iteraciones procesadas a la vez")
+    args = parser.parse_args(argv)
+
+    if not settings.pat:
+        print("❌ Falta AZURE_PAT en el entorno o en el archivo .env.")
+        return 2
+    objetivos = _leer_objetivos(args)
+    if not objetivos and settings.org and settings.project:
+        # Sin argumentos se usa el destino configurado en el entorno.
+        objetivos = [f"{settings.org}/{settings.project}/{settings.iteration_path or ''}"]
+    if not objetivos:
+        parser.error("indica al menos un objetivo, un --archivo, o AZURE_ORG y AZURE_PROJECT en el entorno")
+
+    try:
+        expandidos, no_resueltos = _expandir_objetivos(objetivos, settings.pat)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 2
+    fallidos = len(no_resueltos)
+    for resumen in no_resueltos:
+        print(f"❌ {resumen['objetivo']}: {resumen['error']}")
+
+    print(f"🔄 Evaluando {len(expandidos)} iteraciones ({args.paralelo} en paralelo)...")
+    cache = CacheEvaluaciones(settings.cache_ruta, settings.cache_max_entradas, settings.cache_max_dias)
+    historial = HistorialEvaluaciones(settings.historial_ruta)
+
+    def procesar(objetivo):
+        try:
+            return evaluar_objetivo(*objetivo, settings.pat, cache, historial, args.salida)
+        except Exception as e:
+            # Un objetivo fallido no debe detener el resto del lote.
+            return {"objetivo": "/".join(objetivo), "error": str(e)}
+
+    with ThreadPoolExecutor(max_workers=max(1, args.paralelo)) as executor:
+        for resumen in executor.map(procesar, expandidos):
+            if "error" in resumen:
+                fallidos += 1
+                print(f"❌ {resumen['objetivo']}: {resumen['error']}")
+            elif resumen["reporte"]:
+                print(f"✅ {resumen['objetivo']}: {resumen['evaluadas']}/{resumen['historias']} historias "
+                      f"en {resumen['segundos']} s ({resumen['bytes_ahorrados']} bytes ahorrados) → {resumen['reporte']}")
+            else:
+                print(f"➖ {resumen['objetivo']}: sin historias evaluadas.")
+
+    estadisticas = cache.estadisticas()
+    cache.cerrar()
+    historial.cerrar()
+    print(f"🗃️ Caché: {estadisticas['aciertos']} aciertos, {estadisticas['fallos']} evaluaciones nuevas.")
+    return 1 if fallidos else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
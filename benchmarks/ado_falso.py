@@ -0,0 +1,203 @@
+"""
+Servidor local que imita los endpoints de Azure DevOps que usa la herramienta:
+WIQL (de work items y de enlaces), workitemsbatch y los nodos de clasificación de iteraciones.
+
+Genera historias sintéticas con HTML parecido al real y permite añadir latencia
+y responder 429 con una probabilidad dada, para medir el cliente sin red.
+
+Ejemplo (y luego AZURE_DEVOPS_URL=http://127.0.0.1:8081):
+    python benchmarks/ado_falso.py --historias 1000 --latencia 50 --tasa-429 0.05 --puerto 8081
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+PROYECTO = "Proyecto"
+ITERACION = f"\\{PROYECTO}\\Iteration\\Sprint 1"
+# System.ChangedDate de las historias que no aparecen en `cambios` (ver iniciar_servidor).
+FECHA_CAMBIO = "2024-01-01T00:00:00Z"
+
+def _descripcion(wid):
+    entidad = random.Random(wid).choice(["clientes", "facturas", "pedidos", "productos", "usuarios"])
+    filas = "".join(f"<tr><td>campo_{i}</td><td>texto</td></tr>" for i in range(12))
+    return (
+        f"<div><b>Como</b> analista <b>quiero</b> consultar {entidad} (HU {wid}) "
+        f"<b>para</b> revisar su estado.</div><div><br></div>"
+        f"<div>Ver <a href=\"https://example.com/docs/{wid}\">documentación</a>.</div>"
+        f"<img src=\"data:image/png;base64,{'A' * 400}\">"
+        f"<table>{filas}</table>"
+    )
+
+def _work_item(wid, cambio=FECHA_CAMBIO):
+    return {
+        "id": wid,
+        "fields": {
+            "System.Id": wid,
+            "System.Title": f"FUNC - {wid:05d} - Consultar registros",
+            "System.Description": _descripcion(wid),
+            "Microsoft.VSTS.Common.AcceptanceCriteria":
+                "<ul>" + "".join(f"<li>Dado el caso {i}, cuando consulto, entonces veo resultados.</li>" for i in range(4)) + "</ul>",
+            "System.ChangedDate": cambio,
+        },
+    }
+
+def _enlaces(historias):
+    """
+    Relaciones sintéticas, vistas desde cada historia como las devuelve una consulta de enlaces:
+    cada quinta historia depende de la anterior, cada diez comparten una feature padre y
+    las tres primeras forman un ciclo de dependencias.
+    """
+    enlaces = []
+    for wid in range(1, historias + 1):
+        if wid % 5 == 0:
+            enlaces.append((wid, wid - 1, "System.LinkTypes.Dependency-Reverse"))
+            enlaces.append((wid - 1, wid, "System.LinkTypes.Dependency-Forward"))
+        enlaces.append((wid, 100000 + wid // 10, "System.LinkTypes.Hierarchy-Reverse"))
+    if historias >= 3:
+        enlaces += [(1, 2, "System.LinkTypes.Dependency-Forward"), (2, 3, "System.LinkTypes.Dependency-Forward"),
+                    (3, 1, "System.LinkTypes.Dependency-Forward")]
+    return [{"rel": rel, "source": {"id": origen}, "target": {"id": destino}} for origen, destino, rel in enlaces]
+
+class ManejadorADO(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    # Se configuran en iniciar_servidor().
+    historias = 100
+    latencia = 0.0
+    tasa_429 = 0.0
+    retry_after = 0
+    desordenar = False
+    contadores = None
+    cambios = None
+
+    def _contar(self, clave):
+        with self.server.lock:
+            self.contadores[clave] = self.contadores.get(clave, 0) + 1
+
+    def _responder(self, datos, estado=200, cabeceras=None):
+        cuerpo = json.dumps(datos).encode("utf-8") if datos is not None else b""
+        self.send_response(estado)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        for nombre, valor in (cabeceras or {}).items():
+            self.send_header(nombre, valor)
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def _limitar(self):
+        """Simula latencia y, con probabilidad `tasa_429`, una respuesta de limitación."""
+        if self.latencia:
+            time.sleep(self.latencia)
+        if self.tasa_429 and random.random() < self.tasa_429:
+            self._contar("429")
+            self._responder({"message": "TF400733: limitado"}, 429, {
+                "Retry-After": str(self.retry_after),
+                "X-RateLimit-Resource": "ATCPU",
+                "X-RateLimit-Remaining": "0",
+                "X-RateLimit-Reset": str(int(time.time()) + self.retry_after),
+            })
+            return True
+        return False
+
+    def _leer_json(self):
+        largo = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(largo) or b"{}")
+
+    def do_GET(self):
+        ruta = urlparse(self.path).path
+        if self._limitar():
+            return
+        if ruta.endswith("/_apis/wit/classificationnodes/Iterations") and f"/{PROYECTO}/" not in ruta:
+            self._responder({"message": "TF200016: el proyecto no existe"}, 404)
+        elif ruta.endswith("/_apis/wit/classificationnodes/Iterations"):
+            self._contar("iteraciones")
+            self._responder({
+                "structureType": "iteration", "hasChildren": True, "path": f"\\{PROYECTO}\\Iteration",
+                "children": [{
+                    "structureType": "iteration", "hasChildren": False, "path": ITERACION,
+                    "attributes": {"startDate": "2024-01-01T00:00:00Z", "finishDate": "2099-01-01T00:00:00Z"},
+                }],
+            })
+        elif ruta.endswith("/_apis/projects"):
+            self._responder({"value": [{"name": PROYECTO}]})
+        else:
+            self._responder({"message": "no encontrado"}, 404)
+
+    def do_POST(self):
+        ruta = urlparse(self.path).path
+        cuerpo = self._leer_json()
+        if self._limitar():
+            return
+        if ruta.endswith("/_apis/wit/wiql") and "FROM WorkItemLinks" in cuerpo.get("query", ""):
+            self._contar("enlaces")
+            self._responder({"workItemRelations": _enlaces(self.historias)})
+        elif ruta.endswith("/_apis/wit/wiql"):
+            self._contar("wiql")
+            ids = range(1, self.historias + 1)
+            # Consultas incrementales: las historias cambiadas desde la fecha indicada (inclusive),
+            # sin las de esa misma fecha que aparezcan en un 'NOT IN' (ver src/azure/sync.py).
+            query = cuerpo.get("query", "")
+            desde = re.search(r"ChangedDate\]\s*>=?\s*'([^']+)'", query)
+            if desde:
+                excluidas = re.search(r"\[System\.Id\] NOT IN \(([^)]*)\)", query)
+                excluidas = {int(wid) for wid in excluidas.group(1).split(",")} if excluidas else set()
+                fecha = desde.group(1)
+                ids = [wid for wid in ids if self.cambios.get(wid, FECHA_CAMBIO) > fecha
+                       or (self.cambios.get(wid, FECHA_CAMBIO) == fecha and wid not in excluidas)]
+            self._responder({"workItems": [{"id": wid} for wid in ids]})
+        elif ruta.endswith("/_apis/wit/workitemsbatch"):
+            self._contar("workitemsbatch")
+            ids = [wid for wid in cuerpo.get("ids", []) if 1 <= wid <= self.historias]
+            if len(cuerpo.get("ids", [])) > 200:
+                self._responder({"message": "máximo 200 ids"}, 400)
+                return
+            # El endpoint real no garantiza el orden; con `desordenar` se comprueba que el cliente lo restaure.
+            if self.desordenar:
+                random.shuffle(ids)
+            self._responder({"count": len(ids), "value": [_work_item(wid, self.cambios.get(wid, FECHA_CAMBIO)) for wid in ids]})
+        else:
+            self._responder({"message": "no encontrado"}, 404)
+
+    def log_message(self, format, *args):
+        return
+
+def iniciar_servidor(historias=100, latencia_ms=0, tasa_429=0.0, retry_after=0, puerto=0, desordenar=False):
+    """
+    Arranca el servidor en un hilo y lo devuelve; su URL base es http://127.0.0.1:<server_port>.
+
+    `servidor.contadores` cuenta las peticiones por endpoint y `servidor.cambios` ({id: fecha ISO})
+    permite simular ediciones: cambia el System.ChangedDate que devuelven la WIQL y workitemsbatch.
+    """
+    atributos = {
+        "historias": historias, "latencia": latencia_ms / 1000, "tasa_429": tasa_429,
+        "retry_after": retry_after, "desordenar": desordenar, "contadores": {}, "cambios": {},
+    }
+    manejador = type("ManejadorADOConfigurado", (ManejadorADO,), atributos)
+    servidor = ThreadingHTTPServer(("127.0.0.1", puerto), manejador)
+    servidor.lock = threading.Lock()
+    servidor.contadores = atributos["contadores"]
+    servidor.cambios = atributos["cambios"]
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Azure DevOps falso para benchmarks.")
+    parser.add_argument("--historias", type=int, default=100)
+    parser.add_argument("--latencia", type=float, default=0, help="Latencia por petición, en ms")
+    parser.add_argument("--tasa-429", type=float, default=0.0, help="Probabilidad de responder 429")
+    parser.add_argument("--retry-after", type=int, default=0, help="Segundos indicados en Retry-After")
+    parser.add_argument("--puerto", type=int, default=8081)
+    args = parser.parse_args()
+
+    servidor = iniciar_servidor(args.historias, args.latencia, args.tasa_429, args.retry_after, args.puerto)
+    print(f"Azure DevOps falso en http://127.0.0.1:{servidor.server_port} (iteración {ITERACION!r})")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        servidor.shutdown()
@@ -0,0 +1,82 @@
+"""
+Benchmark de tiempo de arranque basado en `python -X importtime`.
+
+Importa cada módulo de entrada en un intérprete nuevo y reporta el tiempo total
+de importación, el tiempo de pared del proceso y las dependencias más lentas.
+Como la configuración es perezosa, importar estos módulos no debe hacer llamadas
+de red ni mostrar preguntas.
+
+Ejemplos:
+    python benchmarks/arranque.py
+    python benchmarks/arranque.py --repeticiones 5 --top 15 main batch
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULOS = ["main", "batch", "src.config.config", "src.azure.api", "src.evaluation.cache", "src.web.server"]
+
+def _medir(modulo):
+    """Importa `modulo` en un proceso nuevo y devuelve (segundos de pared, líneas de importtime)."""
+    inicio = time.perf_counter()
+    proceso = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        cwd=RAIZ, capture_output=True, text=True,
+        # Sin PAT ni organización: si algo intentara resolver la configuración, fallaría aquí.
+        env={**os.environ, "AZURE_PAT": "", "AZURE_ORG": ""},
+    )
+    pared = time.perf_counter() - inicio
+    if proceso.returncode != 0:
+        ultima = proceso.stderr.strip().splitlines()[-1] if proceso.stderr.strip() else "error desconocido"
+        raise RuntimeError(ultima)
+
+    importaciones = []
+    for linea in proceso.stderr.splitlines():
+        # Formato: "import time:  self [us] | cumulative | imported package"
+        if not linea.startswith("import time:") or "cumulative" in linea:
+            continue
+        propio, acumulado, nombre = linea[len("import time:"):].split("|", 2)
+        importaciones.append((nombre.rstrip(), int(propio), int(acumulado)))
+    return pared, importaciones
+
+def medir_modulo(modulo, repeticiones, top):
+    mejores = None
+    paredes = []
+    for _ in range(repeticiones):
+        pared, importaciones = _medir(modulo)
+        paredes.append(pared)
+        if mejores is None or sum(i[1] for i in importaciones) < sum(i[1] for i in mejores):
+            mejores = importaciones
+
+    # La entrada de nivel superior (sin sangría) del propio módulo tiene el acumulado total.
+    total_us = next((acumulado for nombre, _, acumulado in mejores if nombre.strip() == modulo), 0)
+    lentas = sorted(
+        ((nombre.strip(), acumulado) for nombre, _, acumulado in mejores if nombre.strip() != modulo),
+        key=lambda x: x[1], reverse=True,
+    )[:top]
+    return {
+        "modulo": modulo,
+        "importacion_ms": round(total_us / 1000, 1),
+        "proceso_ms_min": round(min(paredes) * 1000, 1),
+        "mas_lentas_ms": {nombre: round(us / 1000, 1) for nombre, us in lentas},
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mide el tiempo de arranque de los módulos de entrada.")
+    parser.add_argument("modulos", nargs="*", default=MODULOS, help="Módulos a importar")
+    parser.add_argument("--repeticiones", type=int, default=3, help="Repeticiones por módulo (se reporta la mejor)")
+    parser.add_argument("--top", type=int, default=10, help="Número de dependencias lentas a mostrar")
+    args = parser.parse_args()
+
+    resultados = []
+    for modulo in args.modulos:
+        try:
+            resultados.append(medir_modulo(modulo, args.repeticiones, args.top))
+        except RuntimeError as e:
+            resultados.append({"modulo": modulo, "error": str(e)})
+    print(json.dumps(resultados, indent=2, ensure_ascii=False))
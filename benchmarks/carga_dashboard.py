@@ -0,0 +1,115 @@
+"""
+Prueba de carga del endpoint /data del dashboard.
+
+Lanza varios clientes concurrentes contra el servidor durante un tiempo fijo y
+reporta peticiones por segundo y latencias. Para comparar antes/después, se
+puede ejecutar contra un servidor ya levantado con --url (por ejemplo, el de
+otra versión del repositorio), o dejar que el script levante el servidor actual.
+
+Ejemplos:
+    python benchmarks/carga_dashboard.py
+    python benchmarks/carga_dashboard.py --url http://localhost:8000/data --clientes 16
+    python benchmarks/carga_dashboard.py --gzip --etag
+"""
+import argparse
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def _levantar_servidor_local():
+    """Levanta el servidor del dashboard de este árbol en un puerto libre."""
+    from http.server import ThreadingHTTPServer
+    from src.web.server import DashboardRequestHandler
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), DashboardRequestHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{httpd.server_address[1]}/data"
+
+def _cliente(url, fin, usar_gzip, usar_etag, latencias, errores):
+    destino = urlparse(url)
+    ruta = destino.path + (f"?{destino.query}" if destino.query else "")
+    conexion = None
+    etag = None
+
+    while time.perf_counter() < fin:
+        if conexion is None:
+            conexion = http.client.HTTPConnection(destino.hostname, destino.port or 80, timeout=30)
+        cabeceras = {}
+        if usar_gzip:
+            cabeceras["Accept-Encoding"] = "gzip"
+        if usar_etag and etag:
+            cabeceras["If-None-Match"] = etag
+
+        inicio = time.perf_counter()
+        try:
+            conexion.request("GET", ruta, headers=cabeceras)
+            respuesta = conexion.getresponse()
+            respuesta.read()
+            if respuesta.status not in (200, 304):
+                errores.append(respuesta.status)
+            etag = respuesta.getheader("ETag") or etag
+            # Los servidores HTTP/1.0 cierran la conexión después de cada respuesta.
+            if respuesta.will_close:
+                conexion.close()
+                conexion = None
+        except (OSError, http.client.HTTPException) as e:
+            errores.append(str(e))
+            conexion.close()
+            conexion = None
+            continue
+        latencias.append(time.perf_counter() - inicio)
+
+    if conexion is not None:
+        conexion.close()
+
+def _percentil(valores, p):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p / 100))]
+
+def ejecutar(url, clientes, duracion, usar_gzip, usar_etag):
+    latencias = []
+    errores = []
+    fin = time.perf_counter() + duracion
+    hilos = [
+        threading.Thread(target=_cliente, args=(url, fin, usar_gzip, usar_etag, latencias, errores))
+        for _ in range(clientes)
+    ]
+    inicio = time.perf_counter()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    transcurrido = time.perf_counter() - inicio
+
+    return {
+        "url": url,
+        "clientes": clientes,
+        "duracion_s": round(transcurrido, 2),
+        "gzip": usar_gzip,
+        "etag": usar_etag,
+        "peticiones": len(latencias),
+        "errores": len(errores),
+        "peticiones_por_segundo": round(len(latencias) / transcurrido, 1),
+        "latencia_p50_ms": round(_percentil(latencias, 50) * 1000, 2),
+        "latencia_p95_ms": round(_percentil(latencias, 95) * 1000, 2),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prueba de carga del endpoint /data del dashboard.")
+    parser.add_argument("--url", help="URL de /data de un servidor ya levantado (por defecto se levanta el de este árbol)")
+    parser.add_argument("--clientes", type=int, default=8, help="Número de clientes concurrentes")
+    parser.add_argument("--duracion", type=float, default=5.0, help="Duración de la prueba en segundos")
+    parser.add_argument("--gzip", action="store_true", help="Enviar Accept-Encoding: gzip")
+    parser.add_argument("--etag", action="store_true", help="Revalidar con If-None-Match")
+    args = parser.parse_args()
+
+    url = args.url or _levantar_servidor_local()
+    print(json.dumps(ejecutar(url, args.clientes, args.duracion, args.gzip, args.etag), indent=2))
@@ -0,0 +1,92 @@
+"""
+Servidor local que imita el endpoint generateContent de la API REST de Gemini.
+
+Responde en modo JSON estructurado con la misma evaluación sintética que
+benchmarks/gemini_falso.py, con una demora configurable por petición. Para las
+historias de `ids_html` responde 200 con una página HTML, como un proxy intermedio.
+
+Ejemplo (y luego EVALUADOR=api GEMINI_API_URL=http://127.0.0.1:8082 GEMINI_API_KEY=x):
+    python benchmarks/gemini_api_falso.py --demora 0.2 --puerto 8082
+"""
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from gemini_falso import _evaluacion
+
+class ManejadorGemini(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    # Se configuran en iniciar_servidor().
+    demora = 0.0
+    ids_html = frozenset()
+    contadores = None
+
+    def setup(self):
+        super().setup()
+        # Se llama una vez por conexión: permite comprobar que el cliente reutiliza las suyas.
+        with self.server.lock:
+            self.contadores["conexiones"] = self.contadores.get("conexiones", 0) + 1
+
+    def _responder(self, estado, datos):
+        cuerpo = json.dumps(datos, ensure_ascii=False).encode("utf-8")
+        self.send_response(estado)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def do_POST(self):
+        cuerpo = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if not re.fullmatch(r"/v1beta/models/[^/:]+:generateContent", self.path.split("?")[0]):
+            self._responder(404, {"error": {"message": "no encontrado"}})
+            return
+        if not self.headers.get("x-goog-api-key"):
+            self._responder(401, {"error": {"message": "falta la API key"}})
+            return
+
+        with self.server.lock:
+            self.contadores["peticiones"] = self.contadores.get("peticiones", 0) + 1
+        time.sleep(self.demora)
+        prompt = "".join(p.get("text", "") for c in cuerpo.get("contents", []) for p in c.get("parts", []))
+        historias = re.findall(r"^Historia ID: (\d+)\nTítulo: (.*)$", prompt, re.MULTILINE)
+        if any(int(wid) in self.ids_html for wid, _ in historias):
+            cuerpo = b"<html><body>502 Bad Gateway</body></html>"
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+            return
+        texto = json.dumps([_evaluacion(int(wid), titulo) for wid, titulo in historias], ensure_ascii=False)
+        self._responder(200, {"candidates": [{"content": {"role": "model", "parts": [{"text": texto}]}}]})
+
+    def log_message(self, format, *args):
+        return
+
+def iniciar_servidor(demora=0.0, puerto=0, ids_html=()):
+    """Arranca el servidor en un hilo y lo devuelve; su URL base es http://127.0.0.1:<server_port>."""
+    manejador = type("ManejadorGeminiConfigurado", (ManejadorGemini,),
+                     {"demora": demora, "ids_html": frozenset(ids_html), "contadores": {}})
+    servidor = ThreadingHTTPServer(("127.0.0.1", puerto), manejador)
+    servidor.lock = threading.Lock()
+    servidor.contadores = manejador.contadores
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="API de Gemini falsa para benchmarks.")
+    parser.add_argument("--demora", type=float, default=0.0, help="Segundos de demora por petición")
+    parser.add_argument("--puerto", type=int, default=8082)
+    args = parser.parse_args()
+
+    servidor = iniciar_servidor(args.demora, args.puerto)
+    print(f"API de Gemini falsa en http://127.0.0.1:{servidor.server_port}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        servidor.shutdown()
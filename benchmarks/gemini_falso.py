@@ -0,0 +1,75 @@
+"""
+Sustituto de gemini-cli para benchmarks: lee el prompt de `-p`, busca los
+"Historia ID: N" y responde un array JSON INVEST sintético, objeto a objeto.
+
+La demora se controla con variables de entorno:
+    GEMINI_FALSO_DEMORA            segundos antes de empezar a responder (por invocación)
+    GEMINI_FALSO_DEMORA_HISTORIA   segundos entre un objeto y el siguiente
+    GEMINI_FALSO_TASA_INVALIDOS    probabilidad de omitir un objeto o devolverlo mal formado
+
+Uso: GEMINI_CLI="python benchmarks/gemini_falso.py" python main.py
+"""
+import json
+import os
+import random
+import re
+import sys
+import time
+
+CRITERIOS = ["Independiente", "Negociable", "Valiosa", "Estimable", "Pequeña", "Testeable"]
+
+def _evaluacion(wid, titulo):
+    # Determinista por ID, para que los resultados sean comparables entre ejecuciones.
+    azar = random.Random(wid)
+    return {
+        "id": wid,
+        "titulo": titulo,
+        "evaluacion_invest": {
+            c: {"puntaje": azar.randint(1, 5), "justificacion": f"Evaluación sintética de {c.lower()}."}
+            for c in CRITERIOS
+        },
+        "complejidad": azar.choice([1, 2.5, 5]),
+        "posibles_mejoras": ["Detallar los criterios de aceptación.", "Separar la historia si crece."],
+    }
+
+def _danar(obj, azar):
+    """Simula los fallos habituales del modelo: un criterio ausente o un puntaje fuera de rango."""
+    if azar.random() < 0.5:
+        del obj["evaluacion_invest"]["Testeable"]
+    else:
+        obj["evaluacion_invest"]["Valiosa"]["puntaje"] = 7
+    return obj
+
+def main(argv):
+    if "-p" not in argv:
+        print("uso: gemini_falso.py -p <prompt>", file=sys.stderr)
+        return 2
+    prompt = argv[argv.index("-p") + 1]
+    historias = re.findall(r"^Historia ID: (\d+)\nTítulo: (.*)$", prompt, re.MULTILINE)
+
+    time.sleep(float(os.getenv("GEMINI_FALSO_DEMORA", 0)))
+    demora_historia = float(os.getenv("GEMINI_FALSO_DEMORA_HISTORIA", 0))
+    tasa_invalidos = float(os.getenv("GEMINI_FALSO_TASA_INVALIDOS", 0))
+    # Los fallos no dependen del ID, para que al volver a pedir una historia pueda salir bien.
+    azar = random.Random()
+
+    # Imita la salida de la CLI: un bloque ```json con un objeto por fragmento.
+    sys.stdout.write("```json\n[\n")
+    primero = True
+    for wid, titulo in historias:
+        obj = _evaluacion(int(wid), titulo)
+        if azar.random() < tasa_invalidos:
+            if azar.random() < 0.5:
+                continue
+            obj = _danar(obj, azar)
+        if not primero:
+            sys.stdout.write(",\n")
+            time.sleep(demora_historia)
+        primero = False
+        sys.stdout.write(json.dumps(obj, ensure_ascii=False, indent=2))
+        sys.stdout.flush()
+    sys.stdout.write("\n]\n```\n")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
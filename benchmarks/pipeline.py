@@ -0,0 +1,147 @@
+"""
+Benchmark de extremo a extremo del pipeline, sin red: Azure DevOps falso
+(benchmarks/ado_falso.py) y gemini-cli falso (benchmarks/gemini_falso.py) o,
+con --evaluador api, la API de Gemini falsa (benchmarks/gemini_api_falso.py).
+
+Cada escenario se ejecuta en un proceso nuevo para medir la memoria pico sin
+arrastrar la del escenario anterior. Reporta rendimiento de extremo a extremo,
+memoria pico y el tiempo por etapa que registra src.utils.metricas, en un JSON
+que se puede comparar entre commits.
+
+Ejemplos:
+    python benchmarks/pipeline.py
+    python benchmarks/pipeline.py --escenarios 10 100 --latencia 30 --tasa-429 0.05
+    python benchmarks/pipeline.py --demora-gemini 0.5 --salida resultados/pipeline.json
+    python benchmarks/pipeline.py --evaluador api --escenarios 100 1000
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import shlex
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from ado_falso import ITERACION, PROYECTO, iniciar_servidor
+from gemini_api_falso import iniciar_servidor as iniciar_gemini_api
+
+ESCENARIOS = [10, 100, 1000, 10000]
+
+def ejecutar_escenario(historias, directorio):
+    """Corre el pipeline completo en este proceso. La configuración llega por variables de entorno."""
+    from src.pipeline import EvaluacionIteracion
+
+    inicio = time.perf_counter()
+    # Sin caché ni historial: cada escenario mide la evaluación completa.
+    evaluacion = EvaluacionIteracion("OrgFalsa", PROYECTO, ITERACION, "pat-falso",
+                                     max_historias=historias, incremental=False)
+    evaluacion.obtener()
+    resultados = evaluacion.evaluar()
+    evaluacion.estimar()
+    evaluacion.escribir(os.path.join(directorio, "res.json"))
+    segundos = time.perf_counter() - inicio
+
+    return {
+        "historias": len(evaluacion.historias),
+        "evaluadas": len(resultados),
+        "segundos": round(segundos, 3),
+        "historias_por_segundo": round(len(resultados) / segundos, 1) if segundos else None,
+        # En Linux ru_maxrss viene en KiB.
+        "memoria_pico_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "bytes_ahorrados_compactacion": evaluacion.metadata["compactacion"]["bytes_ahorrados"],
+        "historias_reutilizadas": len(evaluacion.duplicados),
+        "etapas": evaluacion.metricas.resumen(),
+    }
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def medir(historias, args):
+    """Arranca los servidores falsos y ejecuta un escenario en un proceso hijo."""
+    servidor = iniciar_servidor(historias, args.latencia, args.tasa_429, args.retry_after)
+    # En modo 'api' la demora de arranque de la CLI se aplica como demora por petición de la API.
+    gemini_api = iniciar_gemini_api(args.demora_gemini) if args.evaluador == "api" else None
+    try:
+        with tempfile.TemporaryDirectory() as directorio:
+            entorno = {
+                **os.environ,
+                "AZURE_DEVOPS_URL": f"http://127.0.0.1:{servidor.server_port}",
+                "GEMINI_CLI": f"{shlex.quote(sys.executable)} {shlex.quote(os.path.join(RAIZ, 'benchmarks', 'gemini_falso.py'))}",
+                "GEMINI_FALSO_DEMORA": str(args.demora_gemini),
+                "GEMINI_FALSO_DEMORA_HISTORIA": str(args.demora_historia),
+                "GEMINI_FALSO_TASA_INVALIDOS": str(args.tasa_invalidos),
+                "EVALUADOR": args.evaluador,
+                "GEMINI_API_URL": f"http://127.0.0.1:{gemini_api.server_port}" if gemini_api else "",
+                "GEMINI_API_KEY": "clave-falsa",
+                "PYTHONPATH": RAIZ,
+            }
+            proceso = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--ejecutar", str(historias), "--directorio", directorio],
+                cwd=RAIZ, env=entorno, capture_output=True, text=True,
+            )
+        if proceso.returncode != 0:
+            ultima = proceso.stderr.strip().splitlines()[-1] if proceso.stderr.strip() else "error desconocido"
+            return {"escenario": historias, "error": ultima}
+        # La última línea de la salida es el JSON del escenario; lo anterior son mensajes del pipeline.
+        resultado = json.loads(proceso.stdout.strip().splitlines()[-1])
+        return {"escenario": historias, **resultado, "peticiones_ado": dict(servidor.contadores)}
+    finally:
+        servidor.shutdown()
+        if gemini_api:
+            gemini_api.shutdown()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de extremo a extremo con Azure DevOps y Gemini falsos.")
+    parser.add_argument("--escenarios", type=int, nargs="+", default=ESCENARIOS, help="Número de historias por escenario")
+    parser.add_argument("--latencia", type=float, default=20, help="Latencia del Azure DevOps falso, en ms")
+    parser.add_argument("--tasa-429", type=float, default=0.0, help="Probabilidad de que el Azure DevOps falso responda 429")
+    parser.add_argument("--retry-after", type=int, default=0, help="Segundos indicados en Retry-After")
+    parser.add_argument("--demora-gemini", type=float, default=0.2, help="Segundos de arranque del gemini falso")
+    parser.add_argument("--demora-historia", type=float, default=0.0, help="Segundos entre objetos del gemini falso")
+    parser.add_argument("--tasa-invalidos", type=float, default=0.0,
+                        help="Probabilidad de que el gemini falso omita o dañe una evaluación")
+    parser.add_argument("--evaluador", choices=["cli", "api"], default="cli", help="Backend de evaluación a medir")
+    parser.add_argument("--salida", help="Archivo donde guardar el JSON de resultados")
+    # Uso interno: ejecutar un escenario en el proceso hijo.
+    parser.add_argument("--ejecutar", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--directorio", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.ejecutar is not None:
+        print(json.dumps(ejecutar_escenario(args.ejecutar, args.directorio), ensure_ascii=False))
+        sys.exit(0)
+
+    resultados = {
+        "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "parametros": {
+            "evaluador": args.evaluador,
+            "latencia_ms": args.latencia, "tasa_429": args.tasa_429, "retry_after": args.retry_after,
+            "demora_gemini": args.demora_gemini, "demora_historia": args.demora_historia,
+            "tasa_invalidos": args.tasa_invalidos,
+        },
+        "escenarios": [],
+    }
+    for historias in args.escenarios:
+        print(f"⏱️ Escenario de {historias} historias...", file=sys.stderr)
+        resultados["escenarios"].append(medir(historias, args))
+
+    salida = json.dumps(resultados, indent=2, ensure_ascii=False)
+    if args.salida:
+        os.makedirs(os.path.dirname(os.path.abspath(args.salida)), exist_ok=True)
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(salida + "\n")
+    print(salida)
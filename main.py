@@ -1,74 +1,85 @@
+import sys
 import threading
-import json
 import webbrowser
 import time
 
 # Importar módulos refactorizados
-from src.config.config import org, project, iteration_path, pat, ado_api_version, max_historias, dias_sprint, dias_complejidad
-from src.azure.api import obtener_historias
-from src.evaluation.gemini import evaluar_historias_cli
-from src.logic.estimation import estimar_dias
-from src.web.server import start_server
-from src.utils.loader import Loader
+# config se resuelve de forma perezosa: nada se consulta ni se pregunta hasta acceder a sus valores.
+from src.config import config
+from src.config.settings import evaluador, cache_ruta, cache_max_entradas, cache_max_dias, historial_ruta
+from src.evaluation.cache import CacheEvaluaciones
+from src.evaluation.historial import HistorialEvaluaciones
+from src.pipeline import EvaluacionIteracion
+from src.web.server import start_server, canal_eventos
+from src.utils.loader import Progreso
 
 # La función generar_markdown se mantiene en adjust_json.py y se puede importar si se desea usar.
 # from adjust_json import generar_markdown
 
 # === MAIN ===
 if __name__ == "__main__":
-    historias = obtener_historias(org, project, iteration_path, pat, ado_api_version, max_historias)
+    if "--refrescar" in sys.argv:
+        # Ignorar las organizaciones, proyectos e iteraciones cacheados y consultarlos de nuevo.
+        config.descubrimiento.invalidar()
+
+    org, project, iteration_path, pat = config.org, config.project, config.iteration_path, config.pat
+    evaluacion = EvaluacionIteracion(org, project, iteration_path, pat)
+
+    with Progreso(desc="📥 Descargando historias de Azure DevOps..."):
+        total = evaluacion.obtener()
 
     # Si no se encuentran historias, notificar y salir.
-    if not historias:
+    if not total:
         print(f"✅ No se encontraron historias de usuario en la iteración '{iteration_path}'. No hay nada que evaluar.")
         exit()
-    
-    capacidad_equipo = {
-        "carga": 0,  # 0% de carga
-        "historias": len(historias)  # número de HU del sprint
-    }
 
-    loader = Loader(desc=f"🔄 Evaluando {len(historias)} historias de usuario con Gemini CLI...")
-    loader.start()
+    metadata = evaluacion.metadata
+    if metadata["dependencias"]["historias_con_dependencias"]:
+        print(f"🔗 {metadata['dependencias']['historias_con_dependencias']} historias con dependencias "
+              f"({metadata['dependencias']['historias_en_ciclo']} en ciclos).")
+    compactacion = metadata["compactacion"]
+    print(f"✂️ Texto compactado: {compactacion['bytes_originales']} → {compactacion['bytes_compactados']} bytes "
+          f"({compactacion['porcentaje_ahorro']}% menos).")
+    if evaluacion.duplicados:
+        print(f"🧬 {len(evaluacion.duplicados)} historias casi duplicadas reutilizarán la evaluación de "
+              f"{len(evaluacion.duplicadas_de)} historias representativas.")
+
+    # La clave de Gemini se pide ahora, cuando ya hay algo que evaluar, y no al arrancar.
+    config.gemini_api_key
 
-    resultados_json = evaluar_historias_cli(historias)
-    loader.stop()
+    # El servidor arranca antes de evaluar para que el dashboard muestre cada historia en cuanto se evalúa.
+    server_url = "http://localhost:8000"
+    threading.Thread(target=start_server, daemon=True).start()
+    # Pequeña pausa para dar tiempo al servidor a iniciarse
+    time.sleep(1)
+    canal_eventos.iniciar({**metadata, "total_historias": total})
+    print(f"Abriendo el dashboard en tu navegador: {server_url}")
+    webbrowser.open(server_url)
+
+    medio = "la API de Gemini" if evaluador == "api" else "Gemini CLI"
+    progreso = Progreso(desc=f"🔄 Evaluando historias de usuario con {medio}...", total=total)
+
+    def al_resultado(r):
+        canal_eventos.publicar("historia", r)
+        progreso.avanzar()
+
+    cache = CacheEvaluaciones(cache_ruta, cache_max_entradas, cache_max_dias)
+    with progreso:
+        resultados_json = evaluacion.evaluar(cache, al_resultado=al_resultado)
+    cache.cerrar()
     print("✅ Evaluación de historias completada.")
+    print(f"🗃️ Caché: {metadata['cache']['aciertos']} aciertos, {metadata['cache']['fallos']} evaluaciones nuevas.")
     
     if resultados_json:
-        historias_map = {h['id']: h for h in historias}
-
-        for h_resultado in resultados_json:
-            complejidad = h_resultado.get("complejidad", 1.0)
-            estimacion_dias = estimar_dias(complejidad, capacidad_equipo, dias_sprint, dias_complejidad)
-            h_resultado["estimacion_dias"] = estimacion_dias
-            
-            original_historia = historias_map.get(h_resultado['id'])
-            if original_historia:
-                h_resultado['url'] = original_historia['url']
-        
-        metadata = {
-            "organizacion": org,
-            "proyecto": project,
-            "sprint": iteration_path,
-            "max_historias_evaluadas": max_historias,
-            "dias_sprint_config": dias_sprint,
-        }
-        final_data = {
-            "metadata": metadata,
-            "data": resultados_json
-        }
-        with open("res.json", "w", encoding="utf-8") as f:
-            json.dump(final_data, f, indent=2, ensure_ascii=False)
+        evaluacion.estimar()
+        historial = HistorialEvaluaciones(historial_ruta)
+        evaluacion.escribir("res.json", historial)
+        historial.cerrar()
         # Generar reporte en Markdown (descomentar si se desea usar)
         # generar_markdown("res.json", "historias_invest.md")
 
-        server_url = "http://localhost:8000"
-        threading.Thread(target=start_server, daemon=True).start()
-        # Pequeña pausa para dar tiempo al servidor a iniciarse
-        time.sleep(1)
-        print(f"Abriendo el dashboard en tu navegador: {server_url}")
-        webbrowser.open(server_url)
+        canal_eventos.finalizar()
         input("🚀 Presiona Enter para detener el servidor...\n")
     else:
-        print("❌ No se pudieron obtener los resultados de la CLI.")
\ No newline at end of file
+        canal_eventos.finalizar()
+        print(f"❌ No se pudieron obtener los resultados de {medio}.")
@@ -1,5 +1,24 @@
 import { estimarHoras } from "./utils.js";
-import { initDetailsModal, renderHeader, renderSummary, renderCards } from "./ui.js";
+import {
+  initDetailsModal,
+  renderHeader,
+  renderSummary,
+  renderCards,
+  appendCard,
+  summarizeStories,
+} from "./ui.js";
+
+const TAMANO_PAGINA = 50;
+
+// Estado del reporte paginado: calibración, resumen, última página cargada y petición en curso.
+const reporte = {
+  horasPorComplejidad: 0,
+  showModal: null,
+  summary: null,
+  pagina: 0,
+  paginas: 0,
+  peticion: null,
+};
 
 document.addEventListener("DOMContentLoaded", () => {
   const setupModal = document.getElementById("setup-modal");
@@ -106,38 +125,190 @@ document.addEventListener("DOMContentLoaded", () => {
   });
 
   recalibrateBtn.addEventListener("click", showRecalibrateModal);
+
+  // Los filtros se aplican en el servidor; al cambiarlos se vuelve a la primera página.
+  let searchTimeout = null;
+  document.getElementById("search-input").addEventListener("input", () => {
+    clearTimeout(searchTimeout);
+    searchTimeout = setTimeout(() => loadPage(1), 300);
+  });
+  document
+    .getElementById("sort-select")
+    .addEventListener("change", () => loadPage(1));
+  document
+    .getElementById("load-more-btn")
+    .addEventListener("click", () => loadPage(reporte.pagina + 1));
 });
 
 function startApp(horasParaComplejidad5) {
-  fetch("/data")
-    .then((r) => r.json())
+  const showModal = initDetailsModal();
+  const horasPorComplejidad = horasParaComplejidad5 / 5;
+  const streamStatus = document.getElementById("stream-status");
+
+  // Mientras Gemini sigue evaluando, el servidor envía cada historia por /stream.
+  // Si no hay una evaluación en curso, el stream termina de inmediato y se carga /data.
+  const stream = new EventSource("/stream");
+  const recibidas = [];
+  let totalHistorias = 0;
+  let resumenPendiente = null;
+
+  stream.addEventListener("inicio", (e) => {
+    const metadata = JSON.parse(e.data);
+    // Al reconectar, el servidor vuelve a enviar todos los eventos desde el inicio.
+    recibidas.length = 0;
+    totalHistorias = metadata.total_historias;
+    renderHeader(metadata);
+    renderCards([], getColors(), showModal);
+    streamStatus.textContent = `Evaluando historias... 0/${totalHistorias}`;
+    streamStatus.classList.remove("hidden", "error");
+  });
+
+  stream.addEventListener("historia", (e) => {
+    const historia = JSON.parse(e.data);
+    const recalibrada = {
+      ...historia,
+      estimacion_horas: estimarHoras(
+        historia.complejidad,
+        totalHistorias,
+        horasPorComplejidad
+      ),
+    };
+    recibidas.push(recalibrada);
+    appendCard(recalibrada, getColors(), showModal);
+    streamStatus.textContent = `Evaluando historias... ${recibidas.length}/${totalHistorias}`;
+
+    // Agrupamos las actualizaciones del resumen para no recrear los gráficos con cada historia.
+    if (!resumenPendiente) {
+      resumenPendiente = setTimeout(() => {
+        resumenPendiente = null;
+        renderSummary(
+          summarizeStories(recibidas),
+          recibidas,
+          getColors(),
+          horasPorComplejidad
+        );
+      }, 500);
+    }
+  });
+
+  const terminarStream = () => {
+    stream.close();
+    clearTimeout(resumenPendiente);
+    streamStatus.classList.add("hidden");
+    loadReport(horasPorComplejidad, showModal);
+  };
+  stream.addEventListener("fin", terminarStream);
+  stream.onerror = () => {
+    // Si la conexión se corta, EventSource reintenta solo; el reporte aún no está escrito.
+    if (stream.readyState === EventSource.CONNECTING) {
+      streamStatus.textContent = "Conexión con el servidor perdida, reintentando...";
+      streamStatus.classList.remove("hidden");
+      return;
+    }
+    terminarStream();
+  };
+}
+
+// Muestra un error de carga en la línea de estado, en lugar de dejar el dashboard en blanco.
+function mostrarError(mensaje) {
+  const streamStatus = document.getElementById("stream-status");
+  streamStatus.textContent = mensaje;
+  streamStatus.classList.add("error");
+  streamStatus.classList.remove("hidden");
+}
+
+function leerJson(respuesta) {
+  if (!respuesta.ok) {
+    const error = new Error(`${respuesta.status} ${respuesta.statusText}`);
+    error.status = respuesta.status;
+    throw error;
+  }
+  return respuesta.json();
+}
+
+// Carga el resumen precalculado y la primera página; los gráficos nunca necesitan el reporte completo.
+function loadReport(horasPorComplejidad, showModal) {
+  reporte.horasPorComplejidad = horasPorComplejidad;
+  reporte.showModal = showModal;
+
+  fetch("/summary")
+    .then(leerJson)
+    .then((summary) => {
+      document.getElementById("stream-status").classList.remove("error");
+      reporte.summary = summary;
+      renderHeader(summary.metadata);
+      return loadPage(1);
+    })
+    .catch((error) => {
+      mostrarError(
+        error.status === 404
+          ? "Todavía no hay ningún reporte: ejecuta una evaluación para generarlo."
+          : `No se pudo cargar el reporte (${error.message}).`
+      );
+    });
+}
+
+function loadPage(pagina) {
+  // Los filtros no hacen nada hasta que hay un reporte cargado.
+  if (!reporte.summary) return Promise.resolve();
+  const params = new URLSearchParams({
+    pagina,
+    tamano: TAMANO_PAGINA,
+    orden: document.getElementById("sort-select").value,
+  });
+  const q = document.getElementById("search-input").value.trim();
+  if (q) params.set("q", q);
+
+  // Solo cuenta la última petición: si el usuario sigue escribiendo o cambia el orden,
+  // una respuesta anterior que llegue tarde no debe pisar la nueva.
+  if (reporte.peticion) reporte.peticion.abort();
+  const peticion = new AbortController();
+  reporte.peticion = peticion;
+
+  return fetch(`/data?${params}`, { signal: peticion.signal })
+    .then(leerJson)
     .then((response) => {
-      const metadata = response.metadata;
-      const data = response.data; // El array de historias ahora está en la clave 'data'
+      const { summary, horasPorComplejidad, showModal } = reporte;
 
       // Recalculate estimations based on user input
-      const horasPorComplejidad = horasParaComplejidad5 / 5;
-      const totalHistorias = data.length;
-
-      const recalibratedData = data.map((historia) => {
+      const recalibratedData = response.data.map((historia) => {
         const nuevaEstimacion = estimarHoras(
           historia.complejidad,
-          totalHistorias,
+          summary.total,
           horasPorComplejidad
         );
         return { ...historia, estimacion_horas: nuevaEstimacion };
       });
 
-      // Initialize UI components
-      const showModal = initDetailsModal();
-      init(recalibratedData, showModal, metadata);
+      const colors = getColors();
+      reporte.pagina = response.paginacion.pagina;
+      reporte.paginas = response.paginacion.paginas;
+      if (pagina === 1) {
+        renderSummary(summary, recalibratedData, colors, horasPorComplejidad);
+        renderCards(recalibratedData, colors, showModal);
+      } else {
+        recalibratedData.forEach((historia) =>
+          appendCard(historia, colors, showModal)
+        );
+      }
+
+      document
+        .getElementById("load-more-btn")
+        .classList.toggle("hidden", reporte.pagina >= reporte.paginas);
+    })
+    .catch((error) => {
+      if (error.name === "AbortError") return;
+      mostrarError(`No se pudieron cargar las historias (${error.message}).`);
+    })
+    .finally(() => {
+      if (reporte.peticion === peticion) reporte.peticion = null;
     });
 }
 
-function init(data, showModal, metadata) {
+function getColors() {
   // Get CSS variables for charts
   const computedStyles = getComputedStyle(document.documentElement);
-  const colors = {
+  return {
     primary: computedStyles.getPropertyValue("--primary-color").trim(),
     primaryLight: computedStyles
       .getPropertyValue("--primary-color-light")
@@ -151,8 +322,4 @@ function init(data, showModal, metadata) {
       .getPropertyValue("--light-text-color")
       .trim(),
   };
-
-  renderHeader(metadata);
-  renderSummary(data, colors);
-  renderCards(data, colors, showModal);
 }
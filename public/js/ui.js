@@ -1,3 +1,5 @@
+import { estimarHoras } from "./utils.js";
+
 let pointsChartInstance = null;
 let complexityChartInstance = null;
 let radarChartInstances = [];
@@ -61,16 +63,34 @@ export function renderHeader(metadata) {
   `;
 }
 
-export function renderSummary(data, colors) {
+// Resume localmente un conjunto de historias con la misma forma que devuelve /summary.
+export function summarizeStories(data) {
+  const histograma_complejidad = data.reduce((acc, h) => {
+    const key = h.complejidad;
+    acc[key] = (acc[key] || 0) + 1;
+    return acc;
+  }, {});
+  return { total: data.length, histograma_complejidad };
+}
+
+// `summary` viene de /summary (o de summarizeStories) y cubre todo el reporte;
+// `data` son solo las historias cargadas, que se usan para el gráfico por HU.
+export function renderSummary(summary, data, colors, horasPorComplejidad) {
   const summaryMetricsDiv = document.getElementById("summary-metrics");
   if (!summaryMetricsDiv) return;
 
-  const totalStories = data.length;
-  const totalHoras = data.reduce((sum, h) => sum + h.estimacion_horas, 0);
-  const weightedComplexitySum = data.reduce(
-    (sum, h) => sum + h.complejidad * h.estimacion_horas,
-    0
-  );
+  const totalStories = summary.total;
+  const complexityCounts = summary.histograma_complejidad;
+
+  // Las horas solo dependen de la complejidad, así que el histograma basta para los totales.
+  let totalHoras = 0;
+  let weightedComplexitySum = 0;
+  Object.entries(complexityCounts).forEach(([key, count]) => {
+    const complejidad = parseFloat(key);
+    const horas = estimarHoras(complejidad, totalStories, horasPorComplejidad);
+    totalHoras += count * horas;
+    weightedComplexitySum += count * complejidad * horas;
+  });
   const avgComplexity =
     totalHoras > 0 ? (weightedComplexitySum / totalHoras).toFixed(2) : 0;
 
@@ -148,12 +168,6 @@ export function renderSummary(data, colors) {
   });
 
   // Chart 2: Complexity distribution
-  const complexityCounts = data.reduce((acc, h) => {
-    const key = h.complejidad;
-    acc[key] = (acc[key] || 0) + 1;
-    return acc;
-  }, {});
-
   const sortedComplexityKeys = Object.keys(complexityCounts).sort(
     (a, b) => parseFloat(a) - parseFloat(b)
   );
@@ -202,134 +216,168 @@ export function renderCards(data, colors, showModal) {
 
   cardsDiv.innerHTML = ""; // Clear previous cards
 
-  data.forEach((historia, i) => {
-    const card = document.createElement("div");
-    card.className = "card";
-
-    const investData = historia.evaluacion_invest;
-
-    const cardHeader = document.createElement("div");
-    cardHeader.className = "card-header";
-
-    const title = document.createElement("h2");
-    // Si la historia tiene una URL, crea un enlace. Si no, solo muestra el texto.
-    if (historia.url) {
-      const titleLink = document.createElement("a");
-      titleLink.href = historia.url;
-      titleLink.target = "_blank";
-      titleLink.rel = "noopener noreferrer";
-      titleLink.title = "Ver historia en Azure DevOps";
-      titleLink.textContent = `HU ${historia.id}: ${historia.titulo}`;
-      title.appendChild(titleLink);
-    } else {
-      title.textContent = `HU ${historia.id}: ${historia.titulo}`;
-    }
-    cardHeader.appendChild(title);
-
-    const badges = document.createElement("div");
-    badges.className = "badges";
-    badges.innerHTML = `
-        <span class="badge horas">Horas: ${historia.estimacion_horas}</span>
-        <span class="badge complejidad">Complejidad: ${historia.complejidad}</span>
-      `;
-    cardHeader.appendChild(badges);
-    card.appendChild(cardHeader);
-
-    const cardContent = document.createElement("div");
-    cardContent.className = "card-content";
-
-    const canvasContainer = document.createElement("div");
-    canvasContainer.className = "chart-container";
-    const canvas = document.createElement("canvas");
-    canvas.id = "chart-" + i;
-    canvasContainer.appendChild(canvas);
-
-    let detailsHtml = `<div class="details-container"><h3>Evaluación INVEST</h3><div class="invest-details">`;
-    const labels = Object.keys(investData);
-    const scores = labels.map((key) => investData[key].puntaje);
-    const justifications = labels.map((key) => investData[key].justificacion);
-
-    labels.forEach((label, index) => {
-      detailsHtml += `<p><strong>${label} (${scores[index]}/5):</strong> ${justifications[index]}</p>`;
+  data.forEach((historia) => appendCard(historia, colors, showModal));
+}
+
+// Añade la tarjeta de una sola historia; se usa también para pintar resultados a medida que llegan.
+export function appendCard(historia, colors, showModal) {
+  const cardsDiv = document.getElementById("cards");
+  if (!cardsDiv) return;
+
+  const i = radarChartInstances.length;
+  const card = document.createElement("div");
+  card.className = "card";
+
+  const investData = historia.evaluacion_invest;
+
+  const cardHeader = document.createElement("div");
+  cardHeader.className = "card-header";
+
+  const title = document.createElement("h2");
+  // Si la historia tiene una URL, crea un enlace. Si no, solo muestra el texto.
+  if (historia.url) {
+    const titleLink = document.createElement("a");
+    titleLink.href = historia.url;
+    titleLink.target = "_blank";
+    titleLink.rel = "noopener noreferrer";
+    titleLink.title = "Ver historia en Azure DevOps";
+    titleLink.textContent = `HU ${historia.id}: ${historia.titulo}`;
+    title.appendChild(titleLink);
+  } else {
+    title.textContent = `HU ${historia.id}: ${historia.titulo}`;
+  }
+  cardHeader.appendChild(title);
+
+  const badges = document.createElement("div");
+  badges.className = "badges";
+  badges.innerHTML = `
+      <span class="badge horas">Horas: ${historia.estimacion_horas}</span>
+      <span class="badge complejidad">Complejidad: ${historia.complejidad}</span>
+    `;
+  // Las historias casi duplicadas reutilizan la evaluación de su representante.
+  if (historia.evaluacion_compartida_con) {
+    const compartida = document.createElement("span");
+    compartida.className = "badge compartida";
+    compartida.textContent = `Evaluación compartida con HU ${historia.evaluacion_compartida_con}`;
+    badges.appendChild(compartida);
+  }
+  // Dependencias reales de la historia, calculadas a partir de los enlaces de Azure DevOps.
+  const dependencias = historia.dependencias;
+  if (dependencias) {
+    const textos = [];
+    if (dependencias.fan_in) textos.push(["dependencias", `Depende de: ${dependencias.fan_in}`]);
+    if (dependencias.fan_out) textos.push(["dependencias", `Bloquea a: ${dependencias.fan_out}`]);
+    if (dependencias.ciclo) textos.push(["ciclo", `Ciclo con HU ${dependencias.ciclo.join(", ")}`]);
+    textos.forEach(([clase, texto]) => {
+      const badge = document.createElement("span");
+      badge.className = `badge ${clase}`;
+      badge.textContent = texto;
+      if (dependencias.depende_de || dependencias.bloquea_a) {
+        badge.title = [
+          dependencias.depende_de && `Depende de: ${dependencias.depende_de.join(", ")}`,
+          dependencias.bloquea_a && `Bloquea a: ${dependencias.bloquea_a.join(", ")}`,
+        ].filter(Boolean).join("\n");
+      }
+      badges.appendChild(badge);
     });
+  }
+  cardHeader.appendChild(badges);
+  card.appendChild(cardHeader);
 
-    detailsHtml += `</div>`;
+  const cardContent = document.createElement("div");
+  cardContent.className = "card-content";
 
-    if (historia.posibles_mejoras && historia.posibles_mejoras.length > 0) {
-      detailsHtml += `<h3>Posibles Mejoras</h3><ul class="improvements-list">`;
-      historia.posibles_mejoras.forEach((mejoras) => {
-        detailsHtml += `<li>${mejoras}</li>`;
-      });
-      detailsHtml += `</ul>`;
-    }
-    detailsHtml += `</div>`; // Close .details-container
+  const canvasContainer = document.createElement("div");
+  canvasContainer.className = "chart-container";
+  const canvas = document.createElement("canvas");
+  canvas.id = "chart-" + i;
+  canvasContainer.appendChild(canvas);
 
-    const cardActions = document.createElement("div");
-    cardActions.className = "card-actions";
+  let detailsHtml = `<div class="details-container"><h3>Evaluación INVEST</h3><div class="invest-details">`;
+  const labels = Object.keys(investData);
+  const scores = labels.map((key) => investData[key].puntaje);
+  const justifications = labels.map((key) => investData[key].justificacion);
+
+  labels.forEach((label, index) => {
+    detailsHtml += `<p><strong>${label} (${scores[index]}/5):</strong> ${justifications[index]}</p>`;
+  });
 
-    const detailsButton = document.createElement("button");
-    detailsButton.className = "details-toggle-btn";
-    detailsButton.textContent = "Ver Detalles";
+  detailsHtml += `</div>`;
 
-    detailsButton.addEventListener("click", () => {
-      showModal(`HU ${historia.id}: ${historia.titulo}`, detailsHtml);
+  if (historia.posibles_mejoras && historia.posibles_mejoras.length > 0) {
+    detailsHtml += `<h3>Posibles Mejoras</h3><ul class="improvements-list">`;
+    historia.posibles_mejoras.forEach((mejoras) => {
+      detailsHtml += `<li>${mejoras}</li>`;
     });
+    detailsHtml += `</ul>`;
+  }
+  detailsHtml += `</div>`; // Close .details-container
 
-    cardActions.appendChild(detailsButton);
+  const cardActions = document.createElement("div");
+  cardActions.className = "card-actions";
 
-    cardContent.appendChild(canvasContainer);
-    card.appendChild(cardContent);
-    card.appendChild(cardActions);
+  const detailsButton = document.createElement("button");
+  detailsButton.className = "details-toggle-btn";
+  detailsButton.textContent = "Ver Detalles";
 
-    const avgInvestScore = scores.reduce((a, b) => a + b, 0) / scores.length;
-    if (historia.complejidad > 2.5 || avgInvestScore < 2.5) {
-      card.classList.add("is-problematic");
-    }
+  detailsButton.addEventListener("click", () => {
+    showModal(`HU ${historia.id}: ${historia.titulo}`, detailsHtml);
+  });
 
-    cardsDiv.appendChild(card);
+  cardActions.appendChild(detailsButton);
 
-    // Initialize radar chart
-    const radarChart = new Chart(canvas, {
-      type: "radar",
-      data: {
-        labels: labels,
-        datasets: [
-          {
-            label: "Puntaje INVEST",
-            data: scores,
-            backgroundColor: colors.primaryLight,
-            borderColor: colors.primary,
-            pointBackgroundColor: colors.primary,
+  cardContent.appendChild(canvasContainer);
+  card.appendChild(cardContent);
+  card.appendChild(cardActions);
+
+  const avgInvestScore = scores.reduce((a, b) => a + b, 0) / scores.length;
+  if (historia.complejidad > 2.5 || avgInvestScore < 2.5) {
+    card.classList.add("is-problematic");
+  }
+
+  cardsDiv.appendChild(card);
+
+  // Initialize radar chart
+  const radarChart = new Chart(canvas, {
+    type: "radar",
+    data: {
+      labels: labels,
+      datasets: [
+        {
+          label: "Puntaje INVEST",
+          data: scores,
+          backgroundColor: colors.primaryLight,
+          borderColor: colors.primary,
+          pointBackgroundColor: colors.primary,
+        },
+      ],
+    },
+    options: {
+      scales: {
+        r: {
+          min: 0,
+          max: 5,
+          ticks: {
+            stepSize: 1,
+            color: colors.lightTextColor,
+            backdropColor: "transparent",
           },
-        ],
-      },
-      options: {
-        scales: {
-          r: {
-            min: 0,
-            max: 5,
-            ticks: {
-              stepSize: 1,
-              color: colors.lightTextColor,
-              backdropColor: "transparent",
-            },
-            grid: { color: colors.borderColor },
-            angleLines: { color: colors.borderColor },
-            pointLabels: {
-              color: colors.textColor,
-              font: { size: 12 },
-            },
+          grid: { color: colors.borderColor },
+          angleLines: { color: colors.borderColor },
+          pointLabels: {
+            color: colors.textColor,
+            font: { size: 12 },
           },
         },
-        plugins: { legend: { display: false } },
-        responsive: true,
-        maintainAspectRatio: false,
-        animation: {
-          duration: 800,
-          easing: "easeOutQuart",
-        },
       },
-    });
-    radarChartInstances.push(radarChart);
+      plugins: { legend: { display: false } },
+      responsive: true,
+      maintainAspectRatio: false,
+      animation: {
+        duration: 800,
+        easing: "easeOutQuart",
+      },
+    },
   });
+  radarChartInstances.push(radarChart);
 }
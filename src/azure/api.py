@@ -1,30 +1,42 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 import requests
-from requests.auth import HTTPBasicAuth
-import html2text
 
-def _get_session(pat):
-    """Crea y configura una sesión de requests con la autenticación PAT."""
-    session = requests.Session()
-    session.auth = HTTPBasicAuth(pat, pat)
-    return session
+from src.azure.cliente import obtener_cliente
+from src.config import settings
+from src.logic.dependencias import TIPOS_ENLACE
+from src.utils.metricas import en_contexto, metricas
+
+# Raíz de la API de Azure DevOps Services; configurable para apuntar a un servidor de pruebas.
+_URL_BASE = settings.ado_url_base.rstrip("/")
+
+# El endpoint workitemsbatch acepta como máximo 200 IDs por petición.
+_LOTE_MAX_IDS = 200
+
+# Solo pedimos los campos que realmente se leen al construir cada historia.
+_CAMPOS_HISTORIA = [
+    "System.Id",
+    "System.Title",
+    "System.Description",
+    "Microsoft.VSTS.Common.AcceptanceCriteria",
+    "System.ChangedDate",
+]
 
 def obtener_organizaciones(pat):
     """Obtiene las organizaciones a las que el usuario tiene acceso usando un PAT."""
     try:
-        session = _get_session(pat)
+        cliente = obtener_cliente(pat)
         api_version = "6.0"
         
         # 1. Obtener el ID del perfil del usuario ("me")
         profile_url = f"https://app.vssps.visualstudio.com/_apis/profile/profiles/me?api-version={api_version}"
-        resp = session.get(profile_url)
-        resp.raise_for_status()
+        resp = cliente.get(profile_url)
         member_id = resp.json().get("id")
 
 
         # 2. Usar el ID para listar las organizaciones
         orgs_url = f"https://app.vssps.visualstudio.com/_apis/accounts?memberId={member_id}&api-version={api_version}"
-        resp = session.get(orgs_url)
-        resp.raise_for_status()
+        resp = cliente.get(orgs_url)
         organizaciones = resp.json().get("value", [])
         return [org["accountName"] for org in organizaciones]
     except requests.RequestException as e:
@@ -33,10 +45,9 @@ def obtener_organizaciones(pat):
 
 def obtener_proyectos(org, pat, ado_api_version="7.0"):
     """Obtiene la lista de proyectos para la organización configurada."""
-    session = _get_session(pat)
-    url = f"https://dev.azure.com/{org}/_apis/projects?api-version={ado_api_version}"
-    resp = session.get(url)
-    resp.raise_for_status()
+    cliente = obtener_cliente(pat)
+    url = f"{_URL_BASE}/{org}/_apis/projects?api-version={ado_api_version}"
+    resp = cliente.get(url)
     proyectos = resp.json().get("value", [])
     return [p["name"] for p in proyectos]
 
@@ -56,19 +67,29 @@ def _extraer_rutas_recursivamente(nodo, iteraciones_encontradas):
         for hijo in nodo["children"]:
             _extraer_rutas_recursivamente(hijo, iteraciones_encontradas)
 
-def obtener_iterations(project_name, org, pat, ado_api_version="7.1-preview.2"):
-    """Obtiene toda la jerarquía de iteraciones de un proyecto usando los nodos de clasificación."""
-    session = _get_session(pat)
+def _obtener_nodos_iteracion(cliente, project_name, org, ado_api_version):
+    """Descarga el árbol de iteraciones del proyecto y devuelve sus nodos hoja."""
     # Este método es más robusto que buscar por equipo, ya que obtiene todas las iteraciones del proyecto.
-    url = f"https://dev.azure.com/{org}/{project_name}/_apis/wit/classificationnodes/Iterations"
+    url = f"{_URL_BASE}/{org}/{project_name}/_apis/wit/classificationnodes/Iterations"
     params = {"$depth": 10, "api-version": ado_api_version} # Aumentamos la profundidad para asegurar capturar todo
     
-    resp = session.get(url, params=params)
-    resp.raise_for_status()
+    resp = cliente.get(url, params=params)
+    # Los errores (p. ej. 404 si el proyecto no existe) ya lanzan HTTPError; con un PAT sin acceso
+    # Azure DevOps responde 203 con la página de inicio de sesión, que tampoco es un árbol de iteraciones.
+    if resp.status_code != 200:
+        raise requests.HTTPError(
+            f"{resp.status_code} al leer las iteraciones de {org}/{project_name}", response=resp
+        )
     raiz = resp.json()
     
     iteraciones_encontradas = []
     _extraer_rutas_recursivamente(raiz, iteraciones_encontradas)
+    return iteraciones_encontradas
+
+def obtener_iterations(project_name, org, pat, ado_api_version="7.1-preview.2"):
+    """Obtiene toda la jerarquía de iteraciones de un proyecto usando los nodos de clasificación."""
+    cliente = obtener_cliente(pat)
+    iteraciones_encontradas = _obtener_nodos_iteracion(cliente, project_name, org, ado_api_version)
 
     # Ordenar las iteraciones por fecha de inicio (startDate) de más reciente a más antigua.
     # Las iteraciones sin fecha de inicio se tratarán como las más antiguas.
@@ -79,56 +100,160 @@ def obtener_iterations(project_name, org, pat, ado_api_version="7.1-preview.2"):
     )
     return [i["path"] for i in iteraciones_ordenadas]
 
-def obtener_historias(org, project, iteration_path, pat, ado_api_version, max_historias):
-    """Consulta Azure DevOps para obtener historias de usuario de un sprint."""
-    session = _get_session(pat)
-    h = html2text.HTML2Text()
-    h.ignore_links = False
-    
+def obtener_iteraciones_actuales(project_name, org, pat, ado_api_version="7.1-preview.2"):
+    """Obtiene las iteraciones del proyecto cuyo rango de fechas incluye el día de hoy."""
+    cliente = obtener_cliente(pat)
+    hoy = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+    actuales = []
+    for nodo in _obtener_nodos_iteracion(cliente, project_name, org, ado_api_version):
+        atributos = nodo.get("attributes", {})
+        # Las fechas vienen en ISO 8601 ('2020-05-04T00:00:00Z'); comparamos solo la parte de la fecha.
+        inicio = atributos.get("startDate", "")[:10]
+        fin = atributos.get("finishDate", "")[:10]
+        if inicio and fin and inicio <= hoy <= fin:
+            actuales.append(nodo["path"])
+    return actuales
+
+def _obtener_work_items_lote(cliente, org, ids, ado_api_version, campos=None):
+    """Obtiene hasta 200 work items en una sola petición usando el endpoint workitemsbatch."""
+    url = f"{_URL_BASE}/{org}/_apis/wit/workitemsbatch?api-version={ado_api_version}"
+    body = {"ids": ids, "fields": campos or _CAMPOS_HISTORIA}
+    with metricas.etapa("descarga") as conteo:
+        resp = cliente.post(url, json=body)
+        work_items = resp.json().get("value", [])
+        conteo["elementos"], conteo["bytes"] = len(work_items), len(resp.content)
+    return work_items
+
+def _obtener_work_items(cliente, org, ids, ado_api_version, max_workers=4, campos=None):
+    """
+    Descarga los work items en lotes concurrentes y los devuelve en el mismo orden de `ids`.
+
+    Los lotes se reparten entre un número acotado de hilos para no saturar la API.
+    """
+    lotes = [ids[i:i + _LOTE_MAX_IDS] for i in range(0, len(ids), _LOTE_MAX_IDS)]
+    if not lotes:
+        return []
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(lotes)))) as executor:
+        respuestas = executor.map(
+            en_contexto(lambda lote: _obtener_work_items_lote(cliente, org, lote, ado_api_version, campos)),
+            lotes,
+        )
+        por_id = {wi["id"]: wi for respuesta in respuestas for wi in respuesta}
+
+    # El endpoint no garantiza el orden, así que lo restauramos según la consulta WIQL.
+    return [por_id[wid] for wid in ids if wid in por_id]
+
+def _iteration_path_wiql(iteration_path):
+    """Convierte la ruta completa de la iteración al formato relativo que espera WIQL."""
     # El campo [System.IterationPath] en WIQL es relativo al proyecto.
     # La ruta completa es '\Proyecto\Iteration\RutaDelSprint'.
     # Para la consulta, necesitamos 'Proyecto\RutaDelSprint'.
     # Eliminamos la barra inicial y la parte '\Iteration'.
     partes = iteration_path.split('\\')
     # partes[1] es el proyecto, partes[3:] es la ruta relativa.
-    iteration_path_for_wiql = '\\\\'.join([partes[1]] + partes[3:])
+    return '\\\\'.join([partes[1]] + partes[3:])
 
-    wiql_url = f"https://dev.azure.com/{org}/{project}/_apis/wit/wiql?api-version={ado_api_version}"
+def _consultar_ids_historias(cliente, org, project, iteration_path, ado_api_version, condicion_extra=""):
+    """Ejecuta la consulta WIQL de historias de la iteración y devuelve sus IDs en orden."""
+    wiql_url = f"{_URL_BASE}/{org}/{project}/_apis/wit/wiql"
+    # timePrecision permite comparar [System.ChangedDate] con hora y no solo con fecha.
+    params = {"api-version": ado_api_version, "timePrecision": "true"}
 
-    # Paso 1: Obtener los IDs y títulos de las historias.
     query = {
         "query": f"""
         SELECT [System.Id], [System.Title]
         FROM WorkItems
         WHERE [System.WorkItemType] = 'Product Backlog Item'
-        AND [System.IterationPath] UNDER '{iteration_path_for_wiql}'
+        AND [System.IterationPath] UNDER '{_iteration_path_wiql(iteration_path)}'
+        {condicion_extra}
         """
     }
     
-    # Realizar la primera petición a la API de WIQL
-    resp = session.post(wiql_url, json=query)
-    resp.raise_for_status()  # Lanza una excepción si la petición falla
-    data = resp.json()
-    work_items = data.get("workItems", [])
+    with metricas.etapa("wiql") as conteo:
+        resp = cliente.post(wiql_url, params=params, json=query)
+        ids = [item["id"] for item in resp.json().get("workItems", [])]
+        conteo["elementos"], conteo["bytes"] = len(ids), len(resp.content)
+    return ids
 
-    historias = []
-    
-    # Paso 2: Iterar sobre los IDs y obtener todos los detalles de cada historia.
-    for item in work_items[:max_historias]:
-        wid = item["id"]
-        
-        wi_url = f"https://dev.azure.com/{org}/_apis/wit/workitems/{wid}?api-version={ado_api_version}"
-        wi = session.get(wi_url).json()
-        fields = wi.get("fields", {})
-        descripcion_html = wi["fields"].get("System.Description", "")
-        criterios_html = wi["fields"].get("Microsoft.VSTS.Common.AcceptanceCriteria", "")
-        
-        historias.append({
-            "id": wid,
-            "titulo": wi["fields"]["System.Title"],
-            "url": wi["_links"]["html"]["href"],
-            "descripcion": h.handle(descripcion_html) if descripcion_html else "",
-            "aceptacion_criterios": h.handle(criterios_html) if criterios_html else ""
-        })
-    
-    return historias
\ No newline at end of file
+def obtener_relaciones(org, project, iteration_path, pat, ado_api_version):
+    """
+    Obtiene con una sola consulta WIQL de enlaces las relaciones de las historias de la
+    iteración (predecesora/sucesora, padre/hija y relacionada).
+
+    Devuelve tuplas (origen, destino, tipo de enlace). Si la consulta falla se devuelve
+    una lista vacía: las dependencias enriquecen la evaluación pero no son imprescindibles.
+    """
+    cliente = obtener_cliente(pat)
+    wiql_url = f"{_URL_BASE}/{org}/{project}/_apis/wit/wiql"
+    tipos = ", ".join(f"'{tipo}'" for tipo in TIPOS_ENLACE)
+    # Las tareas hijas no dicen nada de la independencia de la historia y son la mayoría de los enlaces.
+    query = {
+        "query": f"""
+        SELECT [System.Id]
+        FROM WorkItemLinks
+        WHERE ([Source].[System.WorkItemType] = 'Product Backlog Item'
+            AND [Source].[System.IterationPath] UNDER '{_iteration_path_wiql(iteration_path)}')
+        AND ([System.Links.LinkType] IN ({tipos}))
+        AND ([Target].[System.WorkItemType] <> 'Task')
+        MODE (MustContain)
+        """
+    }
+
+    try:
+        with metricas.etapa("wiql") as conteo:
+            resp = cliente.post(wiql_url, params={"api-version": ado_api_version}, json=query)
+            enlaces = resp.json().get("workItemRelations", [])
+            conteo["bytes"] = len(resp.content)
+            relaciones = [
+                (enlace["source"]["id"], enlace["target"]["id"], enlace["rel"])
+                # Las filas sin 'rel' (o sin origen) son los propios work items, no enlaces.
+                for enlace in enlaces if enlace.get("rel") and enlace.get("source") and enlace.get("target")
+            ]
+            conteo["elementos"] = len(relaciones)
+    except requests.RequestException as e:
+        print(f"⚠️ No se pudieron obtener las relaciones entre historias: {e}")
+        return []
+    return relaciones
+
+def _nuevo_conversor_html():
+    # html2text solo se importa cuando realmente hay HTML que convertir.
+    import html2text
+    h = html2text.HTML2Text()
+    h.ignore_links = False
+    return h
+
+def _historia_desde_work_item(wi, org, project, h):
+    """Construye el diccionario de historia a partir de un work item de la API."""
+    wid = wi["id"]
+    fields = wi.get("fields", {})
+    descripcion_html = fields.get("System.Description", "")
+    criterios_html = fields.get("Microsoft.VSTS.Common.AcceptanceCriteria", "")
+
+    with metricas.etapa("conversion_html", elementos=1, bytes=len(descripcion_html) + len(criterios_html)):
+        descripcion = h.handle(descripcion_html) if descripcion_html else ""
+        aceptacion_criterios = h.handle(criterios_html) if criterios_html else ""
+
+    return {
+        "id": wid,
+        "titulo": fields.get("System.Title", ""),
+        # El endpoint de lotes no devuelve '_links' cuando se filtran campos, así que armamos la URL.
+        "url": f"{_URL_BASE}/{org}/{project}/_workitems/edit/{wid}",
+        "descripcion": descripcion,
+        "aceptacion_criterios": aceptacion_criterios
+    }
+
+def obtener_historias(org, project, iteration_path, pat, ado_api_version, max_historias, max_workers=4):
+    """Consulta Azure DevOps para obtener historias de usuario de un sprint."""
+    cliente = obtener_cliente(pat)
+    h = _nuevo_conversor_html()
+
+    # Paso 1: Obtener los IDs de las historias.
+    ids = _consultar_ids_historias(cliente, org, project, iteration_path, ado_api_version)[:max_historias]
+
+    # Paso 2: Obtener los detalles de todas las historias en lotes, en lugar de una petición por historia.
+    return [
+        _historia_desde_work_item(wi, org, project, h)
+        for wi in _obtener_work_items(cliente, org, ids, ado_api_version, max_workers)
+    ]
@@ -0,0 +1,115 @@
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.auth import HTTPBasicAuth
+
+from src.config import settings
+from src.utils.reintentos import ESTADOS_REINTENTABLES, espera_reintento
+
+class ClienteADO:
+    """
+    Cliente HTTP compartido para Azure DevOps.
+
+    - Reutiliza conexiones (keep-alive) con un pool de tamaño configurable.
+    - Limita cuántas peticiones simultáneas se hacen a cada host.
+    - Reintenta con backoff exponencial los 429/5xx y los errores de conexión,
+      respetando Retry-After y las cabeceras X-RateLimit-* de Azure DevOps.
+    - Devuelve solo respuestas exitosas: los errores definitivos lanzan HTTPError.
+    """
+    def __init__(self, pat, tamano_pool=16, max_por_host=8, reintentos=5, espera_base=1.0, espera_max=60.0, timeout=60):
+        self.reintentos = reintentos
+        self.espera_base = espera_base
+        self.espera_max = espera_max
+        self.timeout = timeout
+        self.max_por_host = max_por_host
+
+        self.session = requests.Session()
+        self.session.auth = HTTPBasicAuth(pat, pat)
+        adaptador = HTTPAdapter(pool_connections=4, pool_maxsize=tamano_pool)
+        self.session.mount("https://", adaptador)
+        self.session.mount("http://", adaptador)
+
+        self._lock = threading.Lock()
+        self._semaforos = {}
+        # Momento (time.monotonic) hasta el que hay que esperar antes de volver a llamar a cada host.
+        self._pausas = {}
+
+    def _semaforo(self, host):
+        with self._lock:
+            if host not in self._semaforos:
+                self._semaforos[host] = threading.BoundedSemaphore(self.max_por_host)
+            return self._semaforos[host]
+
+    def _esperar_pausa(self, host):
+        with self._lock:
+            restante = self._pausas.get(host, 0) - time.monotonic()
+        if restante > 0:
+            time.sleep(restante)
+
+    def _pausar(self, host, segundos):
+        with self._lock:
+            self._pausas[host] = max(self._pausas.get(host, 0), time.monotonic() + segundos)
+
+    def _registrar_limites(self, host, resp):
+        """Si Azure DevOps indica que se agotó el presupuesto, pausa el host hasta que se reinicie."""
+        restante = resp.headers.get("X-RateLimit-Remaining")
+        reinicio = resp.headers.get("X-RateLimit-Reset")
+        if restante is not None and reinicio is not None:
+            try:
+                if float(restante) <= 0:
+                    self._pausar(host, min(self.espera_max, max(0.0, float(reinicio) - time.time())))
+            except ValueError:
+                pass
+
+    def _espera(self, resp, intento):
+        """Segundos a esperar antes del siguiente intento."""
+        return espera_reintento(resp.headers if resp is not None else None, intento, self.espera_base, self.espera_max)
+
+    def request(self, metodo, url, **kwargs):
+        host = urlparse(url).netloc
+        kwargs.setdefault("timeout", self.timeout)
+
+        for intento in range(self.reintentos + 1):
+            self._esperar_pausa(host)
+            resp = None
+            try:
+                with self._semaforo(host):
+                    resp = self.session.request(metodo, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if intento == self.reintentos:
+                    raise
+            else:
+                self._registrar_limites(host, resp)
+                if resp.status_code not in ESTADOS_REINTENTABLES or intento == self.reintentos:
+                    resp.raise_for_status()
+                    return resp
+
+            espera = self._espera(resp, intento)
+            if resp is not None and resp.status_code == 429:
+                # El límite es del host, no de esta petición: los demás hilos también deben esperar.
+                self._pausar(host, espera)
+            time.sleep(espera)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+_clientes = {}
+_clientes_lock = threading.Lock()
+
+def obtener_cliente(pat):
+    """Devuelve el cliente compartido para un PAT, creándolo la primera vez."""
+    with _clientes_lock:
+        if pat not in _clientes:
+            _clientes[pat] = ClienteADO(
+                pat,
+                tamano_pool=settings.ado_pool_conexiones,
+                max_por_host=settings.ado_max_por_host,
+                reintentos=settings.ado_reintentos,
+            )
+        return _clientes[pat]
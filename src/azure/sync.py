@@ -0,0 +1,101 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+
+from src.azure.cliente import obtener_cliente
+from src.azure.api import (
+    _consultar_ids_historias,
+    _obtener_work_items,
+    _nuevo_conversor_html,
+    _historia_desde_work_item,
+)
+
+def _ruta_estado(directorio, org, project, iteration_path):
+    """Ruta del archivo de estado local de una iteración."""
+    clave = hashlib.sha1(f"{org}|{project}|{iteration_path}".encode("utf-8")).hexdigest()
+    return os.path.join(directorio, f"{clave}.json")
+
+def _cargar_estado(ruta):
+    try:
+        with open(ruta, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+def _guardar_estado(ruta, estado):
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    # Escribimos en un archivo temporal y lo reemplazamos para no dejar un estado a medias.
+    temporal = f"{ruta}.tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump(estado, f, ensure_ascii=False)
+    os.replace(temporal, ruta)
+
+def _fecha(valor):
+    return datetime.fromisoformat(valor.replace("Z", "+00:00"))
+
+def _condicion_cambios(watermark, ids_watermark):
+    """
+    Condición WIQL de las historias cambiadas desde la marca de agua.
+
+    Incluye las que tienen exactamente la fecha de la marca de agua, para no perder cambios
+    ocurridos en el mismo instante, salvo las que ya se descargaron con esa fecha.
+    """
+    if not ids_watermark:
+        return f"AND [System.ChangedDate] >= '{watermark}'"
+    ids = ", ".join(str(wid) for wid in sorted(ids_watermark))
+    return (f"AND ([System.ChangedDate] > '{watermark}' "
+            f"OR ([System.ChangedDate] = '{watermark}' AND [System.Id] NOT IN ({ids})))")
+
+def obtener_historias_incremental(org, project, iteration_path, pat, ado_api_version, max_historias,
+                                  max_workers=4, directorio_estado=".cache/sync"):
+    """
+    Obtiene las historias de un sprint descargando solo las que cambiaron desde la última ejecución.
+
+    Por cada iteración se guarda localmente una marca de agua (el mayor System.ChangedDate visto),
+    los IDs cuya última versión conocida tiene exactamente esa fecha y la última copia conocida
+    de cada historia. En cada ejecución:
+    1. Se consultan los IDs actuales de la iteración (una sola consulta WIQL, sin detalles).
+    2. Se consultan los IDs modificados desde la marca de agua, sin los ya descargados con esa fecha.
+    3. Solo se descargan las historias modificadas o que no estaban en la copia local.
+    Las historias que ya no pertenecen a la iteración (eliminadas o movidas) se descartan.
+    """
+    cliente = obtener_cliente(pat)
+    ruta = _ruta_estado(directorio_estado, org, project, iteration_path)
+    estado = _cargar_estado(ruta) or {"watermark": None, "historias": {}}
+    conocidas = estado["historias"]
+    # Estados guardados por versiones anteriores no tienen la lista: se vuelven a descargar una vez.
+    en_watermark = set(estado.get("ids_watermark", []))
+
+    ids_actuales = _consultar_ids_historias(cliente, org, project, iteration_path, ado_api_version)[:max_historias]
+
+    if estado["watermark"] and conocidas:
+        modificadas = set(_consultar_ids_historias(
+            cliente, org, project, iteration_path, ado_api_version,
+            _condicion_cambios(estado["watermark"], en_watermark),
+        ))
+        a_descargar = [wid for wid in ids_actuales if wid in modificadas or str(wid) not in conocidas]
+    else:
+        a_descargar = list(ids_actuales)
+
+    watermark = estado["watermark"]
+    h = _nuevo_conversor_html()
+    for wi in _obtener_work_items(cliente, org, a_descargar, ado_api_version, max_workers):
+        conocidas[str(wi["id"])] = _historia_desde_work_item(wi, org, project, h)
+        cambio = wi.get("fields", {}).get("System.ChangedDate")
+        if not cambio:
+            continue
+        if watermark is None or _fecha(cambio) > _fecha(watermark):
+            watermark = cambio
+            en_watermark = {wi["id"]}
+        elif _fecha(cambio) == _fecha(watermark):
+            en_watermark.add(wi["id"])
+
+    # Reconciliar: descartar las historias eliminadas o movidas fuera de la iteración.
+    vigentes = {str(wid) for wid in ids_actuales}
+    historias = {wid: h for wid, h in conocidas.items() if wid in vigentes}
+
+    _guardar_estado(ruta, {"watermark": watermark, "ids_watermark": sorted(en_watermark), "historias": historias})
+    print(f"🔁 Sincronización incremental: {len(a_descargar)} de {len(ids_actuales)} historias descargadas.")
+
+    return [historias[str(wid)] for wid in ids_actuales if str(wid) in historias]
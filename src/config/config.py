@@ -1,76 +1,104 @@
-import os
-from dotenv import load_dotenv
-import questionary
-from InquirerPy import inquirer
-from src.azure.api import obtener_organizaciones, obtener_proyectos, obtener_iterations
+"""
+Configuración interactiva, resuelta de forma perezosa.
 
-load_dotenv()
+Los valores (org, project, iteration_path, pat, gemini_api_key) se toman del entorno
+mediante `settings` y solo se consultan a Azure DevOps o se preguntan al usuario la
+primera vez que se accede a ellos, p. ej. `config.org`. Las librerías de prompts se
+importan únicamente cuando de verdad hay que mostrar una pregunta.
+"""
+import os
+from src.config import settings
+from src.config.descubrimiento import CacheDescubrimiento
 
 # Constantes de color para la terminal
 BLUE = '\033[38;2;95;175;255m'  # Tono azul claro (#5fafff)
 GREEN_BOLD = '\033[1;32m'
 ENDC = '\033[0m'
 
-# Variables de configuración
-org = os.getenv("AZURE_ORG")
-project = os.getenv("AZURE_PROJECT")
-iteration_path = os.getenv("AZURE_ITERATION_PATH")
-pat = os.getenv("AZURE_PAT")
-gemini_api_key = os.getenv("GEMINI_API_KEY")
+descubrimiento = CacheDescubrimiento(settings.descubrimiento_ruta, settings.descubrimiento_ttl)
+
+def _preguntar_texto(mensaje):
+    import questionary
+    return questionary.text(mensaje).ask()
 
-# Solicitar interactivamente si faltan variables
-if not pat:
-    pat = questionary.password("Introduce tu Personal Access Token de Azure DevOps (AZURE_PAT):").ask()
+def _preguntar_secreto(mensaje):
+    import questionary
+    return questionary.password(mensaje).ask()
 
-if not org:
+def _seleccionar(mensaje, opciones):
+    # Usar InquirerPy para un autocompletado que muestra todas las opciones al inicio
+    # y permite filtrar al escribir.
+    from InquirerPy import inquirer
+    return inquirer.fuzzy(
+        message=mensaje,
+        choices=opciones,
+        long_instruction="Usa las flechas para navegar, escribe para filtrar.",
+        vi_mode=True,
+        border=True,
+    ).execute()
+
+def _resolver_pat():
+    return settings.pat or _preguntar_secreto("Introduce tu Personal Access Token de Azure DevOps (AZURE_PAT):")
+
+def _resolver_org():
+    if settings.org:
+        return settings.org
+    from src.azure.api import obtener_organizaciones
+    pat = _obtener("pat")
     try:
-        organizaciones_disponibles = obtener_organizaciones(pat)
+        organizaciones_disponibles = descubrimiento.obtener(
+            CacheDescubrimiento.clave("organizaciones", pat),
+            lambda: obtener_organizaciones(pat),
+        )
         if len(organizaciones_disponibles) == 1:
             org = organizaciones_disponibles[0]
             print(f"🏢 Organización encontrada y seleccionada automáticamente: {BLUE}{org}{ENDC}")
-        elif organizaciones_disponibles:
-            org = inquirer.fuzzy(
-                message="Busca o selecciona tu organización de Azure DevOps:",
-                choices=organizaciones_disponibles,
-                long_instruction="Usa las flechas para navegar, escribe para filtrar.",
-                vi_mode=True,
-                border=True,
-            ).execute()
-        else:
-            print("No se encontraron organizaciones asociadas a tu PAT.")
-            org = questionary.text("No se encontraron organizaciones. Introduce el nombre manualmente:").ask()
+            return org
+        if organizaciones_disponibles:
+            return _seleccionar("Busca o selecciona tu organización de Azure DevOps:", organizaciones_disponibles)
+        print("No se encontraron organizaciones asociadas a tu PAT.")
+        return _preguntar_texto("No se encontraron organizaciones. Introduce el nombre manualmente:")
     except Exception as e:
         print(f"⚠️ No se pudieron obtener las organizaciones ({e}). Por favor, introduce el nombre manualmente.")
-        org = questionary.text("Introduce tu organización de Azure DevOps (AZURE_ORG):").ask()
+        return _preguntar_texto("Introduce tu organización de Azure DevOps (AZURE_ORG):")
 
-if not project:
+def _resolver_project():
+    if settings.project:
+        return settings.project
+    from src.azure.api import obtener_proyectos
+    pat, org = _obtener("pat"), _obtener("org")
     try:
-        proyectos_disponibles = obtener_proyectos(org, pat)
+        proyectos_disponibles = descubrimiento.obtener(
+            CacheDescubrimiento.clave("proyectos", pat, org),
+            lambda: obtener_proyectos(org, pat),
+        )
         if len(proyectos_disponibles) == 1:
             project = proyectos_disponibles[0]
             print(f"🏗️ Proyecto encontrado y seleccionado automáticamente: {BLUE}{project}{ENDC}")
-        elif proyectos_disponibles:
-            project = inquirer.fuzzy(
-                message="Busca o selecciona tu proyecto de Azure DevOps:",
-                choices=proyectos_disponibles,
-                long_instruction="Usa las flechas para navegar, escribe para filtrar.",
-                vi_mode=True,
-                border=True,
-            ).execute()
-        else:
-            print(f"No se encontraron proyectos en la organización '{org}'.")
-            project = questionary.text("No se encontraron proyectos. Introduce el nombre manualmente:").ask()
+            return project
+        if proyectos_disponibles:
+            return _seleccionar("Busca o selecciona tu proyecto de Azure DevOps:", proyectos_disponibles)
+        print(f"No se encontraron proyectos en la organización '{org}'.")
+        return _preguntar_texto("No se encontraron proyectos. Introduce el nombre manualmente:")
     except Exception as e:
         print(f"⚠️ No se pudieron obtener los proyectos ({e}). Por favor, introduce el nombre manualmente.")
-        project = questionary.text("Introduce el nombre de tu proyecto:").ask()
+        return _preguntar_texto("Introduce el nombre de tu proyecto:")
 
-if not iteration_path:
+def _resolver_iteration_path():
+    if settings.iteration_path:
+        return settings.iteration_path
+    from src.azure.api import obtener_iterations
+    pat, org, project = _obtener("pat"), _obtener("org"), _obtener("project")
     try:
-        iterations_disponibles = obtener_iterations(project, org, pat)
+        iterations_disponibles = descubrimiento.obtener(
+            CacheDescubrimiento.clave("iteraciones", pat, org, project),
+            lambda: obtener_iterations(project, org, pat),
+        )
         if len(iterations_disponibles) == 1:
             iteration_path = iterations_disponibles[0]
             print(f"🗓️ Iteración encontrada y seleccionada automáticamente: {BLUE}{iteration_path}{ENDC}")
-        elif iterations_disponibles:
+            return iteration_path
+        if iterations_disponibles:
             # Crear un mapa entre el nombre amigable y la ruta completa
             mapa_iteraciones = {}
             for path in iterations_disponibles:
@@ -81,32 +109,40 @@ if not iteration_path:
                 # El segundo es el proyecto, el tercero es 'Iteration'. Nos quedamos con el resto.
                 nombre_amigable = ' > '.join(partes[3:]) if len(partes) > 3 else path
                 mapa_iteraciones[nombre_amigable] = path
-            
-            # Usar InquirerPy para un autocompletado que muestra todas las opciones al inicio
-            # y permite filtrar al escribir.
-            nombre_seleccionado = inquirer.fuzzy(
-                message="Busca o selecciona el Iteration Path:",
-                choices=list(mapa_iteraciones.keys()),
-                long_instruction="Usa las flechas para navegar, escribe para filtrar.",
-                vi_mode=True,
-                border=True,
-            ).execute()
 
-            iteration_path = mapa_iteraciones.get(nombre_seleccionado)
-        else:
-            print(f"No se encontraron iteraciones en el proyecto '{project}'.")
+            nombre_seleccionado = _seleccionar("Busca o selecciona el Iteration Path:", list(mapa_iteraciones.keys()))
+            return mapa_iteraciones.get(nombre_seleccionado)
+        print(f"No se encontraron iteraciones en el proyecto '{project}'.")
+        return None
     except Exception as e:
         print(f"⚠️ No se pudieron obtener las iteraciones ({e}). Por favor, introduce la ruta manualmente.")
-        iteration_path = questionary.text("Introduce el Iteration Path (Ej: Proyecto\\Sprint 1):").ask()
+        return _preguntar_texto("Introduce el Iteration Path (Ej: Proyecto\\Sprint 1):")
+
+def _resolver_gemini_api_key():
+    gemini_api_key = settings.gemini_api_key or _preguntar_secreto("Introduce tu API Key de Gemini (GEMINI_API_KEY):")
+    # Asegurarse de que la clave de API de Gemini esté disponible para subprocesos
+    if gemini_api_key:
+        os.environ['GEMINI_API_KEY'] = gemini_api_key
+    return gemini_api_key
 
-if not gemini_api_key:
-    gemini_api_key = questionary.password("Introduce tu API Key de Gemini (GEMINI_API_KEY):").ask()
+_RESOLVEDORES = {
+    "pat": _resolver_pat,
+    "org": _resolver_org,
+    "project": _resolver_project,
+    "iteration_path": _resolver_iteration_path,
+    "gemini_api_key": _resolver_gemini_api_key,
+}
 
-# Asegurarse de que la clave de API de Gemini esté disponible para subprocesos
-if gemini_api_key:
-    os.environ['GEMINI_API_KEY'] = gemini_api_key
+def _obtener(nombre):
+    # Dentro del módulo los nombres no resueltos no pasan por __getattr__, así que lo llamamos a mano.
+    return globals()[nombre] if nombre in globals() else __getattr__(nombre)
 
-ado_api_version = "7.0"
-max_historias = int(os.getenv("HISTORIAS_MAX", 7))
-dias_sprint = int(os.getenv("DIAS_SPRINT", 10))
-dias_complejidad = int(os.getenv("DIAS_COMPLEJIDAD", 2))
\ No newline at end of file
+def __getattr__(nombre):
+    """Resuelve un valor de configuración la primera vez que se accede a él (PEP 562)."""
+    resolvedor = _RESOLVEDORES.get(nombre)
+    if resolvedor is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+    valor = resolvedor()
+    # Al guardarlo como global del módulo, los siguientes accesos ya no pasan por __getattr__.
+    globals()[nombre] = valor
+    return valor
@@ -0,0 +1,57 @@
+import hashlib
+import json
+import os
+import time
+
+class CacheDescubrimiento:
+    """
+    Caché local con TTL para las listas de organizaciones, proyectos e iteraciones.
+
+    Los resultados se guardan en un archivo JSON por clave; el PAT nunca se guarda,
+    solo un hash para separar las entradas de distintos usuarios.
+    """
+    def __init__(self, ruta=".cache/descubrimiento.json", ttl=86400):
+        self.ruta = ruta
+        self.ttl = ttl
+
+    def _leer(self):
+        try:
+            with open(self.ruta, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _escribir(self, entradas):
+        directorio = os.path.dirname(self.ruta)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        temporal = f"{self.ruta}.tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(entradas, f, ensure_ascii=False)
+        os.replace(temporal, self.ruta)
+
+    @staticmethod
+    def clave(tipo, pat, *partes):
+        huella = hashlib.sha256((pat or "").encode("utf-8")).hexdigest()[:16]
+        return "|".join([tipo, huella, *partes])
+
+    def obtener(self, clave, funcion):
+        """Devuelve el valor cacheado si no ha vencido; si no, llama a `funcion` y lo guarda."""
+        entradas = self._leer()
+        entrada = entradas.get(clave)
+        if entrada and time.time() - entrada["guardado"] < self.ttl:
+            return entrada["valor"]
+
+        valor = funcion()
+        # Una lista vacía suele indicar un error de permisos o de red; no la cacheamos.
+        if valor:
+            entradas[clave] = {"guardado": time.time(), "valor": valor}
+            self._escribir(entradas)
+        return valor
+
+    def invalidar(self):
+        """Elimina todas las entradas, forzando a consultar Azure DevOps de nuevo."""
+        try:
+            os.remove(self.ruta)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,55 @@
+"""
+Configuración no interactiva, leída únicamente de variables de entorno (y del archivo .env).
+
+Este módulo no hace llamadas de red ni importa las librerías de prompts, así que
+puede usarse desde el modo batch sin ninguna interacción.
+"""
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Destino por defecto (el modo interactivo pregunta por los que falten)
+org = os.getenv("AZURE_ORG")
+project = os.getenv("AZURE_PROJECT")
+iteration_path = os.getenv("AZURE_ITERATION_PATH")
+pat = os.getenv("AZURE_PAT")
+gemini_api_key = os.getenv("GEMINI_API_KEY")
+
+# Parámetros de ejecución
+ado_api_version = "7.0"
+# Permiten apuntar a un Azure DevOps y a un gemini-cli alternativos (p. ej. los falsos de benchmarks/).
+ado_url_base = os.getenv("AZURE_DEVOPS_URL", "https://dev.azure.com")
+gemini_cli = os.getenv("GEMINI_CLI", "gemini")
+max_historias = int(os.getenv("HISTORIAS_MAX", 7))
+dias_sprint = int(os.getenv("DIAS_SPRINT", 10))
+dias_complejidad = int(os.getenv("DIAS_COMPLEJIDAD", 2))
+simulacion_escenarios = int(os.getenv("SIMULACION_ESCENARIOS", 100000))
+# Días de trabajo disponibles en el sprint para todo el equipo; 0 desactiva la probabilidad de cumplimiento.
+capacidad_sprint_dias = float(os.getenv("CAPACIDAD_SPRINT_DIAS", 0)) or None
+ado_max_workers = int(os.getenv("ADO_MAX_WORKERS", 4))
+# Cliente HTTP compartido de Azure DevOps: conexiones reutilizables, peticiones simultáneas por host y reintentos.
+ado_pool_conexiones = int(os.getenv("ADO_POOL_CONEXIONES", 16))
+ado_max_por_host = int(os.getenv("ADO_MAX_POR_HOST", 8))
+ado_reintentos = int(os.getenv("ADO_REINTENTOS", 5))
+sync_incremental = os.getenv("SYNC_INCREMENTAL", "false").lower() in ("1", "true", "si")
+# Backend de evaluación: 'cli' (gemini-cli) o 'api' (API REST de Gemini, sin lanzar procesos).
+evaluador = os.getenv("EVALUADOR", "cli")
+gemini_modelo = os.getenv("GEMINI_MODELO", "gemini-2.5-flash")
+gemini_api_url = os.getenv("GEMINI_API_URL", "https://generativelanguage.googleapis.com")
+gemini_tamano_lote = int(os.getenv("GEMINI_TAMANO_LOTE", 10))
+gemini_max_workers = int(os.getenv("GEMINI_MAX_WORKERS", 4))
+gemini_timeout = int(os.getenv("GEMINI_TIMEOUT", 300))
+gemini_reintentos = int(os.getenv("GEMINI_REINTENTOS", 1))
+# Rondas en las que se vuelven a pedir solo las historias sin evaluación válida.
+gemini_rondas_recuperacion = int(os.getenv("GEMINI_RONDAS_RECUPERACION", 2))
+# Similitud mínima (0-1) para que historias casi duplicadas compartan evaluación; 0 lo desactiva.
+similitud_umbral = float(os.getenv("SIMILITUD_UMBRAL", 0.9))
+prompt_max_tokens_historia = int(os.getenv("PROMPT_MAX_TOKENS_HISTORIA", 1500))
+prompt_max_tokens = int(os.getenv("PROMPT_MAX_TOKENS", 16000))
+cache_ruta = os.getenv("CACHE_EVALUACIONES", ".cache/evaluaciones.sqlite")
+cache_max_entradas = int(os.getenv("CACHE_MAX_ENTRADAS", 5000))
+cache_max_dias = int(os.getenv("CACHE_MAX_DIAS", 30))
+historial_ruta = os.getenv("HISTORIAL_EVALUACIONES", ".cache/historial.sqlite")
+descubrimiento_ruta = os.getenv("CACHE_DESCUBRIMIENTO", ".cache/descubrimiento.json")
+descubrimiento_ttl = int(os.getenv("DESCUBRIMIENTO_TTL", 86400))
\ No newline at end of file
@@ -0,0 +1,156 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from src.evaluation.gemini import VERSION_PROMPT, evaluar_historias_cli
+from src.logic.dependencias import describir_dependencias
+
+def clave_historia(historia, version_prompt=VERSION_PROMPT):
+    """Calcula la clave de contenido de una historia (título, descripción, criterios, dependencias y versión del prompt)."""
+    contenido = json.dumps(
+        [
+            version_prompt,
+            historia.get("titulo", ""),
+            historia.get("descripcion", ""),
+            historia.get("aceptacion_criterios", ""),
+            describir_dependencias(historia.get("dependencias")),
+        ],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(contenido.encode("utf-8")).hexdigest()
+
+def _estadisticas(aciertos, fallos):
+    total = aciertos + fallos
+    return {
+        "aciertos": aciertos,
+        "fallos": fallos,
+        "tasa_aciertos": round(aciertos / total, 3) if total else 0.0,
+    }
+
+class CacheEvaluaciones:
+    """
+    Caché persistente en SQLite de evaluaciones INVEST, direccionada por contenido.
+
+    max_entradas: número máximo de evaluaciones a conservar (se eliminan las menos usadas)
+    max_dias: antigüedad máxima de una evaluación antes de considerarla vencida
+    """
+    def __init__(self, ruta=".cache/evaluaciones.sqlite", max_entradas=5000, max_dias=30):
+        self.ruta = ruta
+        self.max_entradas = max_entradas
+        self.max_segundos = max_dias * 24 * 3600
+        self.aciertos = 0
+        self.fallos = 0
+        self._lock = threading.Lock()
+
+        directorio = os.path.dirname(ruta)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        self._conn = sqlite3.connect(ruta, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS evaluaciones (
+                clave TEXT PRIMARY KEY,
+                resultado TEXT NOT NULL,
+                creado REAL NOT NULL,
+                usado REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_evaluaciones_usado ON evaluaciones (usado)")
+        self._conn.commit()
+
+    def obtener(self, historia):
+        """Devuelve la evaluación cacheada de la historia, o None si no existe o está vencida."""
+        clave = clave_historia(historia)
+        ahora = time.time()
+        with self._lock:
+            fila = self._conn.execute(
+                "SELECT resultado, creado FROM evaluaciones WHERE clave = ?", (clave,)
+            ).fetchone()
+            if fila is None or ahora - fila[1] > self.max_segundos:
+                self.fallos += 1
+                return None
+            self._conn.execute("UPDATE evaluaciones SET usado = ? WHERE clave = ?", (ahora, clave))
+            self._conn.commit()
+            self.aciertos += 1
+
+        resultado = json.loads(fila[0])
+        # El contenido puede coincidir con otra historia, así que el ID siempre es el de la actual.
+        resultado["id"] = historia["id"]
+        return resultado
+
+    def guardar(self, historia, resultado):
+        """Guarda la evaluación de una historia."""
+        ahora = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO evaluaciones (clave, resultado, creado, usado) VALUES (?, ?, ?, ?)",
+                (clave_historia(historia), json.dumps(resultado, ensure_ascii=False), ahora, ahora),
+            )
+            self._conn.commit()
+
+    def purgar(self):
+        """Elimina las entradas vencidas y, si se supera el límite, las menos usadas recientemente."""
+        with self._lock:
+            self._conn.execute("DELETE FROM evaluaciones WHERE creado < ?", (time.time() - self.max_segundos,))
+            self._conn.execute(
+                """
+                DELETE FROM evaluaciones WHERE clave IN (
+                    SELECT clave FROM evaluaciones ORDER BY usado DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entradas,),
+            )
+            self._conn.commit()
+
+    def estadisticas(self):
+        """Devuelve los contadores de aciertos y fallos acumulados desde que se abrió la caché."""
+        return _estadisticas(self.aciertos, self.fallos)
+
+    def cerrar(self):
+        self._conn.close()
+
+def evaluar_historias_con_cache(historias, cache, *args, al_resultado=None, evaluador=evaluar_historias_cli,
+                                estadisticas=None, **kwargs):
+    """
+    Evalúa las historias consultando primero la caché.
+
+    Solo las historias sin evaluación cacheada se envían al `evaluador` (por defecto
+    gemini-cli); el resto de argumentos se le pasan tal cual. Si se indica `al_resultado`, se
+    invoca con cada evaluación cacheada de inmediato y con las nuevas según llegan.
+
+    Si se indica el diccionario `estadisticas`, se rellena con los aciertos y fallos de esta
+    llamada; los de la caché son los acumulados de todas las llamadas, que pueden solaparse.
+    """
+    cacheados = {}
+    pendientes = []
+    for h in historias:
+        resultado = cache.obtener(h)
+        if resultado is not None:
+            cacheados[str(h["id"])] = resultado
+            if al_resultado:
+                al_resultado(resultado)
+        else:
+            pendientes.append(h)
+    if estadisticas is not None:
+        estadisticas.update(_estadisticas(len(cacheados), len(pendientes)))
+
+    nuevos = {}
+    if pendientes:
+        pendientes_map = {str(h["id"]): h for h in pendientes}
+        for r in evaluador(pendientes, *args, al_resultado=al_resultado, **kwargs):
+            historia = pendientes_map.get(str(r.get("id")))
+            if historia is not None:
+                cache.guardar(historia, r)
+                nuevos[str(historia["id"])] = r
+        cache.purgar()
+
+    resultados = []
+    for h in historias:
+        r = cacheados.get(str(h["id"])) or nuevos.get(str(h["id"]))
+        if r is not None:
+            resultados.append(r)
+    return resultados
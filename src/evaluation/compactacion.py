@@ -0,0 +1,134 @@
+import math
+import re
+
+# Aproximación habitual para texto en español/inglés: ~4 caracteres por token.
+CARACTERES_POR_TOKEN = 4
+
+# Filas que se conservan de cada tabla pegada en la descripción.
+MAX_FILAS_TABLA = 8
+
+_MARCA_TRUNCADO = " […]"
+
+# El base64 puede venir partido en líneas (de 64 o 76 caracteres), pero nunca lleva espacios.
+# Para no comerse la prosa que sigue a la URI, cada línea de continuación debe ser
+# larga o terminar con el relleno '=' del final.
+_RE_DATA_URI = re.compile(
+    r"data:[\w.+-]+/[\w.+-]+;base64,[A-Za-z0-9+/=]*"
+    r"(?:\r?\n(?:[A-Za-z0-9+/]{16,}=*|[A-Za-z0-9+/]*=+)(?=\s|$))*"
+)
+_RE_IMAGEN_MD = re.compile(r"!\[([^\]]*)\]\([^)]*\)")
+_RE_IMAGEN_HTML = re.compile(r"<img\b[^>]*>", re.IGNORECASE)
+_RE_ENLACE_MD = re.compile(r"\[([^\]]*)\]\((?:[^()\s]|\([^()]*\))*\)")
+_RE_ENLACE_AUTO = re.compile(r"<(https?://[^>\s]+)>")
+_RE_INVISIBLES = re.compile(r"[\u200b\u200c\u200d\ufeff\xa0]")
+_RE_ESPACIOS = re.compile(r"[ \t]+")
+_RE_LINEAS_VACIAS = re.compile(r"\n{3,}")
+# Separadores y marcas vacías que html2text deja y que no aportan nada al modelo.
+_RE_RELLENO = re.compile(r"^\s*(?:[-*_]\s*){3,}$|^\s*#+\s*$|^\s*(?:\*\*|__)\s*(?:\*\*|__)?\s*$")
+
+def estimar_tokens(texto):
+    return math.ceil(len(texto) / CARACTERES_POR_TOKEN)
+
+def _recortar_tablas(lineas):
+    """Conserva las primeras filas de cada tabla y resume el resto."""
+    resultado = []
+    filas_tabla = 0
+    omitidas = 0
+    for linea in lineas + [""]:
+        if "|" in linea:
+            filas_tabla += 1
+            if filas_tabla <= MAX_FILAS_TABLA:
+                resultado.append(linea)
+            else:
+                omitidas += 1
+            continue
+        if omitidas:
+            resultado.append(f"[… {omitidas} filas de la tabla omitidas]")
+        filas_tabla = 0
+        omitidas = 0
+        resultado.append(linea)
+    return resultado[:-1]
+
+def compactar_texto(texto):
+    """
+    Reduce el texto de una historia sin cambiar su significado para la evaluación:
+    elimina imágenes y data URIs, deja solo el texto de los enlaces, recorta tablas
+    largas y colapsa espacios, separadores y líneas vacías.
+    """
+    if not texto:
+        return ""
+    texto = _RE_DATA_URI.sub("", texto)
+    texto = _RE_IMAGEN_MD.sub(lambda m: f"[imagen: {m.group(1)}]" if m.group(1).strip() else "", texto)
+    texto = _RE_IMAGEN_HTML.sub("", texto)
+    texto = _RE_ENLACE_MD.sub(r"\1", texto)
+    texto = _RE_ENLACE_AUTO.sub(r"\1", texto)
+    texto = _RE_INVISIBLES.sub(" ", texto)
+
+    lineas = []
+    for linea in texto.splitlines():
+        linea = _RE_ESPACIOS.sub(" ", linea).strip()
+        if _RE_RELLENO.match(linea):
+            continue
+        lineas.append(linea)
+    texto = "\n".join(_recortar_tablas(lineas))
+    return _RE_LINEAS_VACIAS.sub("\n\n", texto).strip()
+
+def _truncar(texto, max_caracteres):
+    """Trunca de forma determinista en el último espacio antes del límite."""
+    if len(texto) <= max_caracteres:
+        return texto
+    corte = texto.rfind(" ", 0, max_caracteres - len(_MARCA_TRUNCADO))
+    if corte <= 0:
+        corte = max(0, max_caracteres - len(_MARCA_TRUNCADO))
+    return texto[:corte].rstrip() + _MARCA_TRUNCADO
+
+def _bytes(historia):
+    return sum(len(historia.get(c, "").encode("utf-8")) for c in ("titulo", "descripcion", "aceptacion_criterios"))
+
+def compactar_historias(historias, max_tokens_historia=1500, max_tokens_prompt=16000, tamano_lote=10):
+    """
+    Etapa entre la descarga y la evaluación: compacta el texto de cada historia y
+    aplica un presupuesto de tokens por historia y por prompt.
+
+    El presupuesto efectivo por historia es el menor entre `max_tokens_historia` y la
+    parte que le corresponde del prompt (`max_tokens_prompt / tamano_lote`). Si una
+    historia lo supera, la descripción y los criterios se truncan: cada uno tiene
+    garantizada la mitad del presupuesto y lo que uno no usa lo puede usar el otro.
+
+    Devuelve (historias_compactadas, estadisticas). Las historias originales no se modifican.
+    """
+    presupuesto_tokens = min(max_tokens_historia, max_tokens_prompt // max(1, tamano_lote))
+    compactadas = []
+    truncadas = 0
+    bytes_originales = 0
+    bytes_compactados = 0
+
+    for h in historias:
+        descripcion = compactar_texto(h.get("descripcion", ""))
+        criterios = compactar_texto(h.get("aceptacion_criterios", ""))
+
+        presupuesto = max(0, presupuesto_tokens * CARACTERES_POR_TOKEN - len(h.get("titulo", "")))
+        if len(descripcion) + len(criterios) > presupuesto:
+            mitad = presupuesto // 2
+            limite_descripcion = max(mitad, presupuesto - len(criterios))
+            limite_criterios = max(mitad, presupuesto - len(descripcion))
+            descripcion = _truncar(descripcion, limite_descripcion)
+            criterios = _truncar(criterios, limite_criterios)
+            truncadas += 1
+
+        nueva = {**h, "descripcion": descripcion, "aceptacion_criterios": criterios}
+        compactadas.append(nueva)
+        bytes_originales += _bytes(h)
+        bytes_compactados += _bytes(nueva)
+
+    estadisticas = {
+        "bytes_originales": bytes_originales,
+        "bytes_compactados": bytes_compactados,
+        "bytes_ahorrados": bytes_originales - bytes_compactados,
+        "porcentaje_ahorro": round(100 * (1 - bytes_compactados / bytes_originales), 1) if bytes_originales else 0.0,
+        "historias_truncadas": truncadas,
+        "tokens_estimados": sum(
+            estimar_tokens(h["titulo"] + h["descripcion"] + h["aceptacion_criterios"]) for h in compactadas
+        ),
+    }
+    return compactadas, estadisticas
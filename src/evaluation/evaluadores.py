@@ -0,0 +1,35 @@
+"""
+Evaluadores de historias disponibles, seleccionables con EVALUADOR.
+
+Todos comparten la firma de evaluar_historias_cli:
+    evaluador(historias, tamano_lote, max_workers, timeout, reintentos, al_resultado=None) -> list
+y devuelven las evaluaciones en el orden de las historias. Cada backend se importa
+solo cuando se elige, así httpx no se carga si se usa la CLI.
+"""
+from functools import partial
+
+from src.evaluation.validacion import evaluar_con_recuperacion
+
+def _cli():
+    from src.evaluation.gemini import evaluar_historias_cli
+    return evaluar_historias_cli
+
+def _api():
+    from src.evaluation.gemini_api import evaluar_historias_api
+    return evaluar_historias_api
+
+EVALUADORES = {
+    "cli": _cli,
+    "api": _api,
+}
+
+def obtener_evaluador(nombre, rondas_recuperacion=2):
+    """
+    Devuelve la función evaluadora para `nombre` ('cli' o 'api').
+
+    Se envuelve para validar cada evaluación por separado y volver a pedir, hasta
+    `rondas_recuperacion` veces, solo las historias que falten o lleguen mal formadas.
+    """
+    if nombre not in EVALUADORES:
+        raise ValueError(f"Evaluador desconocido '{nombre}'. Opciones: {', '.join(EVALUADORES)}.")
+    return partial(evaluar_con_recuperacion, EVALUADORES[nombre](), rondas=rondas_recuperacion)
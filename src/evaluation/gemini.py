@@ -1,24 +1,34 @@
 import subprocess
 import json
-import re
+import shlex
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-def evaluar_historias_cli(historias):
-    """
-    Evalúa una lista de historias de usuario usando gemini-cli.
-    
-    Solicita a Gemini que evalúe todas las historias en un solo prompt
-    y devuelva un array de JSON.
-    """
+from src.config import settings
+from src.logic.dependencias import describir_dependencias
+from src.utils.metricas import en_contexto, metricas
+
+# Incrementar cuando cambie el texto del prompt, para invalidar evaluaciones cacheadas.
+VERSION_PROMPT = "2"
+
+CRITERIOS_INVEST = ["Independiente", "Negociable", "Valiosa", "Estimable", "Pequeña", "Testeable"]
+
+def _construir_prompt(historias):
+    """Construye el prompt INVEST para un grupo de historias."""
     historias_str = ""
     for h in historias:
+        dependencias = describir_dependencias(h.get('dependencias'))
         historias_str += f"""
 ---
 Historia ID: {h['id']}
 Título: {h['titulo']}
 Descripción: {h['descripcion']}
 Criterios de Aceptación: {h['aceptacion_criterios']}
----
 """
+        if dependencias:
+            historias_str += f"Dependencias en Azure DevOps: {dependencias}\n"
+        historias_str += "---\n"
 
     prompt = f"""
 Eres un experto en gestión de historias de usuario y en paneles de Azure DevOps.
@@ -31,6 +41,9 @@ Para cada historia, proporciona:
 4. Un valor de complejidad (1 = muy simple, 2.5 = normal, 5 = muy compleja).
 5. Una lista de posibles mejoras o recomendaciones para optimizar la historia.
 
+Las "Dependencias en Azure DevOps" son los enlaces reales de la historia (los números son IDs de work items).
+Úsalas para evaluar el criterio Independiente; si una historia no las incluye, no tiene enlaces registrados.
+
 Responde exclusivamente con un array de objetos JSON. Cada objeto del array debe corresponder a una historia de usuario y tener la siguiente estructura:
 {{
   "id": <ID de la historia>,
@@ -50,33 +63,206 @@ Responde exclusivamente con un array de objetos JSON. Cada objeto del array debe
 Aquí están las historias a evaluar:
 {historias_str}
 """
+    return prompt
+
+class _ExtractorObjetos:
+    """
+    Extrae objetos JSON de nivel superior a medida que llega texto de la CLI.
+
+    Lleva la cuenta de llaves (ignorando las que aparecen dentro de cadenas) para
+    detectar cuándo un objeto está completo, sin esperar al cierre del array.
+    """
+    def __init__(self):
+        self._buffer = []
+        self._profundidad = 0
+        self._en_cadena = False
+        self._escape = False
+
+    def alimentar(self, texto):
+        """Procesa un fragmento de texto y devuelve la lista de objetos completados en él."""
+        objetos = []
+        for c in texto:
+            if self._profundidad == 0:
+                if c == '{':
+                    self._buffer = [c]
+                    self._profundidad = 1
+                continue
+
+            self._buffer.append(c)
+            if self._en_cadena:
+                if self._escape:
+                    self._escape = False
+                elif c == '\\':
+                    self._escape = True
+                elif c == '"':
+                    self._en_cadena = False
+            elif c == '"':
+                self._en_cadena = True
+            elif c == '{':
+                self._profundidad += 1
+            elif c == '}':
+                self._profundidad -= 1
+                if self._profundidad == 0:
+                    try:
+                        objetos.append(json.loads(''.join(self._buffer)))
+                    except json.JSONDecodeError:
+                        # Texto entre llaves que no es JSON (p. ej. prosa de la CLI); se descarta.
+                        pass
+                    self._buffer = []
+        return objetos
+
+def _ejecutar_gemini(prompt, timeout, al_objeto):
+    """
+    Ejecuta gemini-cli leyendo su salida por una tubería y notifica cada objeto JSON completo.
+
+    Devuelve la lista de objetos extraídos. Lanza subprocess.TimeoutExpired o
+    subprocess.CalledProcessError igual que subprocess.run.
+    """
+    proceso = subprocess.Popen(
+        [*shlex.split(settings.gemini_cli), '-p', prompt],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, encoding='utf-8',
+    )
+    # stderr se drena en otro hilo para que el proceso no se bloquee si la tubería se llena.
+    errores = []
+    lector_errores = threading.Thread(target=lambda: errores.append(proceso.stderr.read()), daemon=True)
+    lector_errores.start()
+    temporizador = threading.Timer(timeout, proceso.kill)
+    temporizador.start()
+
+    extractor = _ExtractorObjetos()
+    objetos = []
+    inicio = time.perf_counter()
+    bytes_respuesta = 0
+    segundos_parseo = 0.0
     try:
+        for linea in proceso.stdout:
+            bytes_respuesta += len(linea.encode('utf-8'))
+            inicio_parseo = time.perf_counter()
+            nuevos = extractor.alimentar(linea)
+            segundos_parseo += time.perf_counter() - inicio_parseo
+            for obj in nuevos:
+                objetos.append(obj)
+                al_objeto(obj)
+        proceso.wait()
+    finally:
+        expirado = not temporizador.is_alive()
+        temporizador.cancel()
+        if proceso.poll() is None:
+            # La lectura se interrumpió (p. ej. `al_objeto` lanzó una excepción): no dejar el proceso vivo.
+            proceso.kill()
+            proceso.wait()
+        proceso.stdout.close()
+        lector_errores.join()
+        # 'llm' incluye la espera de la CLI; 'parseo' es solo el tiempo de extracción de los objetos.
+        metricas.registrar("llm", time.perf_counter() - inicio, len(objetos), bytes_respuesta)
+        metricas.registrar("parseo", segundos_parseo, len(objetos), bytes_respuesta)
+
+    if expirado and proceso.returncode != 0:
+        raise subprocess.TimeoutExpired(proceso.args, timeout)
+    if proceso.returncode != 0:
+        raise subprocess.CalledProcessError(proceso.returncode, proceso.args, stderr=''.join(errores))
+    return objetos
+
+def _evaluar_lote(historias, timeout, reintentos, al_resultado):
+    """
+    Evalúa un grupo de historias con una invocación de gemini-cli.
+
+    Cada lote tiene su propio timeout y se reintenta de forma independiente,
+    de modo que un lote fallido no invalida el resto de la ejecución.
+    """
+    with metricas.etapa("prompt", elementos=len(historias)) as conteo:
+        prompt = _construir_prompt(historias)
+        conteo["bytes"] = len(prompt.encode('utf-8'))
+    ids = [h['id'] for h in historias]
+    # Se conservan los objetos recibidos aunque el proceso falle después, porque ya se notificaron.
+    obtenidos = {}
 
-        result = subprocess.run(['gemini', '-p', prompt], capture_output=True, text=True, check=True)
-        raw_output = result.stdout.strip()
-
-        # Usar una expresión regular para encontrar el bloque JSON y eliminar los acentos graves
-        match = re.search(r'```json\s*(\[.*?\])\s*```', raw_output, re.DOTALL)
-        
-        if not match:
-            # Si no se encuentra un JSON válido con el formato de cerca de código,
-            # intentamos buscar un JSON plano como respaldo.
-            match = re.search(r'\[\s*\{.*?\}\s*\]', raw_output, re.DOTALL)
-            if not match:
-                raise ValueError("No se pudo encontrar un JSON válido en la salida de la CLI.")
-            
-        json_output = match.group(1).strip()
-        
-        return json.loads(json_output)
+    def al_objeto(obj):
+        if isinstance(obj, dict) and 'id' in obj:
+            obtenidos.setdefault(str(obj['id']), obj)
+        al_resultado(obj)
 
+    for intento in range(1, reintentos + 2):
+        try:
+            if _ejecutar_gemini(prompt, timeout, al_objeto):
+                break
+            print(f"Error: no se encontró un JSON válido en la respuesta para las historias {ids} (intento {intento}).")
+        except subprocess.TimeoutExpired:
+            print(f"⚠️ Tiempo agotado evaluando las historias {ids} (intento {intento}).")
+        except subprocess.CalledProcessError as e:
+            print(f"Error al ejecutar gemini-cli para las historias {ids} (intento {intento}): {e.stderr}")
+
+    return list(obtenidos.values())
+
+def _es_valida(obj):
+    # Importación diferida: validacion importa CRITERIOS_INVEST de este módulo.
+    from src.evaluation.validacion import validar_evaluacion
+    return not validar_evaluacion(obj)
+
+def _notificador(historias, al_resultado):
+    """
+    Envuelve `al_resultado` para que solo se invoque con historias esperadas y, para las
+    evaluaciones válidas, una vez por ID aunque un reintento repita historias ya notificadas.
+
+    Las mal formadas se pasan sin marcar el ID, así una válida posterior para la misma
+    historia no se pierde. Es seguro entre hilos.
+    """
+    ids_esperados = {str(h['id']) for h in historias}
+    notificados = set()
+    lock = threading.Lock()
+
+    def notificar(obj):
+        if al_resultado is None or not isinstance(obj, dict) or str(obj.get('id')) not in ids_esperados:
+            return
+        if _es_valida(obj):
+            with lock:
+                if str(obj['id']) in notificados:
+                    return
+                notificados.add(str(obj['id']))
+        al_resultado(obj)
+
+    return notificar
+
+def _combinar_resultados(historias, resultados_lotes):
+    """
+    Une los resultados de todos los lotes en el orden original de las historias y sin duplicados
+    por ID. Si una historia llegó varias veces, se prefiere la primera evaluación válida.
+    """
+    resultados_por_id = {}
+    for resultados in resultados_lotes:
+        for r in resultados:
+            if isinstance(r, dict) and 'id' in r:
+                actual = resultados_por_id.get(str(r['id']))
+                if actual is None or (not _es_valida(actual) and _es_valida(r)):
+                    resultados_por_id[str(r['id'])] = r
+
+    return [resultados_por_id[str(h['id'])] for h in historias if str(h['id']) in resultados_por_id]
+
+def evaluar_historias_cli(historias, tamano_lote=10, max_workers=4, timeout=300, reintentos=1, al_resultado=None):
+    """
+    Evalúa una lista de historias de usuario usando gemini-cli.
+    
+    Divide las historias en lotes de `tamano_lote` y los evalúa con un pool de
+    `max_workers` procesos de gemini-cli en paralelo. Los resultados se combinan
+    en una sola lista, en el orden original y sin duplicados por ID de historia.
+
+    Si se indica `al_resultado`, se invoca con cada evaluación en cuanto su objeto
+    JSON termina de llegar, sin esperar al resto del lote.
+    """
+    if not historias:
+        return []
+
+    notificar = _notificador(historias, al_resultado)
+    tamano_lote = max(1, tamano_lote)
+    lotes = [historias[i:i + tamano_lote] for i in range(0, len(historias), tamano_lote)]
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(lotes)))) as executor:
+            resultados_lotes = list(executor.map(
+                en_contexto(lambda lote: _evaluar_lote(lote, timeout, reintentos, notificar)), lotes
+            ))
     except FileNotFoundError:
         print("Error: gemini-cli no se encontró. Asegúrate de que esté instalado y en tu PATH.")
         return []
-    except subprocess.CalledProcessError as e:
-        print(f"Error al ejecutar gemini-cli: {e.stderr}")
-        return []
-    except json.JSONDecodeError as e:
-        print(f"Error al decodificar el JSON de la respuesta: {e}")
-        print("Respuesta recibida:")
-        print(json_output)
-        return []
\ No newline at end of file
+
+    return _combinar_resultados(historias, resultados_lotes)
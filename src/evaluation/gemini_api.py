@@ -0,0 +1,171 @@
+import asyncio
+import json
+import os
+import threading
+import time
+
+import httpx
+
+from src.config import settings
+from src.evaluation.gemini import (
+    CRITERIOS_INVEST,
+    _ExtractorObjetos,
+    _combinar_resultados,
+    _construir_prompt,
+    _notificador,
+)
+from src.utils.metricas import metricas
+from src.utils.reintentos import ESTADOS_REINTENTABLES, espera_reintento
+
+# Esquema de la respuesta en modo JSON estructurado: el modelo solo puede devolver esto.
+_ESQUEMA_RESPUESTA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {
+            "id": {"type": "INTEGER"},
+            "titulo": {"type": "STRING"},
+            "evaluacion_invest": {
+                "type": "OBJECT",
+                "properties": {
+                    criterio: {
+                        "type": "OBJECT",
+                        "properties": {"puntaje": {"type": "INTEGER"}, "justificacion": {"type": "STRING"}},
+                        "required": ["puntaje", "justificacion"],
+                    }
+                    for criterio in CRITERIOS_INVEST
+                },
+                "required": CRITERIOS_INVEST,
+            },
+            "complejidad": {"type": "NUMBER"},
+            "posibles_mejoras": {"type": "ARRAY", "items": {"type": "STRING"}},
+        },
+        "required": ["id", "titulo", "evaluacion_invest", "complejidad", "posibles_mejoras"],
+    },
+}
+
+# === Cliente compartido ===
+# httpx.AsyncClient queda ligado al bucle de eventos en que se usa, y asyncio.run crea uno
+# nuevo en cada llamada. Para que todas las llamadas (rondas de recuperación, objetivos del
+# modo batch) reutilicen las mismas conexiones, las corrutinas se ejecutan en un único bucle
+# que vive en un hilo de fondo mientras viva el proceso.
+_bucle = None
+_bucle_lock = threading.Lock()
+_clientes = {}
+
+def _bucle_compartido():
+    global _bucle
+    with _bucle_lock:
+        if _bucle is None:
+            _bucle = asyncio.new_event_loop()
+            threading.Thread(target=_bucle.run_forever, name="gemini-api", daemon=True).start()
+        return _bucle
+
+def _obtener_cliente(url_base, api_key, max_workers):
+    """Cliente HTTP compartido por URL y API key. Solo se usa desde el bucle compartido."""
+    clave = (url_base, api_key)
+    if clave not in _clientes:
+        # El número de peticiones en vuelo lo limita el semáforo de cada llamada; el pool
+        # conserva abiertas (keep-alive) las conexiones de al menos una llamada completa.
+        limites = httpx.Limits(max_connections=None, max_keepalive_connections=max_workers)
+        _clientes[clave] = httpx.AsyncClient(base_url=url_base, headers={"x-goog-api-key": api_key}, limits=limites)
+    return _clientes[clave]
+
+async def _solicitar(cliente, url, cuerpo, reintentos, timeout):
+    """POST con reintentos ante 429/5xx y errores de red. Los errores definitivos lanzan httpx.HTTPError."""
+    for intento in range(reintentos + 1):
+        resp = None
+        try:
+            resp = await cliente.post(url, json=cuerpo, timeout=timeout)
+        except httpx.TransportError:
+            if intento == reintentos:
+                raise
+        else:
+            if resp.status_code not in ESTADOS_REINTENTABLES or intento == reintentos:
+                resp.raise_for_status()
+                return resp
+        await asyncio.sleep(espera_reintento(resp.headers if resp is not None else None, intento))
+
+def _objetos_respuesta(datos):
+    """Extrae los objetos de evaluación del texto de la respuesta de generateContent."""
+    texto = "".join(
+        parte.get("text", "")
+        for candidato in datos.get("candidates", [])[:1]
+        for parte in candidato.get("content", {}).get("parts", [])
+    )
+    try:
+        objetos = json.loads(texto)
+        return objetos if isinstance(objetos, list) else [objetos]
+    except json.JSONDecodeError:
+        # Respuesta truncada o con texto alrededor: se rescatan los objetos completos.
+        return _ExtractorObjetos().alimentar(texto)
+
+async def _evaluar_lote(cliente, semaforo, url, historias, timeout, reintentos, notificar):
+    ids = [h['id'] for h in historias]
+    async with semaforo:
+        with metricas.etapa("prompt", elementos=len(historias)) as conteo:
+            prompt = _construir_prompt(historias)
+            conteo["bytes"] = len(prompt.encode('utf-8'))
+        cuerpo = {
+            "contents": [{"role": "user", "parts": [{"text": prompt}]}],
+            "generationConfig": {"responseMimeType": "application/json", "responseSchema": _ESQUEMA_RESPUESTA},
+        }
+
+        inicio = time.perf_counter()
+        try:
+            resp = await _solicitar(cliente, url, cuerpo, reintentos, timeout)
+        except httpx.HTTPError as e:
+            print(f"Error al llamar a la API de Gemini para las historias {ids}: {e}")
+            return []
+        metricas.registrar("llm", time.perf_counter() - inicio, len(historias), len(resp.content))
+
+    with metricas.etapa("parseo", bytes=len(resp.content)) as conteo:
+        try:
+            datos = resp.json()
+        except ValueError:
+            datos = None
+        if not isinstance(datos, dict):
+            # P. ej. una página de error HTML de un proxy con estado 200: se pierde solo este lote.
+            print(f"Respuesta no válida de la API de Gemini para las historias {ids}: "
+                  f"{resp.text[:200]!r}")
+            return []
+        objetos = _objetos_respuesta(datos)
+        conteo["elementos"] = len(objetos)
+    for obj in objetos:
+        notificar(obj)
+    return objetos
+
+async def _evaluar_historias(historias, tamano_lote, max_workers, timeout, reintentos, notificar,
+                             modelo, url_base, api_key):
+    lotes = [historias[i:i + tamano_lote] for i in range(0, len(historias), tamano_lote)]
+    url = f"/v1beta/models/{modelo}:generateContent"
+    semaforo = asyncio.Semaphore(max_workers)
+    cliente = _obtener_cliente(url_base, api_key, max_workers)
+    return await asyncio.gather(
+        *(_evaluar_lote(cliente, semaforo, url, lote, timeout, reintentos, notificar) for lote in lotes)
+    )
+
+def evaluar_historias_api(historias, tamano_lote=10, max_workers=4, timeout=300, reintentos=1, al_resultado=None,
+                          modelo=None, url_base=None, api_key=None):
+    """
+    Evalúa las historias llamando directamente a la API REST de Gemini, sin lanzar procesos.
+
+    Misma firma y mismo resultado que evaluar_historias_cli. Los lotes se envían de forma
+    asíncrona por un cliente HTTP con pool de conexiones compartido por todas las llamadas
+    del proceso, con como mucho `max_workers` peticiones en vuelo por llamada, y la respuesta
+    se pide en modo JSON estructurado.
+    """
+    if not historias:
+        return []
+    api_key = api_key or settings.gemini_api_key or os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        print("Error: falta GEMINI_API_KEY para usar la API de Gemini.")
+        return []
+
+    # run_coroutine_threadsafe conserva el contexto de quien llama (p. ej. el ámbito de métricas).
+    resultados_lotes = asyncio.run_coroutine_threadsafe(_evaluar_historias(
+        historias, max(1, tamano_lote), max(1, max_workers), timeout, reintentos,
+        _notificador(historias, al_resultado),
+        modelo or settings.gemini_modelo, (url_base or settings.gemini_api_url).rstrip("/"), api_key,
+    ), _bucle_compartido()).result()
+    return _combinar_resultados(historias, resultados_lotes)
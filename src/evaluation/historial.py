@@ -0,0 +1,205 @@
+import json
+import os
+import pathlib
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+def _numero(valor):
+    try:
+        return float(valor)
+    except (TypeError, ValueError):
+        return None
+
+def _promedio_invest(resultado):
+    puntajes = _puntajes(resultado)
+    return sum(puntajes.values()) / len(puntajes) if puntajes else None
+
+def _puntajes(resultado):
+    evaluacion = resultado.get("evaluacion_invest") or {}
+    puntajes = {}
+    for criterio, valor in evaluacion.items():
+        puntaje = _numero(valor.get("puntaje")) if isinstance(valor, dict) else None
+        if puntaje is not None:
+            puntajes[criterio] = puntaje
+    return puntajes
+
+def _fecha_iso(segundos):
+    return datetime.fromtimestamp(segundos, timezone.utc).isoformat(timespec="seconds")
+
+def _segundos(fecha):
+    """Convierte una fecha ISO ('2024-05-01' o con hora) a segundos desde la época, en UTC."""
+    valor = datetime.fromisoformat(fecha.replace("Z", "+00:00"))
+    if valor.tzinfo is None:
+        valor = valor.replace(tzinfo=timezone.utc)
+    return valor.timestamp()
+
+class HistorialEvaluaciones:
+    """
+    Historial persistente (solo de inserción) en SQLite de todas las evaluaciones.
+
+    Cada ejecución añade una fila por historia evaluada; nunca se modifica ni se borra
+    nada. Los índices por historia, por sprint y por fecha hacen que la evolución de una
+    historia se resuelva sin recorrer la tabla completa. Además, cada ejecución guarda
+    las sumas de sus evaluaciones, así que las tendencias por sprint se agregan sobre
+    una fila por ejecución y no sobre todas las evaluaciones.
+
+    Con `solo_lectura` (el dashboard) se abre un historial existente sin crearlo ni modificarlo.
+    """
+    def __init__(self, ruta=".cache/historial.sqlite", solo_lectura=False):
+        self.ruta = ruta
+        self._lock = threading.Lock()
+
+        if solo_lectura:
+            uri = pathlib.Path(ruta).resolve().as_uri() + "?mode=ro"
+            self._conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            return
+
+        directorio = os.path.dirname(ruta)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        self._conn = sqlite3.connect(ruta, check_same_thread=False)
+        # WAL permite que el dashboard lea mientras otra ejecución está escribiendo.
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS ejecuciones (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                fecha REAL NOT NULL,
+                organizacion TEXT,
+                proyecto TEXT,
+                sprint TEXT,
+                evaluaciones INTEGER NOT NULL,
+                suma_invest REAL,
+                con_invest INTEGER NOT NULL,
+                suma_complejidad REAL,
+                con_complejidad INTEGER NOT NULL,
+                suma_estimacion_dias REAL,
+                con_estimacion_dias INTEGER NOT NULL,
+                metadata TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS evaluaciones (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ejecucion INTEGER NOT NULL REFERENCES ejecuciones (id),
+                historia_id INTEGER NOT NULL,
+                organizacion TEXT,
+                proyecto TEXT,
+                sprint TEXT,
+                fecha REAL NOT NULL,
+                titulo TEXT,
+                invest REAL,
+                complejidad REAL,
+                estimacion_dias REAL,
+                puntajes TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_evaluaciones_historia ON evaluaciones (historia_id, fecha);
+            CREATE INDEX IF NOT EXISTS idx_evaluaciones_sprint ON evaluaciones (sprint, fecha);
+            CREATE INDEX IF NOT EXISTS idx_evaluaciones_fecha ON evaluaciones (fecha);
+            CREATE INDEX IF NOT EXISTS idx_ejecuciones_fecha ON ejecuciones (fecha);
+            CREATE INDEX IF NOT EXISTS idx_ejecuciones_sprint ON ejecuciones (sprint, fecha);
+            """
+        )
+        self._conn.commit()
+
+    def registrar_ejecucion(self, metadata, resultados, fecha=None):
+        """Añade una ejecución y todas sus evaluaciones en una sola transacción. Devuelve el ID de la ejecución."""
+        fecha = fecha or time.time()
+        org, proyecto, sprint = metadata.get("organizacion"), metadata.get("proyecto"), metadata.get("sprint")
+        filas = [
+            (int(r["id"]), r.get("titulo"), _promedio_invest(r), _numero(r.get("complejidad")),
+             _numero(r.get("estimacion_dias")),
+             json.dumps(_puntajes(r), ensure_ascii=False))
+            for r in resultados if "id" in r
+        ]
+
+        sumas = []
+        for columna in (2, 3, 4):
+            valores = [f[columna] for f in filas if f[columna] is not None]
+            sumas += [sum(valores) if valores else None, len(valores)]
+
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                """
+                INSERT INTO ejecuciones (fecha, organizacion, proyecto, sprint, evaluaciones,
+                                         suma_invest, con_invest, suma_complejidad, con_complejidad,
+                                         suma_estimacion_dias, con_estimacion_dias, metadata)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (fecha, org, proyecto, sprint, len(filas), *sumas, json.dumps(metadata, ensure_ascii=False)),
+            )
+            ejecucion = cursor.lastrowid
+            self._conn.executemany(
+                """
+                INSERT INTO evaluaciones (ejecucion, historia_id, organizacion, proyecto, sprint, fecha,
+                                          titulo, invest, complejidad, estimacion_dias, puntajes)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [(ejecucion, f[0], org, proyecto, sprint, fecha, *f[1:]) for f in filas],
+            )
+        return ejecucion
+
+    def historia(self, historia_id, organizacion=None, proyecto=None):
+        """Evolución de las evaluaciones de una historia, de la más antigua a la más reciente."""
+        consulta = """
+            SELECT fecha, organizacion, proyecto, sprint, titulo, invest, complejidad, estimacion_dias, puntajes
+            FROM evaluaciones WHERE historia_id = ?
+        """
+        parametros = [int(historia_id)]
+        if organizacion:
+            consulta += " AND organizacion = ?"
+            parametros.append(organizacion)
+        if proyecto:
+            consulta += " AND proyecto = ?"
+            parametros.append(proyecto)
+        with self._lock:
+            filas = self._conn.execute(consulta + " ORDER BY fecha", parametros).fetchall()
+        return [
+            {
+                "fecha": _fecha_iso(f[0]), "organizacion": f[1], "proyecto": f[2], "sprint": f[3], "titulo": f[4],
+                "invest": f[5], "complejidad": f[6], "estimacion_dias": f[7], "puntajes": json.loads(f[8]),
+            }
+            for f in filas
+        ]
+
+    def tendencia_sprints(self, desde=None, hasta=None, organizacion=None, proyecto=None):
+        """
+        Promedios por sprint en un rango de fechas (ISO). Sin `desde`, el último año.
+
+        Si una historia se evaluó varias veces en el rango, cuentan todas sus evaluaciones.
+        """
+        desde_s = _segundos(desde) if desde else time.time() - 365 * 24 * 3600
+        consulta = """
+            SELECT organizacion, proyecto, sprint, SUM(evaluaciones), COUNT(*),
+                   SUM(suma_invest) / NULLIF(SUM(con_invest), 0),
+                   SUM(suma_complejidad) / NULLIF(SUM(con_complejidad), 0),
+                   SUM(suma_estimacion_dias) / NULLIF(SUM(con_estimacion_dias), 0),
+                   MIN(fecha), MAX(fecha)
+            FROM ejecuciones WHERE fecha >= ?
+        """
+        parametros = [desde_s]
+        if hasta:
+            consulta += " AND fecha < ?"
+            parametros.append(_segundos(hasta))
+        if organizacion:
+            consulta += " AND organizacion = ?"
+            parametros.append(organizacion)
+        if proyecto:
+            consulta += " AND proyecto = ?"
+            parametros.append(proyecto)
+        consulta += " GROUP BY organizacion, proyecto, sprint ORDER BY MIN(fecha)"
+        with self._lock:
+            filas = self._conn.execute(consulta, parametros).fetchall()
+        return [
+            {
+                "organizacion": f[0], "proyecto": f[1], "sprint": f[2], "evaluaciones": f[3], "ejecuciones": f[4],
+                "invest_promedio": round(f[5], 2) if f[5] is not None else None,
+                "complejidad_promedio": round(f[6], 2) if f[6] is not None else None,
+                "estimacion_dias_promedio": round(f[7], 2) if f[7] is not None else None,
+                "primera_evaluacion": _fecha_iso(f[8]), "ultima_evaluacion": _fecha_iso(f[9]),
+            }
+            for f in filas
+        ]
+
+    def cerrar(self):
+        self._conn.close()
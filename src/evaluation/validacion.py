@@ -0,0 +1,104 @@
+import threading
+
+from src.evaluation.gemini import CRITERIOS_INVEST
+from src.utils.metricas import metricas
+
+def _es_numero(valor):
+    return isinstance(valor, (int, float)) and not isinstance(valor, bool)
+
+def validar_evaluacion(obj):
+    """
+    Comprueba que un objeto devuelto por el modelo tenga la estructura INVEST esperada.
+
+    Devuelve la lista de problemas encontrados; vacía si el objeto es válido.
+    """
+    if not isinstance(obj, dict):
+        return ["no es un objeto"]
+    problemas = []
+    if "id" not in obj:
+        problemas.append("falta 'id'")
+    if not isinstance(obj.get("titulo"), str):
+        problemas.append("'titulo' no es texto")
+
+    evaluacion = obj.get("evaluacion_invest")
+    if not isinstance(evaluacion, dict):
+        problemas.append("falta 'evaluacion_invest'")
+    else:
+        for criterio in CRITERIOS_INVEST:
+            valor = evaluacion.get(criterio)
+            if not isinstance(valor, dict):
+                problemas.append(f"falta el criterio '{criterio}'")
+            elif not _es_numero(valor.get("puntaje")) or not 1 <= valor["puntaje"] <= 5:
+                problemas.append(f"puntaje de '{criterio}' fuera de 1-5")
+            elif not isinstance(valor.get("justificacion"), str):
+                problemas.append(f"falta la justificación de '{criterio}'")
+
+    if not _es_numero(obj.get("complejidad")) or not 1 <= obj["complejidad"] <= 5:
+        problemas.append("'complejidad' fuera de 1-5")
+    mejoras = obj.get("posibles_mejoras")
+    if not isinstance(mejoras, list) or not all(isinstance(m, str) for m in mejoras):
+        problemas.append("'posibles_mejoras' no es una lista de textos")
+    return problemas
+
+def evaluar_con_recuperacion(evaluador, historias, *args, al_resultado=None, rondas=2, **kwargs):
+    """
+    Evalúa las historias con `evaluador` validando cada objeto por separado.
+
+    Se conservan todas las evaluaciones válidas; las historias que quedaron sin
+    evaluación o con una evaluación mal formada se vuelven a pedir, solas, hasta
+    `rondas` veces más. `al_resultado` solo recibe evaluaciones válidas, una por historia.
+    """
+    por_id = {str(h["id"]): h for h in historias}
+    validos = {}
+    invalidos = 0
+    # Objetos ya procesados, por identidad: el evaluador devuelve al final los mismos que notificó.
+    # Se guardan los objetos (no solo su id()) para que ninguno se libere y su id() se reutilice.
+    vistos = {}
+    lock = threading.Lock()
+
+    def aceptar(obj):
+        nonlocal invalidos
+        historia = por_id.get(str(obj.get("id"))) if isinstance(obj, dict) else None
+        if historia is None:
+            return
+        with lock:
+            if id(obj) in vistos:
+                return
+            vistos[id(obj)] = obj
+        if validar_evaluacion(obj):
+            with lock:
+                invalidos += 1
+            return
+        with lock:
+            if str(historia["id"]) in validos:
+                return
+            # El modelo puede devolver el ID como texto; se normaliza al de la historia.
+            obj["id"] = historia["id"]
+            validos[str(historia["id"])] = obj
+        if al_resultado:
+            al_resultado(obj)
+
+    pendientes = list(historias)
+    for ronda in range(rondas + 1):
+        if ronda == 0:
+            resultados = evaluador(pendientes, *args, al_resultado=aceptar, **kwargs)
+        else:
+            print(f"🔁 {len(pendientes)} historias sin evaluación válida "
+                  f"({', '.join(str(h['id']) for h in pendientes)}); se vuelven a pedir "
+                  f"(ronda {ronda} de {rondas}).")
+            with metricas.etapa("recuperacion", elementos=len(pendientes)):
+                resultados = evaluador(pendientes, *args, al_resultado=aceptar, **kwargs)
+        # Por si el evaluador no notificó algún objeto mientras llegaba.
+        for r in resultados:
+            aceptar(r)
+
+        pendientes = [h for h in pendientes if str(h["id"]) not in validos]
+        if not pendientes:
+            break
+
+    if invalidos:
+        print(f"⚠️ Se descartaron {invalidos} evaluaciones mal formadas.")
+    if pendientes:
+        print(f"❌ Sin evaluación válida tras {rondas} rondas de recuperación: "
+              f"{', '.join(str(h['id']) for h in pendientes)}.")
+    return [validos[str(h["id"])] for h in historias if str(h["id"]) in validos]
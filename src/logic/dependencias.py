@@ -0,0 +1,175 @@
+from collections import defaultdict
+
+# Tipos de enlace de Azure DevOps que se tienen en cuenta, con el tipo de arista del grafo
+# y si hay que invertir origen y destino para guardarla en su sentido canónico.
+TIPOS_ENLACE = {
+    # El destino es la sucesora del origen: el destino depende del origen.
+    "System.LinkTypes.Dependency-Forward": ("dependencia", False),
+    "System.LinkTypes.Dependency-Reverse": ("dependencia", True),
+    # El destino es hija del origen.
+    "System.LinkTypes.Hierarchy-Forward": ("jerarquia", False),
+    "System.LinkTypes.Hierarchy-Reverse": ("jerarquia", True),
+    "System.LinkTypes.Related": ("relacionada", False),
+}
+
+class GrafoDependencias:
+    """
+    Grafo en memoria de las relaciones entre work items de una iteración.
+
+    Guarda cada relación una sola vez aunque Azure DevOps la devuelva desde ambos
+    extremos, y calcula los ciclos de dependencias (componentes fuertemente conexas
+    de Tarjan) una única vez para todas las historias.
+    """
+    def __init__(self, relaciones=()):
+        self._sucesoras = defaultdict(set)
+        self._predecesoras = defaultdict(set)
+        self._hijas = defaultdict(set)
+        self._padres = defaultdict(set)
+        self._relacionadas = defaultdict(set)
+        self._ciclos = None
+        self.relaciones = 0
+        for origen, destino, tipo_enlace in relaciones:
+            self.agregar(origen, destino, tipo_enlace)
+
+    def agregar(self, origen, destino, tipo_enlace):
+        """Añade una relación (origen, destino, tipo de enlace de Azure DevOps). Devuelve si era nueva."""
+        if tipo_enlace not in TIPOS_ENLACE or origen == destino:
+            return False
+        tipo, invertir = TIPOS_ENLACE[tipo_enlace]
+        if invertir:
+            origen, destino = destino, origen
+
+        if tipo == "dependencia":
+            salientes, entrantes = self._sucesoras, self._predecesoras
+        elif tipo == "jerarquia":
+            salientes, entrantes = self._hijas, self._padres
+        else:
+            salientes, entrantes = self._relacionadas, self._relacionadas
+        if destino in salientes[origen]:
+            return False
+        salientes[origen].add(destino)
+        entrantes[destino].add(origen)
+        self.relaciones += 1
+        if tipo == "dependencia":
+            self._ciclos = None
+        return True
+
+    def ciclos(self):
+        """
+        Ciclos de dependencias: {id: ids del ciclo} para cada work item que participa en uno.
+
+        Tarjan iterativo, para no depender del límite de recursión con cadenas largas.
+        """
+        if self._ciclos is not None:
+            return self._ciclos
+
+        indices, bajos = {}, {}
+        pila, en_pila = [], set()
+        ciclos = {}
+        contador = 0
+        for raiz in list(self._sucesoras):
+            if raiz in indices:
+                continue
+            indices[raiz] = bajos[raiz] = contador
+            contador += 1
+            pila.append(raiz)
+            en_pila.add(raiz)
+            recorrido = [(raiz, iter(self._sucesoras.get(raiz, ())))]
+            while recorrido:
+                nodo, vecinos = recorrido[-1]
+                siguiente = next(vecinos, None)
+                if siguiente is not None:
+                    if siguiente not in indices:
+                        indices[siguiente] = bajos[siguiente] = contador
+                        contador += 1
+                        pila.append(siguiente)
+                        en_pila.add(siguiente)
+                        recorrido.append((siguiente, iter(self._sucesoras.get(siguiente, ()))))
+                    elif siguiente in en_pila:
+                        bajos[nodo] = min(bajos[nodo], indices[siguiente])
+                    continue
+
+                recorrido.pop()
+                if recorrido:
+                    padre = recorrido[-1][0]
+                    bajos[padre] = min(bajos[padre], bajos[nodo])
+                if bajos[nodo] == indices[nodo]:
+                    componente = []
+                    while True:
+                        miembro = pila.pop()
+                        en_pila.discard(miembro)
+                        componente.append(miembro)
+                        if miembro == nodo:
+                            break
+                    # Sin aristas a sí mismo, solo las componentes de más de un nodo son ciclos.
+                    if len(componente) > 1:
+                        componente.sort()
+                        for miembro in componente:
+                            ciclos[miembro] = componente
+        self._ciclos = ciclos
+        return ciclos
+
+    def hechos(self, wid):
+        """
+        Resumen de las relaciones de un work item, o None si no tiene ninguna.
+
+        fan_in es el número de predecesoras (de cuántas depende) y fan_out el de
+        sucesoras (cuántas bloquea). Las listas vacías se omiten.
+        """
+        hechos = {
+            "depende_de": sorted(self._predecesoras.get(wid, ())),
+            "bloquea_a": sorted(self._sucesoras.get(wid, ())),
+            "padre": sorted(self._padres.get(wid, ())),
+            "hijas": sorted(self._hijas.get(wid, ())),
+            "relacionadas": sorted(self._relacionadas.get(wid, ())),
+            "ciclo": [otro for otro in self.ciclos().get(wid, ()) if otro != wid],
+        }
+        hechos = {clave: valor for clave, valor in hechos.items() if valor}
+        if not hechos:
+            return None
+        hechos["fan_in"] = len(hechos.get("depende_de", ()))
+        hechos["fan_out"] = len(hechos.get("bloquea_a", ()))
+        return hechos
+
+def anotar_dependencias(historias, relaciones):
+    """
+    Construye el grafo de la iteración y guarda en cada historia sus hechos de
+    dependencias (clave 'dependencias'). Modifica las historias y devuelve las estadísticas.
+    """
+    grafo = GrafoDependencias(relaciones)
+    con_dependencias = 0
+    for h in historias:
+        hechos = grafo.hechos(h["id"])
+        if hechos:
+            h["dependencias"] = hechos
+            con_dependencias += 1
+        else:
+            h.pop("dependencias", None)
+    ids = {h["id"] for h in historias}
+    return {
+        "relaciones": grafo.relaciones,
+        "historias_con_dependencias": con_dependencias,
+        "historias_en_ciclo": sum(1 for wid in grafo.ciclos() if wid in ids),
+    }
+
+def _lista(ids):
+    return ", ".join(str(wid) for wid in ids)
+
+def describir_dependencias(hechos):
+    """Una línea compacta con los hechos de dependencias, para el prompt; vacía si no hay."""
+    if not hechos:
+        return ""
+    partes = []
+    if hechos.get("depende_de"):
+        partes.append(f"depende de {_lista(hechos['depende_de'])}")
+    if hechos.get("bloquea_a"):
+        partes.append(f"bloquea a {_lista(hechos['bloquea_a'])}")
+    if hechos.get("padre"):
+        partes.append(f"padre {_lista(hechos['padre'])}")
+    if hechos.get("hijas"):
+        partes.append(f"hijas {_lista(hechos['hijas'])}")
+    if hechos.get("relacionadas"):
+        partes.append(f"relacionada con {_lista(hechos['relacionadas'])}")
+    if hechos.get("ciclo"):
+        partes.append(f"en un ciclo de dependencias con {_lista(hechos['ciclo'])}")
+    return "; ".join(partes)
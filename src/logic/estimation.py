@@ -1,3 +1,14 @@
+import random
+from bisect import bisect_right
+
+def _numpy():
+    """NumPy solo se importa cuando se calcula algo con él: importar este módulo no lo carga."""
+    try:
+        import numpy
+    except ImportError:  # NumPy está en requirements.txt; si falta, se usa la implementación en Python puro.
+        return None
+    return numpy
+
 def estimar_dias(complejidad=1, capacidad_equipo=None, sprint_dias=10, dias_por_complejidad=2):
     """
     Calcula días estimados considerando complejidad de la historia y carga del equipo.
@@ -22,4 +33,100 @@ def estimar_dias(complejidad=1, capacidad_equipo=None, sprint_dias=10, dias_por_
     ajuste = base * (1 + capacidad_equipo.get("carga", 0)/100)
 
     # Días finales
-    return round(ajuste + overhead_por_historia, 2)
\ No newline at end of file
+    return round(ajuste + overhead_por_historia, 2)
+
+def _parametros_lote(capacidad_equipo, sprint_dias):
+    """Devuelve (carga, overhead por historia) con los mismos criterios que estimar_dias."""
+    if capacidad_equipo is None:
+        capacidad_equipo = {"carga": 0, "historias": 5}
+    total_hu = capacidad_equipo.get("historias", 5)
+    overhead_por_historia = sprint_dias * 0.15 / max(1, total_hu)
+    return capacidad_equipo.get("carga", 0), overhead_por_historia
+
+def estimar_dias_lote(complejidades, capacidad_equipo=None, sprint_dias=10, dias_por_complejidad=2):
+    """
+    Versión por lotes de estimar_dias: calcula los días de todas las historias de una vez.
+
+    Usa NumPy si está instalado; si no, recurre a Python puro. Devuelve una lista
+    con los mismos valores que daría estimar_dias para cada complejidad.
+    """
+    complejidades = list(complejidades)
+    carga, overhead_por_historia = _parametros_lote(capacidad_equipo, sprint_dias)
+    factor = dias_por_complejidad * (1 + carga / 100)
+
+    np = _numpy()
+    if np is not None:
+        dias = np.asarray(complejidades, dtype=float) * factor + overhead_por_historia
+        return [round(float(d), 2) for d in dias]
+    return [round(c * factor + overhead_por_historia, 2) for c in complejidades]
+
+def simular_sprint(complejidades, capacidad_equipo=None, sprint_dias=10, dias_por_complejidad=2,
+                   escenarios=100_000, incertidumbre=0.3, desviacion_carga=10, capacidad_dias=None,
+                   percentiles=(50, 80, 90, 95), semilla=None):
+    """
+    Simulación Monte Carlo del total de días del sprint.
+
+    En cada escenario la complejidad de cada historia se multiplica por un factor
+    log-normal de media 1 (incertidumbre = desviación del logaritmo) y la carga del
+    equipo se muestrea de una normal centrada en capacidad_equipo['carga'] con
+    desviación `desviacion_carga` puntos porcentuales.
+
+    capacidad_dias: días disponibles en el sprint; si se indica, se calcula la
+    probabilidad de que el total quepa en ellos.
+
+    Con NumPy, 100.000 escenarios tardan milisegundos; el respaldo en Python puro
+    es correcto pero órdenes de magnitud más lento, así que NumPy es una dependencia.
+    """
+    complejidades = [float(c) for c in complejidades]
+    n = len(complejidades)
+    if n == 0 or escenarios <= 0:
+        return None
+    carga, overhead_por_historia = _parametros_lote(capacidad_equipo, sprint_dias)
+    overhead = overhead_por_historia * n
+    # mu = -sigma²/2 hace que la media del factor log-normal sea 1 (sin sesgo respecto a la estimación).
+    mu = -incertidumbre ** 2 / 2
+
+    np = _numpy()
+    if np is not None:
+        rng = np.random.default_rng(semilla)
+        c = np.asarray(complejidades, dtype=np.float32)
+        cargas = rng.normal(carga, desviacion_carga, escenarios)
+        sumas = np.empty(escenarios)
+        # Se procesa por bloques para no reservar una matriz escenarios x historias completa.
+        # float32 basta para los factores y reduce a la mitad el coste de generar y exponenciar.
+        filas = max(1, 1_000_000 // n)
+        for inicio in range(0, escenarios, filas):
+            fin = min(inicio + filas, escenarios)
+            factores = rng.standard_normal((fin - inicio, n), dtype=np.float32)
+            factores *= incertidumbre
+            factores += mu
+            np.exp(factores, out=factores)
+            sumas[inicio:fin] = factores @ c
+        totales = dias_por_complejidad * np.maximum(0, 1 + cargas / 100) * sumas + overhead
+        valores_percentiles = np.percentile(totales, percentiles)
+        media = float(totales.mean())
+        cumple = float((totales <= capacidad_dias).mean()) if capacidad_dias else None
+        motor = "numpy"
+    else:
+        rng = random.Random(semilla)
+        totales = []
+        for _ in range(escenarios):
+            suma = sum(c * rng.lognormvariate(mu, incertidumbre) for c in complejidades)
+            factor_carga = max(0, 1 + rng.gauss(carga, desviacion_carga) / 100)
+            totales.append(dias_por_complejidad * factor_carga * suma + overhead)
+        totales.sort()
+        valores_percentiles = [totales[min(escenarios - 1, int(escenarios * p / 100))] for p in percentiles]
+        media = sum(totales) / escenarios
+        cumple = bisect_right(totales, capacidad_dias) / escenarios if capacidad_dias else None
+        motor = "python"
+
+    resultado = {
+        "escenarios": escenarios,
+        "motor": motor,
+        "media_dias": round(media, 2),
+        "percentiles_dias": {f"p{p}": round(float(v), 2) for p, v in zip(percentiles, valores_percentiles)},
+    }
+    if capacidad_dias:
+        resultado["capacidad_dias"] = capacidad_dias
+        resultado["probabilidad_cumplir"] = round(cumple, 4)
+    return resultado
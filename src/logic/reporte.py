@@ -0,0 +1,53 @@
+import json
+import os
+
+from src.logic.estimation import estimar_dias, estimar_dias_lote
+
+def _copiar_dependencias(h_resultado, original_historia):
+    if original_historia.get('dependencias'):
+        h_resultado['dependencias'] = original_historia['dependencias']
+    else:
+        h_resultado.pop('dependencias', None)
+
+def completar_resultado(h_resultado, historias_map, capacidad_equipo, dias_sprint, dias_complejidad):
+    """Añade la estimación en días, la URL de Azure DevOps y las dependencias a una evaluación."""
+    complejidad = h_resultado.get("complejidad", 1.0)
+    estimacion_dias = estimar_dias(complejidad, capacidad_equipo, dias_sprint, dias_complejidad)
+    h_resultado["estimacion_dias"] = estimacion_dias
+
+    original_historia = historias_map.get(h_resultado['id'])
+    if original_historia:
+        h_resultado['url'] = original_historia['url']
+        _copiar_dependencias(h_resultado, original_historia)
+    return h_resultado
+
+def completar_resultados(resultados, historias_map, capacidad_equipo, dias_sprint, dias_complejidad):
+    """Versión por lotes de completar_resultado: estima todas las historias en una sola llamada."""
+    complejidades = [r.get("complejidad", 1.0) for r in resultados]
+    estimaciones = estimar_dias_lote(complejidades, capacidad_equipo, dias_sprint, dias_complejidad)
+    for h_resultado, estimacion_dias in zip(resultados, estimaciones):
+        h_resultado["estimacion_dias"] = estimacion_dias
+        original_historia = historias_map.get(h_resultado['id'])
+        if original_historia:
+            h_resultado['url'] = original_historia['url']
+            _copiar_dependencias(h_resultado, original_historia)
+    return resultados
+
+def escribir_reporte(ruta, metadata, resultados):
+    """
+    Escribe el reporte con la forma que espera el dashboard ({"metadata", "data"}).
+
+    Se escribe en un temporal y se reemplaza, para que el servidor nunca lea un archivo a medias.
+    """
+    directorio = os.path.dirname(ruta)
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+
+    final_data = {
+        "metadata": metadata,
+        "data": resultados
+    }
+    temporal = f"{ruta}.tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump(final_data, f, indent=2, ensure_ascii=False)
+    os.replace(temporal, ruta)
@@ -0,0 +1,174 @@
+import copy
+import re
+import unicodedata
+import zlib
+from random import Random
+
+try:
+    import numpy as np
+except ImportError:  # NumPy está en requirements.txt; si falta, se usa la implementación en Python puro (mucho más lenta).
+    np = None
+
+# Primo de Mersenne 2^61 - 1 para las permutaciones (a·x + b) mod p de MinHash.
+_PRIMO = (1 << 61) - 1
+_MASCARA_64 = (1 << 64) - 1
+_MASCARA_32 = (1 << 32) - 1
+
+# Documentos por bloque al calcular firmas con NumPy (acota la matriz permutaciones × shingles).
+_BLOQUE_FIRMAS = 256
+
+def _normalizar(texto):
+    """Minúsculas, sin tildes y con los dígitos enmascarados, para que 'HU 25893' y 'HU 25889' coincidan."""
+    # Tras NFKD las tildes quedan como caracteres combinables, que se pierden al pasar a ASCII.
+    texto = unicodedata.normalize("NFKD", texto.lower()).encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"\d+", "0", texto)
+
+def shingles(texto, tamano=3):
+    """Hashes de 32 bits de los n-gramas de palabras del texto."""
+    palabras = re.findall(r"\w+", _normalizar(texto))
+    if len(palabras) <= tamano:
+        return {zlib.crc32(" ".join(palabras).encode("utf-8"))} if palabras else set()
+    return {
+        zlib.crc32(" ".join(palabras[i:i + tamano]).encode("utf-8"))
+        for i in range(len(palabras) - tamano + 1)
+    }
+
+def _elegir_bandas(permutaciones, umbral):
+    """
+    Elige filas por banda para LSH. El umbral implícito (1/b)^(1/r) se deja algo por debajo
+    del pedido para no perder pares similares; los candidatos se verifican después.
+    """
+    opciones = [r for r in range(1, permutaciones + 1) if permutaciones % r == 0]
+    objetivo = max(0.05, umbral - 0.1)
+    validas = [r for r in opciones if (r / permutaciones) ** (1 / r) <= objetivo]
+    return max(validas) if validas else opciones[0]
+
+class IndiceSimilitud:
+    """
+    Índice MinHash/LSH en memoria para encontrar textos casi duplicados.
+
+    Cada texto se resume en una firma de `permutaciones` valores; las firmas se parten
+    en bandas y los textos que coinciden en alguna banda son candidatos. La similitud
+    de Jaccard se estima comparando firmas, así que no hace falta guardar los textos.
+    """
+    def __init__(self, umbral=0.9, permutaciones=128, tamano_shingle=3, semilla=1):
+        self.umbral = umbral
+        self.permutaciones = permutaciones
+        self.tamano_shingle = tamano_shingle
+        self.filas = _elegir_bandas(permutaciones, umbral)
+        azar = Random(semilla)
+        self._a = [azar.randrange(1, _PRIMO) for _ in range(permutaciones)]
+        self._b = [azar.randrange(0, _PRIMO) for _ in range(permutaciones)]
+        if np is not None:
+            self._a_np = np.array(self._a, dtype=np.uint64)[:, None]
+            self._b_np = np.array(self._b, dtype=np.uint64)[:, None]
+        self._firmas_por_clave = {}
+        self._cubetas = {}
+
+    def _firmas(self, conjuntos):
+        """Firmas MinHash de varios conjuntos de hashes (no vacíos)."""
+        if np is None:
+            return [
+                [min((((a * h + b) & _MASCARA_64) % _PRIMO) & _MASCARA_32 for h in hashes)
+                 for a, b in zip(self._a, self._b)]
+                for hashes in conjuntos
+            ]
+        largos = [len(hashes) for hashes in conjuntos]
+        x = np.fromiter((h for hashes in conjuntos for h in hashes), dtype=np.uint64, count=sum(largos))
+        # El producto desborda y se trunca a 64 bits igual que con la máscara en Python puro.
+        valores = ((self._a_np * x[None, :] + self._b_np) % np.uint64(_PRIMO)) & np.uint64(_MASCARA_32)
+        inicios = np.concatenate(([0], np.cumsum(largos)[:-1]))
+        # Mínimo por permutación dentro de las columnas de cada documento.
+        return np.minimum.reduceat(valores, inicios, axis=1).T
+
+    def _bandas(self, firma):
+        for i in range(0, self.permutaciones, self.filas):
+            banda = firma[i:i + self.filas]
+            yield (i, banda.tobytes() if np is not None else tuple(banda))
+
+    def agregar(self, elementos):
+        """Añade pares (clave, texto). Los textos sin palabras se ignoran."""
+        pendientes = []
+        for clave, texto in elementos:
+            hashes = shingles(texto, self.tamano_shingle)
+            if hashes:
+                pendientes.append((clave, hashes))
+
+        for inicio in range(0, len(pendientes), _BLOQUE_FIRMAS):
+            bloque = pendientes[inicio:inicio + _BLOQUE_FIRMAS]
+            for (clave, _), firma in zip(bloque, self._firmas([hashes for _, hashes in bloque])):
+                self._firmas_por_clave[clave] = firma
+                for banda in self._bandas(firma):
+                    self._cubetas.setdefault(banda, []).append(clave)
+
+    def similitud(self, clave_a, clave_b):
+        """Estimación de la similitud de Jaccard entre dos textos del índice."""
+        a, b = self._firmas_por_clave.get(clave_a), self._firmas_por_clave.get(clave_b)
+        if a is None or b is None:
+            return 0.0
+        if np is not None:
+            return float(np.count_nonzero(a == b)) / self.permutaciones
+        return sum(x == y for x, y in zip(a, b)) / self.permutaciones
+
+    def candidatos(self, clave):
+        """Claves que comparten alguna banda con `clave` (posibles casi duplicados)."""
+        firma = self._firmas_por_clave.get(clave)
+        if firma is None:
+            return set()
+        encontrados = set()
+        for banda in self._bandas(firma):
+            encontrados.update(self._cubetas.get(banda, ()))
+        encontrados.discard(clave)
+        return encontrados
+
+def _texto_historia(historia):
+    return " ".join(historia.get(c, "") for c in ("titulo", "descripcion", "aceptacion_criterios"))
+
+def agrupar_similares(historias, umbral=0.9, permutaciones=128):
+    """
+    Agrupa las historias casi duplicadas (similitud estimada >= `umbral`).
+
+    Cada grupo tiene como representante su primera historia, y todos sus miembros son
+    similares al representante (no solo entre sí en cadena) y tienen sus mismas
+    dependencias, para que el criterio Independiente siga siendo válido. Devuelve
+    (representantes, duplicados), donde duplicados es {id_duplicado: id_representante}.
+    """
+    if not umbral or len(historias) < 2:
+        return list(historias), {}
+
+    indice = IndiceSimilitud(umbral, permutaciones)
+    indice.agregar((pos, _texto_historia(h)) for pos, h in enumerate(historias))
+
+    asignadas = set()
+    representantes = []
+    duplicados = {}
+    for pos, h in enumerate(historias):
+        if pos in asignadas:
+            continue
+        representantes.append(h)
+        for otra in sorted(indice.candidatos(pos)):
+            if (otra > pos and otra not in asignadas
+                    and historias[otra].get("dependencias") == h.get("dependencias")
+                    and indice.similitud(pos, otra) >= umbral):
+                asignadas.add(otra)
+                duplicados[historias[otra]["id"]] = h["id"]
+    return representantes, duplicados
+
+def compartir_evaluacion(resultado, historia):
+    """Copia la evaluación del representante para una historia casi duplicada, enlazándola con él."""
+    copia = copy.deepcopy(resultado)
+    copia["id"] = historia["id"]
+    copia["titulo"] = historia.get("titulo", copia.get("titulo"))
+    copia["evaluacion_compartida_con"] = resultado["id"]
+    return copia
+
+def expandir_evaluaciones(historias, resultados, duplicados):
+    """Devuelve las evaluaciones de todas las historias, en su orden, reutilizando la del representante."""
+    por_id = {str(r["id"]): r for r in resultados}
+    expandidos = []
+    for h in historias:
+        if str(h["id"]) in por_id:
+            expandidos.append(por_id[str(h["id"])])
+        elif h["id"] in duplicados and str(duplicados[h["id"]]) in por_id:
+            expandidos.append(compartir_evaluacion(por_id[str(duplicados[h["id"]])], h))
+    return expandidos
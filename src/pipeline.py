@@ -0,0 +1,160 @@
+"""
+Pipeline de evaluación de una iteración, compartido por main.py, batch.py y los benchmarks:
+
+    obtener → dependencias → compactar → agrupar → evaluar → estimar → escribir
+
+Cada paso es un método de EvaluacionIteracion para que el modo interactivo pueda
+intercalar lo suyo (arrancar el servidor, mostrar el progreso) entre uno y otro.
+"""
+import functools
+
+from src.config import settings
+from src.azure.api import obtener_historias, obtener_relaciones
+from src.azure.sync import obtener_historias_incremental
+from src.evaluation.cache import evaluar_historias_con_cache
+from src.evaluation.compactacion import compactar_historias
+from src.evaluation.evaluadores import obtener_evaluador
+from src.logic.dependencias import anotar_dependencias
+from src.logic.estimation import simular_sprint
+from src.logic.similitud import agrupar_similares, compartir_evaluacion, expandir_evaluaciones
+from src.logic.reporte import completar_resultado, completar_resultados, escribir_reporte
+from src.utils.metricas import Metricas, metricas
+
+def _con_metricas_propias(metodo):
+    """Registra las métricas del paso también en las de la evaluación (además de en las del proceso)."""
+    @functools.wraps(metodo)
+    def envoltura(self, *args, **kwargs):
+        with metricas.ambito(self.metricas):
+            return metodo(self, *args, **kwargs)
+    return envoltura
+
+class EvaluacionIteracion:
+    """
+    Estado de la evaluación de una iteración: historias, resultados y metadata del reporte.
+
+    La configuración sale de src.config.settings; `max_historias` e `incremental`
+    se pueden fijar por ejecución (p. ej. en los benchmarks). `metricas` solo contiene
+    las etapas de esta evaluación, aunque otras se ejecuten a la vez en el mismo proceso.
+    """
+    def __init__(self, org, project, iteration_path, pat, max_historias=None, incremental=None):
+        self.org = org
+        self.project = project
+        self.iteration_path = iteration_path
+        self.pat = pat
+        self.max_historias = settings.max_historias if max_historias is None else max_historias
+        self.incremental = settings.sync_incremental if incremental is None else incremental
+        self.historias = []
+        self.representantes = []
+        self.duplicados = {}
+        self.duplicadas_de = {}
+        self.resultados = []
+        self.capacidad_equipo = {"carga": 0, "historias": 0}
+        self.historias_map = {}
+        self.metricas = Metricas()
+        self.metadata = {
+            "organizacion": org,
+            "proyecto": project,
+            "sprint": iteration_path,
+            "max_historias_evaluadas": self.max_historias,
+            "dias_sprint_config": settings.dias_sprint,
+        }
+
+    @_con_metricas_propias
+    def obtener(self):
+        """Descarga las historias y sus relaciones, y las deja listas para evaluar. Devuelve cuántas hay."""
+        # En modo incremental solo se descargan las historias modificadas desde la última ejecución.
+        obtener = obtener_historias_incremental if self.incremental else obtener_historias
+        historias = obtener(self.org, self.project, self.iteration_path, self.pat, settings.ado_api_version,
+                            self.max_historias, settings.ado_max_workers)
+        if not historias:
+            return 0
+        # Una sola consulta de enlaces para toda la iteración, en lugar de que el modelo los deduzca del texto.
+        relaciones = obtener_relaciones(self.org, self.project, self.iteration_path, self.pat,
+                                        settings.ado_api_version)
+        with metricas.etapa("dependencias", elementos=len(relaciones)):
+            self.metadata["dependencias"] = anotar_dependencias(historias, relaciones)
+
+        # Compactar el texto antes de evaluar: el tamaño del prompt determina la latencia y la tasa de fallos.
+        self.historias, self.metadata["compactacion"] = compactar_historias(
+            historias, settings.prompt_max_tokens_historia, settings.prompt_max_tokens, settings.gemini_tamano_lote
+        )
+
+        # Las historias casi duplicadas (p. ej. hechas con la misma plantilla) se evalúan una sola vez.
+        with metricas.etapa("similitud", elementos=len(self.historias)):
+            self.representantes, self.duplicados = agrupar_similares(self.historias, settings.similitud_umbral)
+        self.duplicadas_de = {}
+        for h in self.historias:
+            if h['id'] in self.duplicados:
+                self.duplicadas_de.setdefault(self.duplicados[h['id']], []).append(h)
+        self.metadata["similitud"] = {
+            "umbral": settings.similitud_umbral,
+            "historias_reutilizadas": len(self.duplicados),
+            "representantes": len(self.duplicadas_de),
+        }
+
+        self.capacidad_equipo = {
+            "carga": 0,  # 0% de carga
+            "historias": len(self.historias)  # número de HU del sprint
+        }
+        self.historias_map = {h['id']: h for h in self.historias}
+        return len(self.historias)
+
+    def completar(self, resultado):
+        """Añade a una evaluación la estimación en días, la URL y las dependencias de su historia."""
+        return completar_resultado(resultado, self.historias_map, self.capacidad_equipo,
+                                   settings.dias_sprint, settings.dias_complejidad)
+
+    @_con_metricas_propias
+    def evaluar(self, cache=None, al_resultado=None):
+        """
+        Evalúa las historias representativas y reparte su evaluación entre sus casi duplicados.
+
+        Con `cache` se reutilizan las evaluaciones guardadas. `al_resultado` recibe cada
+        evaluación completada en cuanto llega, incluidas las compartidas.
+        """
+        evaluador = obtener_evaluador(settings.evaluador, settings.gemini_rondas_recuperacion)
+        argumentos = (settings.gemini_tamano_lote, settings.gemini_max_workers,
+                      settings.gemini_timeout, settings.gemini_reintentos)
+
+        notificar = None
+        if al_resultado:
+            def notificar(r):
+                al_resultado(self.completar(r))
+                for h in self.duplicadas_de.get(r['id'], []):
+                    al_resultado(self.completar(compartir_evaluacion(r, h)))
+
+        if cache is None:
+            resultados = evaluador(self.representantes, *argumentos, al_resultado=notificar)
+        else:
+            # La caché puede ser compartida con otras evaluaciones: se guardan solo los aciertos de esta.
+            self.metadata["cache"] = {}
+            resultados = evaluar_historias_con_cache(
+                self.representantes, cache, *argumentos, al_resultado=notificar, evaluador=evaluador,
+                estadisticas=self.metadata["cache"],
+            )
+        self.resultados = expandir_evaluaciones(self.historias, resultados, self.duplicados)
+        return self.resultados
+
+    @_con_metricas_propias
+    def estimar(self):
+        """Completa todas las evaluaciones y simula el sprint."""
+        with metricas.etapa("estimacion", elementos=len(self.resultados)):
+            completar_resultados(self.resultados, self.historias_map, self.capacidad_equipo,
+                                 settings.dias_sprint, settings.dias_complejidad)
+            self.metadata["simulacion_sprint"] = simular_sprint(
+                [r.get("complejidad", 1.0) for r in self.resultados], self.capacidad_equipo,
+                settings.dias_sprint, settings.dias_complejidad,
+                escenarios=settings.simulacion_escenarios, capacidad_dias=settings.capacidad_sprint_dias,
+            )
+        return self.metadata["simulacion_sprint"]
+
+    @_con_metricas_propias
+    def escribir(self, ruta, historial=None):
+        """Escribe el reporte y, si se indica, lo añade al historial."""
+        # La escritura del propio reporte no puede incluirse en él; se ve en /metrics.
+        self.metadata["metricas"] = self.metricas.resumen()
+        with metricas.etapa("escritura", elementos=len(self.resultados)):
+            escribir_reporte(ruta, self.metadata, self.resultados)
+        # El reporte se sobrescribe en cada ejecución; el historial conserva todas.
+        if historial is not None:
+            historial.registrar_ejecucion(self.metadata, self.resultados)
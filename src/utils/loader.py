@@ -3,31 +3,71 @@ import threading
 import itertools
 import time
 
-# === Loader auxiliar ===
-class Loader:
-    def __init__(self, desc="Procesando...", end="", timeout=0.1):
+from src.utils.metricas import metricas
+
+# === Progreso auxiliar ===
+class Progreso:
+    """
+    Muestra en una línea el avance real de una fase: elementos completados sobre el total,
+    tiempo transcurrido y las etapas del pipeline que están en curso en ese momento.
+
+    Sin `total` (p. ej. mientras se descarga), solo se muestran las etapas y el tiempo.
+    """
+    def __init__(self, desc="Procesando...", total=None, end="", timeout=0.1, ancho=20):
         self.desc = desc
+        self.total = total
         self.end = end
         self.timeout = timeout
+        self.ancho = ancho
+        self.hechos = 0
+        self._lock = threading.Lock()
         self._running = False
         self._thread = None
+        self._inicio = None
+        self._largo = 0
 
     def start(self):
         self._running = True
-        self._thread = threading.Thread(target=self._animate)
+        self._inicio = time.perf_counter()
+        self._thread = threading.Thread(target=self._animate, daemon=True)
         self._thread.start()
+        return self
+
+    def avanzar(self, n=1):
+        with self._lock:
+            self.hechos += n
+
+    def _linea(self, c):
+        partes = [f"{self.desc} {c}"]
+        if self.total:
+            llenos = min(self.ancho, self.ancho * self.hechos // self.total)
+            partes.append(f"[{'█' * llenos}{'·' * (self.ancho - llenos)}] {self.hechos}/{self.total}")
+        partes.append(f"{time.perf_counter() - self._inicio:.0f}s")
+        activas = metricas.activas()
+        if activas:
+            partes.append(f"({', '.join(activas)})")
+        return " ".join(partes)
 
     def _animate(self):
         for c in itertools.cycle(["⠋","⠙","⠹","⠸","⠼","⠴","⠦","⠧","⠇","⠏"]):
             if not self._running:
                 break
-            sys.stdout.write(f"\r{self.desc} {c}")
+            linea = self._linea(c)
+            # Rellenar con espacios para borrar los restos de una línea anterior más larga.
+            sys.stdout.write(f"\r{linea}{' ' * max(0, self._largo - len(linea))}")
             sys.stdout.flush()
+            self._largo = len(linea)
             time.sleep(self.timeout)
 
     def stop(self):
         self._running = False
         self._thread.join()
-        sys.stdout.write("\r" + " " * (len(self.desc) + 10) + "\r")
+        sys.stdout.write("\r" + " " * (self._largo + 10) + "\r")
         sys.stdout.write(f"{self.end}\n")
-        sys.stdout.flush()
\ No newline at end of file
+        sys.stdout.flush()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
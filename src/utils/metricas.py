@@ -0,0 +1,118 @@
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+# Etapas del pipeline, en el orden en que se ejecutan.
+ETAPAS = ["wiql", "descarga", "conversion_html", "dependencias", "similitud", "prompt", "llm", "parseo", "recuperacion", "estimacion", "escritura"]
+
+# Registro de la ejecución en curso (ver Metricas.ambito): cada iteración evaluada tiene el suyo.
+_registro_ejecucion = contextvars.ContextVar("registro_ejecucion", default=None)
+
+class Metricas:
+    """
+    Registro ligero de tiempos por etapa, seguro entre hilos.
+
+    Por cada etapa acumula llamadas, segundos (total y máximo), elementos procesados
+    y bytes. También sabe qué etapas están en curso, para mostrar el progreso.
+
+    Lo registrado se copia además en el registro de la ejecución activa (ver `ambito`),
+    para que el reporte de cada iteración incluya solo sus propias métricas.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._etapas = {}
+        self._activas = {}
+
+    def _registro(self, nombre):
+        if nombre not in self._etapas:
+            self._etapas[nombre] = {"llamadas": 0, "segundos": 0.0, "segundos_max": 0.0, "elementos": 0, "bytes": 0}
+        return self._etapas[nombre]
+
+    def registrar(self, nombre, segundos, elementos=0, bytes=0):
+        with self._lock:
+            registro = self._registro(nombre)
+            registro["llamadas"] += 1
+            registro["segundos"] += segundos
+            registro["segundos_max"] = max(registro["segundos_max"], segundos)
+            registro["elementos"] += elementos
+            registro["bytes"] += bytes
+        ejecucion = _registro_ejecucion.get()
+        if ejecucion is not None and ejecucion is not self:
+            ejecucion.registrar(nombre, segundos, elementos, bytes)
+
+    @contextmanager
+    def etapa(self, nombre, elementos=0, bytes=0):
+        """
+        Mide el bloque como una llamada a la etapa `nombre`.
+
+        Devuelve un diccionario en el que el bloque puede ajustar 'elementos' y 'bytes'
+        cuando solo se conocen al terminar (p. ej. el número de work items recibidos).
+        """
+        conteo = {"elementos": elementos, "bytes": bytes}
+        with self._lock:
+            self._activas[nombre] = self._activas.get(nombre, 0) + 1
+        inicio = time.perf_counter()
+        try:
+            yield conteo
+        finally:
+            segundos = time.perf_counter() - inicio
+            with self._lock:
+                self._activas[nombre] -= 1
+                if not self._activas[nombre]:
+                    del self._activas[nombre]
+            self.registrar(nombre, segundos, conteo["elementos"], conteo["bytes"])
+
+    @contextmanager
+    def ambito(self, registro):
+        """Dentro del bloque, lo que se registre se copia también en `registro` (otra instancia de Metricas)."""
+        token = _registro_ejecucion.set(registro)
+        try:
+            yield registro
+        finally:
+            _registro_ejecucion.reset(token)
+
+    def activas(self):
+        """Etapas en curso, en el orden del pipeline."""
+        with self._lock:
+            activas = list(self._activas)
+        return sorted(activas, key=lambda n: ETAPAS.index(n) if n in ETAPAS else len(ETAPAS))
+
+    def resumen(self):
+        """Copia de las métricas con los segundos redondeados, lista para el JSON del reporte."""
+        with self._lock:
+            etapas = {nombre: dict(registro) for nombre, registro in self._etapas.items()}
+        for registro in etapas.values():
+            registro["segundos"] = round(registro["segundos"], 4)
+            registro["segundos_max"] = round(registro["segundos_max"], 4)
+        return etapas
+
+    def prometheus(self, prefijo="evaluador_etapa"):
+        """Las métricas en el formato de texto de Prometheus (versión 0.0.4)."""
+        series = [
+            ("llamadas_total", "counter", "llamadas", "Veces que se ejecutó la etapa."),
+            ("segundos_total", "counter", "segundos", "Tiempo acumulado en la etapa."),
+            ("segundos_max", "gauge", "segundos_max", "Duración de la llamada más lenta de la etapa."),
+            ("elementos_total", "counter", "elementos", "Elementos procesados por la etapa."),
+            ("bytes_total", "counter", "bytes", "Bytes procesados por la etapa."),
+        ]
+        etapas = self.resumen()
+        lineas = []
+        for sufijo, tipo, campo, ayuda in series:
+            lineas.append(f"# HELP {prefijo}_{sufijo} {ayuda}")
+            lineas.append(f"# TYPE {prefijo}_{sufijo} {tipo}")
+            for nombre, registro in etapas.items():
+                lineas.append(f'{prefijo}_{sufijo}{{etapa="{nombre}"}} {registro[campo]}')
+        return "\n".join(lineas) + "\n"
+
+# Registro compartido por todo el proceso.
+metricas = Metricas()
+
+def en_contexto(funcion):
+    """
+    Envuelve `funcion` para que se ejecute con el contexto de quien la envuelve, incluido el
+    registro de la ejecución activa. Necesario al repartir trabajo en hilos, que no lo heredan.
+    """
+    contexto = contextvars.copy_context()
+    # Cada llamada usa su propia copia: un mismo contexto no puede estar activo en dos hilos a la vez.
+    return lambda *args, **kwargs: contexto.copy().run(funcion, *args, **kwargs)
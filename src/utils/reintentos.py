@@ -0,0 +1,39 @@
+import email.utils
+import random
+import time
+
+# Respuestas que indican saturación o un fallo temporal del servicio y merecen reintento.
+ESTADOS_REINTENTABLES = {429, 500, 502, 503, 504}
+
+def segundos_retry_after(valor):
+    """Retry-After puede ser un número de segundos o una fecha HTTP."""
+    if not valor:
+        return None
+    try:
+        return max(0.0, float(valor))
+    except ValueError:
+        try:
+            fecha = email.utils.parsedate_to_datetime(valor)
+        except (TypeError, ValueError):
+            return None
+        return max(0.0, fecha.timestamp() - time.time()) if fecha else None
+
+def espera_reintento(cabeceras, intento, espera_base=1.0, espera_max=60.0):
+    """
+    Segundos a esperar antes del siguiente intento.
+
+    Respeta Retry-After y, si no viene, X-RateLimit-Reset (Azure DevOps); sin ninguna de
+    las dos (o sin respuesta, tras un error de red) aplica backoff exponencial con jitter.
+    `cabeceras` admite las de requests y las de httpx.
+    """
+    if cabeceras is not None:
+        segundos = segundos_retry_after(cabeceras.get("Retry-After"))
+        if segundos is None and cabeceras.get("X-RateLimit-Reset"):
+            try:
+                segundos = max(0.0, float(cabeceras["X-RateLimit-Reset"]) - time.time())
+            except ValueError:
+                segundos = None
+        if segundos is not None:
+            return min(espera_max, segundos)
+    # Jitter para que los hilos o lotes no reintenten todos a la vez.
+    return min(espera_max, espera_base * (2 ** intento)) * random.uniform(0.5, 1.0)
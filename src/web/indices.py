@@ -0,0 +1,181 @@
+import math
+import re
+import unicodedata
+from bisect import bisect_left, bisect_right
+
+TAMANO_PAGINA = 50
+TAMANO_PAGINA_MAX = 500
+
+# Campos por los que se puede ordenar con el parámetro 'orden' (prefijo '-' para descendente).
+_CAMPOS_ORDEN = ("id", "complejidad", "invest", "estimacion_dias")
+
+def _normalizar(texto):
+    """Pasa a minúsculas y elimina tildes, para que 'Pequeña' coincida con 'pequena'."""
+    texto = unicodedata.normalize("NFKD", str(texto).lower())
+    return "".join(c for c in texto if not unicodedata.combining(c))
+
+def _tokens(texto):
+    return set(re.findall(r"\w+", _normalizar(texto)))
+
+def _numero(valor, defecto=0.0):
+    try:
+        return float(valor)
+    except (TypeError, ValueError):
+        return defecto
+
+class IndiceReporte:
+    """
+    Índices en memoria sobre las historias de un reporte, construidos una sola vez al cargarlo.
+
+    - Listas ordenadas por complejidad y por promedio INVEST para filtrar rangos con bisect.
+    - Índice invertido de palabras (título, justificaciones y mejoras) para la búsqueda de texto.
+    - Un resumen precalculado (histogramas y promedios) para los gráficos del dashboard.
+    """
+    def __init__(self, datos):
+        self.metadata = datos.get("metadata", {})
+        self.historias = datos.get("data", [])
+
+        self._complejidad = []
+        self._invest = []
+        self._puntajes = []
+        self._palabras = {}
+        for pos, h in enumerate(self.historias):
+            evaluacion = h.get("evaluacion_invest") or {}
+            puntajes = {_normalizar(c): _numero(v.get("puntaje")) for c, v in evaluacion.items() if isinstance(v, dict)}
+            self._puntajes.append(puntajes)
+            self._complejidad.append(_numero(h.get("complejidad"), 1.0))
+            self._invest.append(sum(puntajes.values()) / len(puntajes) if puntajes else 0.0)
+
+            texto = [str(h.get("id", "")), h.get("titulo", "")]
+            texto += [v.get("justificacion", "") for v in evaluacion.values() if isinstance(v, dict)]
+            texto += h.get("posibles_mejoras") or []
+            for palabra in _tokens(" ".join(map(str, texto))):
+                self._palabras.setdefault(palabra, set()).add(pos)
+
+        self._por_complejidad = sorted(range(len(self.historias)), key=lambda p: self._complejidad[p])
+        self._claves_complejidad = [self._complejidad[p] for p in self._por_complejidad]
+        self._por_invest = sorted(range(len(self.historias)), key=lambda p: self._invest[p])
+        self._claves_invest = [self._invest[p] for p in self._por_invest]
+
+        self.resumen = self._calcular_resumen()
+
+    def _rango(self, orden, claves, minimo, maximo):
+        """Posiciones cuyo valor está en [minimo, maximo], usando búsqueda binaria."""
+        inicio = bisect_left(claves, minimo) if minimo is not None else 0
+        fin = bisect_right(claves, maximo) if maximo is not None else len(claves)
+        return set(orden[inicio:fin])
+
+    def _buscar_texto(self, consulta):
+        """Posiciones que contienen todas las palabras de la consulta (como prefijo de alguna palabra)."""
+        resultado = None
+        for termino in _tokens(consulta):
+            coincidencias = set()
+            for palabra, posiciones in self._palabras.items():
+                if palabra.startswith(termino):
+                    coincidencias |= posiciones
+            resultado = coincidencias if resultado is None else resultado & coincidencias
+        return resultado
+
+    def consultar(self, params):
+        """
+        Filtra, ordena y pagina las historias según los parámetros de la URL.
+
+        params: dict de listas, como lo devuelve urllib.parse.parse_qs.
+            invest_min / invest_max: rango del promedio INVEST
+            complejidad_min / complejidad_max: rango de complejidad
+            min_<criterio>: puntaje mínimo de un criterio INVEST (p. ej. min_testeable=3)
+            q: texto a buscar
+            orden: id, complejidad, invest o estimacion_dias; con '-' delante es descendente
+            pagina / tamano: paginación (la primera página es 1)
+
+        Lanza ValueError si algún parámetro no es válido.
+        """
+        valor = lambda nombre: params.get(nombre, [None])[0]
+        numero = lambda nombre: float(valor(nombre)) if valor(nombre) not in (None, "") else None
+
+        candidatos = set(range(len(self.historias)))
+        if numero("complejidad_min") is not None or numero("complejidad_max") is not None:
+            candidatos &= self._rango(self._por_complejidad, self._claves_complejidad,
+                                      numero("complejidad_min"), numero("complejidad_max"))
+        if numero("invest_min") is not None or numero("invest_max") is not None:
+            candidatos &= self._rango(self._por_invest, self._claves_invest,
+                                      numero("invest_min"), numero("invest_max"))
+        for nombre in params:
+            if nombre.startswith("min_"):
+                criterio = _normalizar(nombre[4:])
+                minimo = numero(nombre)
+                candidatos = {p for p in candidatos if self._puntajes[p].get(criterio, 0) >= minimo}
+        if valor("q"):
+            candidatos &= self._buscar_texto(valor("q")) or set()
+
+        orden = valor("orden") or "id"
+        campo = orden.lstrip("-")
+        if campo not in _CAMPOS_ORDEN:
+            raise ValueError(f"Orden no válido: {orden}")
+        if campo == "complejidad":
+            clave = lambda p: self._complejidad[p]
+        elif campo == "invest":
+            clave = lambda p: self._invest[p]
+        else:
+            clave = lambda p: _numero(self.historias[p].get(campo))
+        posiciones = sorted(candidatos, key=lambda p: (clave(p), p), reverse=orden.startswith("-"))
+
+        tamano = min(int(valor("tamano") or TAMANO_PAGINA), TAMANO_PAGINA_MAX)
+        pagina = int(valor("pagina") or 1)
+        if tamano < 1 or pagina < 1:
+            raise ValueError("La página y el tamaño deben ser mayores que cero.")
+        inicio = (pagina - 1) * tamano
+
+        return {
+            "metadata": self.metadata,
+            "data": [self.historias[p] for p in posiciones[inicio:inicio + tamano]],
+            "paginacion": {
+                "pagina": pagina,
+                "tamano": tamano,
+                "total": len(posiciones),
+                "paginas": math.ceil(len(posiciones) / tamano),
+            },
+        }
+
+    def _calcular_resumen(self):
+        """Histogramas y promedios que necesitan los gráficos del dashboard."""
+        total = len(self.historias)
+        histograma_complejidad = {}
+        for c in self._complejidad:
+            clave = f"{c:g}"
+            histograma_complejidad[clave] = histograma_complejidad.get(clave, 0) + 1
+
+        criterios = {}
+        for h in self.historias:
+            for criterio, v in (h.get("evaluacion_invest") or {}).items():
+                if isinstance(v, dict):
+                    puntaje = round(_numero(v.get("puntaje")))
+                    stats = criterios.setdefault(criterio, {"suma": 0.0, "histograma": {}})
+                    stats["suma"] += puntaje
+                    stats["histograma"][str(puntaje)] = stats["histograma"].get(str(puntaje), 0) + 1
+
+        # Promedio INVEST agrupado en intervalos de 0.5 (p. ej. "3.5" = [3.5, 4.0)).
+        histograma_invest = {}
+        for promedio in self._invest:
+            clave = f"{math.floor(promedio * 2) / 2:g}"
+            histograma_invest[clave] = histograma_invest.get(clave, 0) + 1
+
+        return {
+            "metadata": self.metadata,
+            "total": total,
+            "complejidad_promedio": round(sum(self._complejidad) / total, 2) if total else 0,
+            "invest_promedio": round(sum(self._invest) / total, 2) if total else 0,
+            "estimacion_dias_total": round(sum(_numero(h.get("estimacion_dias")) for h in self.historias), 2),
+            "problematicas": sum(
+                1 for c, i in zip(self._complejidad, self._invest) if c > 2.5 or i < 2.5
+            ),
+            "histograma_complejidad": histograma_complejidad,
+            "histograma_invest": histograma_invest,
+            "criterios": {
+                criterio: {
+                    "promedio": round(stats["suma"] / sum(stats["histograma"].values()), 2),
+                    "histograma": stats["histograma"],
+                }
+                for criterio, stats in criterios.items()
+            },
+        }
@@ -1,34 +1,288 @@
-from http.server import BaseHTTPRequestHandler, HTTPServer, SimpleHTTPRequestHandler
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer, SimpleHTTPRequestHandler
+import gzip
+import hashlib
 import json
+import os
+import threading
+from urllib.parse import urlparse, parse_qs
+
+from src.config import settings
+from src.evaluation.historial import HistorialEvaluaciones
+from src.utils.metricas import metricas
+from src.web.indices import IndiceReporte
+
+# Por debajo de este tamaño comprimir no compensa el coste de CPU.
+_GZIP_MIN_BYTES = 1024
+
+# === Caché en memoria del reporte ===
+class _RespuestaJSON:
+    """Cuerpo JSON pre-serializado en forma compacta, con su versión gzip y su ETag."""
+    def __init__(self, datos, etag=None):
+        self.cuerpo = json.dumps(datos, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self.cuerpo_gzip = gzip.compress(self.cuerpo, compresslevel=6) if len(self.cuerpo) >= _GZIP_MIN_BYTES else None
+        self.etag = etag or f'"{hashlib.sha1(self.cuerpo).hexdigest()}"'
+
+class _ReporteCargado:
+    """Versión del reporte lista para servir: datos parseados, respuestas precalculadas e índices."""
+    def __init__(self, datos, firma):
+        self.datos = datos
+        self.firma = firma
+        self.completo = _RespuestaJSON(datos)
+        self.indice = IndiceReporte(datos)
+        self.resumen = _RespuestaJSON(self.indice.resumen)
+
+class CacheReporte:
+    """
+    Mantiene res.json en memoria, pre-serializado y pre-comprimido.
+
+    El archivo solo se vuelve a leer cuando cambia su fecha de modificación o su tamaño,
+    así que las peticiones repetidas no vuelven a parsear ni a serializar el JSON.
+    """
+    def __init__(self, ruta='res.json'):
+        self.ruta = ruta
+        self._actual = None
+        self._lock = threading.Lock()
+
+    def obtener(self):
+        """Devuelve el reporte cargado. Lanza FileNotFoundError si res.json no existe."""
+        estado = os.stat(self.ruta)
+        firma = (estado.st_mtime_ns, estado.st_size)
+        actual = self._actual
+        if actual is not None and actual.firma == firma:
+            return actual
+
+        with self._lock:
+            # Otro hilo pudo haberlo recargado mientras esperábamos el lock.
+            if self._actual is None or self._actual.firma != firma:
+                with open(self.ruta, 'r', encoding='utf-8') as f:
+                    self._actual = _ReporteCargado(json.load(f), firma)
+            return self._actual
+
+cache_reporte = CacheReporte()
+
+# === Canal de eventos para la evaluación en curso ===
+class CanalEventos:
+    """
+    Difunde a los clientes del dashboard los resultados de la evaluación en curso.
+
+    Los eventos se conservan para que un cliente que se conecte tarde reciba
+    primero todo lo publicado hasta el momento y luego los eventos nuevos.
+    """
+    def __init__(self):
+        self._eventos = []
+        self._activo = False
+        self._cond = threading.Condition()
+
+    def iniciar(self, metadata):
+        """Comienza una nueva evaluación, descartando los eventos anteriores."""
+        with self._cond:
+            self._eventos = []
+            self._activo = True
+        self.publicar("inicio", metadata)
+
+    def publicar(self, tipo, datos):
+        with self._cond:
+            self._eventos.append((tipo, datos))
+            self._cond.notify_all()
+
+    def finalizar(self):
+        """Marca la evaluación como terminada; los clientes deben pedir el reporte completo a /data."""
+        self.publicar("fin", {})
+        with self._cond:
+            self._activo = False
+
+    def suscribir(self, espera=15):
+        """
+        Genera los eventos (tipo, datos) desde el inicio de la evaluación actual.
+
+        Si no hay eventos nuevos durante `espera` segundos, genera None para que
+        el servidor pueda enviar un latido y detectar clientes desconectados.
+        """
+        with self._cond:
+            if not self._activo and not self._eventos:
+                yield ("fin", {})
+                return
+
+        indice = 0
+        while True:
+            with self._cond:
+                if indice >= len(self._eventos):
+                    self._cond.wait(timeout=espera)
+                pendientes = self._eventos[indice:]
+                indice += len(pendientes)
+
+            if not pendientes:
+                yield None
+            for evento in pendientes:
+                yield evento
+                if evento[0] == "fin":
+                    return
+
+canal_eventos = CanalEventos()
+
+# === Historial de evaluaciones ===
+_historial = None
+_historial_lock = threading.Lock()
+
+def obtener_historial():
+    """
+    Abre el historial en solo lectura la primera vez que el dashboard lo consulta.
+    Devuelve None mientras no exista: consultarlo no debe crear un archivo vacío.
+    """
+    global _historial
+    with _historial_lock:
+        if _historial is None and os.path.exists(settings.historial_ruta):
+            _historial = HistorialEvaluaciones(settings.historial_ruta, solo_lectura=True)
+        return _historial
 
 # === Servidor para el Dashboard ===
 class DashboardRequestHandler(SimpleHTTPRequestHandler):
+    # HTTP/1.1 permite reutilizar la conexión (keep-alive) entre peticiones del mismo cliente.
+    protocol_version = 'HTTP/1.1'
+    # Cabeceras y cuerpo se escriben por separado; sin esto, Nagle añade ~40 ms por respuesta en keep-alive.
+    disable_nagle_algorithm = True
+
     def __init__(self, *args, **kwargs):
         # Sirve archivos desde el directorio 'public'
         super().__init__(*args, directory='public', **kwargs)
 
     def do_GET(self):
-        if self.path == '/data':
-            # Este endpoint especial sirve el archivo res.json desde el directorio raíz del proyecto
+        url = urlparse(self.path)
+        if url.path in ('/data', '/summary'):
+            # Estos endpoints sirven el archivo res.json desde el directorio raíz del proyecto
             try:
-                with open('res.json', 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                self.send_response(200)
-                self.send_header('Content-Type', 'application/json; charset=utf-8')
-                self.end_headers()
-                self.wfile.write(json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8'))
+                reporte = cache_reporte.obtener()
             except FileNotFoundError:
                 self.send_error(404, 'res.json no encontrado')
+                return
+
+            if url.path == '/summary':
+                self._enviar_json(reporte.resumen)
+            elif not url.query:
+                self._enviar_json(reporte.completo)
+            else:
+                self._enviar_consulta(reporte, url.query)
+        elif url.path == '/stream':
+            self._servir_eventos()
+        elif url.path == '/metrics':
+            self._enviar_metricas()
+        elif url.path in ('/history', '/history/sprints'):
+            self._enviar_historial(url.path, parse_qs(url.query))
         else:
             # Para todas las demás peticiones, usa el comportamiento por defecto
             # que sirve archivos desde el directorio 'public'
             super().do_GET()
 
+    def _cliente_tiene(self, etag):
+        etags_cliente = [e.strip() for e in self.headers.get('If-None-Match', '').split(',')]
+        return etag in etags_cliente
+
+    def _responder_no_modificado(self, etag):
+        self.send_response(304)
+        self.send_header('ETag', etag)
+        self.end_headers()
+
+    def _enviar_consulta(self, reporte, query):
+        """Envía una página filtrada y ordenada del reporte usando sus índices en memoria."""
+        # La respuesta solo depende de la versión del reporte y de la consulta, así que
+        # el ETag se calcula sin tener que volver a filtrar.
+        etag = f'"{hashlib.sha1((reporte.completo.etag + query).encode("utf-8")).hexdigest()}"'
+        if self._cliente_tiene(etag):
+            self._responder_no_modificado(etag)
+            return
+        try:
+            resultado = reporte.indice.consultar(parse_qs(query))
+        except ValueError as e:
+            self.send_error(400, f'Parámetros no válidos: {e}')
+            return
+        self._enviar_json(_RespuestaJSON(resultado, etag))
+
+    def _enviar_json(self, respuesta):
+        """Envía una respuesta JSON, con 304 si el cliente ya tiene esta versión."""
+        if self._cliente_tiene(respuesta.etag):
+            self._responder_no_modificado(respuesta.etag)
+            return
+
+        acepta_gzip = respuesta.cuerpo_gzip is not None and 'gzip' in self.headers.get('Accept-Encoding', '')
+        cuerpo = respuesta.cuerpo_gzip if acepta_gzip else respuesta.cuerpo
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(cuerpo)))
+        self.send_header('ETag', respuesta.etag)
+        # Obliga al navegador a revalidar con If-None-Match en lugar de usar una copia vencida.
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Vary', 'Accept-Encoding')
+        if acepta_gzip:
+            self.send_header('Content-Encoding', 'gzip')
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def _enviar_historial(self, ruta, params):
+        """
+        /history?historia=ID: evolución de una historia.
+        /history/sprints?desde=AAAA-MM-DD&hasta=...: promedios por sprint (por defecto, el último año).
+        Ambos aceptan 'organizacion' y 'proyecto' para acotar la consulta.
+        """
+        def valor(nombre):
+            return (params.get(nombre) or [None])[0]
+
+        filtros = {"organizacion": valor("organizacion"), "proyecto": valor("proyecto")}
+        historial = obtener_historial()
+        try:
+            if ruta == '/history':
+                if not valor("historia"):
+                    raise ValueError("falta el parámetro 'historia'")
+                historia = int(valor("historia"))
+                evaluaciones = historial.historia(historia, **filtros) if historial else []
+                datos = {"historia": historia, "evaluaciones": evaluaciones}
+            else:
+                sprints = historial.tendencia_sprints(valor("desde"), valor("hasta"), **filtros) if historial else []
+                datos = {"sprints": sprints}
+        except ValueError as e:
+            self.send_error(400, f'Parámetros no válidos: {e}')
+            return
+        self._enviar_json(_RespuestaJSON(datos))
+
+    def _enviar_metricas(self):
+        """Expone las métricas por etapa del proceso en el formato de texto de Prometheus."""
+        cuerpo = metricas.prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(cuerpo)))
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def _servir_eventos(self):
+        """Envía los resultados de la evaluación en curso como Server-Sent Events."""
+        # El stream no tiene longitud conocida, así que la conexión se cierra al terminar.
+        self.close_connection = True
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        try:
+            for evento in canal_eventos.suscribir():
+                if evento is None:
+                    # Latido: un comentario SSE que el navegador ignora.
+                    self.wfile.write(b': ping\n\n')
+                else:
+                    tipo, datos = evento
+                    mensaje = f"event: {tipo}\ndata: {json.dumps(datos, ensure_ascii=False)}\n\n"
+                    self.wfile.write(mensaje.encode('utf-8'))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # El cliente cerró la conexión.
+            pass
+
     def log_message(self, format, *args):
         """Silencia los logs del servidor para mantener la salida limpia."""
         return
 
 def start_server(port=8000):
-    httpd = HTTPServer(("", port), DashboardRequestHandler)
+    # Un hilo por conexión: los clientes del stream de eventos y las conexiones keep-alive
+    # se mantienen abiertas sin bloquear al resto de clientes.
+    httpd = ThreadingHTTPServer(("", port), DashboardRequestHandler)
     print(f"🌐 Servidor corriendo en http://localhost:{port}")
-    httpd.serve_forever()
\ No newline at end of file
+    httpd.serve_forever()
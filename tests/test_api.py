@@ -0,0 +1,56 @@
+"""
+Pruebas de la descarga de historias contra el Azure DevOps falso de benchmarks/,
+contando las peticiones que recibe el servidor.
+
+    python -m unittest discover tests
+"""
+import math
+import unittest
+from unittest import mock
+
+from benchmarks.ado_falso import ITERACION, PROYECTO, iniciar_servidor
+from src.azure import api
+
+ORG = "OrgFalsa"
+
+class ObtenerHistoriasTest(unittest.TestCase):
+    def _servidor(self, historias, desordenar=False):
+        servidor = iniciar_servidor(historias=historias, desordenar=desordenar)
+        self.addCleanup(servidor.server_close)
+        self.addCleanup(servidor.shutdown)
+        url_base = f"http://127.0.0.1:{servidor.server_port}"
+        parche = mock.patch.object(api, "_URL_BASE", url_base)
+        parche.start()
+        self.addCleanup(parche.stop)
+        return servidor, url_base
+
+    def _obtener(self, max_historias):
+        return api.obtener_historias(ORG, PROYECTO, ITERACION, "pat-pruebas", "7.0", max_historias, max_workers=4)
+
+    def test_una_consulta_wiql_y_un_lote_por_cada_200_ids(self):
+        for n in (1, 200, 201, 450):
+            with self.subTest(historias=n):
+                servidor, _ = self._servidor(n)
+                historias = self._obtener(n)
+                self.assertEqual(len(historias), n)
+                self.assertEqual(servidor.contadores.get("wiql"), 1)
+                self.assertEqual(servidor.contadores.get("workitemsbatch"), math.ceil(n / 200))
+
+    def test_conserva_el_orden_wiql_aunque_los_lotes_lleguen_desordenados(self):
+        self._servidor(450, desordenar=True)
+        historias = self._obtener(450)
+        self.assertEqual([h["id"] for h in historias], list(range(1, 451)))
+
+    def test_forma_de_cada_historia(self):
+        _, url_base = self._servidor(3)
+        historias = self._obtener(3)
+        for h in historias:
+            self.assertEqual(set(h), {"id", "titulo", "url", "descripcion", "aceptacion_criterios"})
+            self.assertEqual(h["url"], f"{url_base}/{ORG}/{PROYECTO}/_workitems/edit/{h['id']}")
+            self.assertTrue(h["titulo"])
+            # El HTML de Azure DevOps se convierte a texto.
+            self.assertNotIn("<div>", h["descripcion"])
+            self.assertNotIn("<li>", h["aceptacion_criterios"])
+
+if __name__ == "__main__":
+    unittest.main()
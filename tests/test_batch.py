@@ -0,0 +1,56 @@
+"""
+Pruebas de la resolución de objetivos del modo batch contra el Azure DevOps falso de benchmarks/.
+"""
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+import requests
+
+import batch
+from benchmarks.ado_falso import ITERACION, PROYECTO, iniciar_servidor
+from src.azure import api
+from src.config import settings
+
+class ExpandirObjetivosTest(unittest.TestCase):
+    def setUp(self):
+        servidor = iniciar_servidor(historias=3)
+        self.addCleanup(servidor.server_close)
+        self.addCleanup(servidor.shutdown)
+        parche = mock.patch.object(api, "_URL_BASE", f"http://127.0.0.1:{servidor.server_port}")
+        parche.start()
+        self.addCleanup(parche.stop)
+
+    def test_proyecto_inexistente_es_un_error_y_no_detiene_el_resto(self):
+        expandidos, fallidos = batch._expandir_objetivos(
+            ["Org/ProyectoMalEscrito", f"Org/{PROYECTO}", "Org/Otro/\\Otro\\Sprint 1"], "pat-pruebas"
+        )
+        self.assertEqual(expandidos, [("Org", PROYECTO, ITERACION), ("Org", "Otro", "\\Otro\\Sprint 1")])
+        self.assertEqual([f["objetivo"] for f in fallidos], ["Org/ProyectoMalEscrito"])
+        self.assertIn("404", fallidos[0]["error"])
+
+    def test_404_no_se_confunde_con_no_hay_iteraciones(self):
+        with self.assertRaises(requests.HTTPError):
+            api.obtener_iteraciones_actuales("ProyectoMalEscrito", "Org", "pat-pruebas")
+
+    def test_main_cuenta_los_objetivos_no_resueltos_como_fallidos(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            with mock.patch.object(settings, "pat", "pat-pruebas"), \
+                 mock.patch.object(settings, "cache_ruta", os.path.join(directorio, "cache.sqlite")), \
+                 mock.patch.object(settings, "historial_ruta", os.path.join(directorio, "historial.sqlite")):
+                salida = io.StringIO()
+                with redirect_stdout(salida):
+                    codigo = batch.main(["Org/ProyectoMalEscrito", "--salida", directorio])
+        self.assertEqual(codigo, 1)
+        self.assertIn("❌ Org/ProyectoMalEscrito", salida.getvalue())
+        self.assertIn("Evaluando 0 iteraciones", salida.getvalue())
+
+    def test_objetivo_mal_formado(self):
+        with self.assertRaises(ValueError):
+            batch._expandir_objetivos(["SoloOrg"], "pat-pruebas")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from src.evaluation import cache as modulo_cache
+from src.evaluation.cache import CacheEvaluaciones, clave_historia, evaluar_historias_con_cache
+
+def _historia(wid, titulo="Exportar reporte"):
+    return {"id": wid, "titulo": titulo, "descripcion": "Como analista quiero exportar",
+            "aceptacion_criterios": "Dado un reporte, cuando exporto, entonces obtengo un PDF"}
+
+class ClaveHistoriaTest(unittest.TestCase):
+    def test_depende_solo_del_contenido(self):
+        base = _historia(1)
+        self.assertEqual(clave_historia(base), clave_historia({**base, "id": 2, "url": "https://otra"}))
+
+    def test_cambia_con_cada_campo_evaluado_y_con_la_version(self):
+        base = _historia(1)
+        variantes = {
+            "version": (base, "otra-version"),
+            "titulo": ({**base, "titulo": "Otro título"}, modulo_cache.VERSION_PROMPT),
+            "descripcion": ({**base, "descripcion": "Otra descripción"}, modulo_cache.VERSION_PROMPT),
+            "criterios": ({**base, "aceptacion_criterios": "Otros criterios"}, modulo_cache.VERSION_PROMPT),
+            "dependencias": ({**base, "dependencias": {"depende_de": [7], "fan_in": 1, "fan_out": 0}},
+                             modulo_cache.VERSION_PROMPT),
+        }
+        for nombre, (historia, version) in variantes.items():
+            with self.subTest(campo=nombre):
+                self.assertNotEqual(clave_historia(historia, version), clave_historia(base))
+
+class CacheEvaluacionesTest(unittest.TestCase):
+    def setUp(self):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        self.ruta = os.path.join(directorio.name, "sub", "cache.sqlite")
+
+    def _cache(self, **kwargs):
+        cache = CacheEvaluaciones(self.ruta, **kwargs)
+        self.addCleanup(cache.cerrar)
+        return cache
+
+    def test_guardar_y_obtener_con_el_id_de_la_historia_actual(self):
+        cache = self._cache()
+        self.assertIsNone(cache.obtener(_historia(1)))
+        cache.guardar(_historia(1), {"id": 1, "complejidad": 2.0})
+        # Misma historia con otro ID (p. ej. copiada): se reutiliza, pero con su propio ID.
+        self.assertEqual(cache.obtener(_historia(5)), {"id": 5, "complejidad": 2.0})
+        self.assertEqual(cache.estadisticas(), {"aciertos": 1, "fallos": 1, "tasa_aciertos": 0.5})
+
+    def test_persiste_entre_aperturas(self):
+        self._cache().guardar(_historia(1), {"id": 1})
+        self.assertIsNotNone(self._cache().obtener(_historia(1)))
+
+    def test_entradas_vencidas_no_se_usan_y_se_purgan(self):
+        cache = self._cache(max_dias=1)
+        with mock.patch.object(modulo_cache.time, "time", return_value=1000.0):
+            cache.guardar(_historia(1), {"id": 1})
+        with mock.patch.object(modulo_cache.time, "time", return_value=1000.0 + 2 * 24 * 3600):
+            self.assertIsNone(cache.obtener(_historia(1)))
+            cache.purgar()
+        self.assertEqual(cache._conn.execute("SELECT COUNT(*) FROM evaluaciones").fetchone()[0], 0)
+
+    def test_purga_las_menos_usadas_recientemente(self):
+        cache = self._cache(max_entradas=2)
+        for i, instante in ((1, 100.0), (2, 200.0), (3, 300.0)):
+            with mock.patch.object(modulo_cache.time, "time", return_value=instante):
+                cache.guardar(_historia(i, f"Historia {i}"), {"id": i})
+        # Usar la 1 la vuelve la más reciente: se elimina la 2.
+        with mock.patch.object(modulo_cache.time, "time", return_value=400.0):
+            cache.obtener(_historia(1, "Historia 1"))
+            cache.purgar()
+            self.assertIsNotNone(cache.obtener(_historia(1, "Historia 1")))
+            self.assertIsNone(cache.obtener(_historia(2, "Historia 2")))
+            self.assertIsNotNone(cache.obtener(_historia(3, "Historia 3")))
+
+class EvaluarConCacheTest(unittest.TestCase):
+    def setUp(self):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        self.cache = CacheEvaluaciones(os.path.join(directorio.name, "cache.sqlite"))
+        self.addCleanup(self.cache.cerrar)
+        self.evaluadas = []
+
+    def _evaluador(self, historias, *args, al_resultado=None, **kwargs):
+        self.evaluadas.append([h["id"] for h in historias])
+        resultados = [{"id": h["id"], "complejidad": 1.5} for h in historias]
+        for r in resultados:
+            if al_resultado:
+                al_resultado(r)
+        return resultados
+
+    def _evaluar(self, historias, **kwargs):
+        return evaluar_historias_con_cache(historias, self.cache, 10, 2, evaluador=self._evaluador, **kwargs)
+
+    def test_solo_los_fallos_llegan_al_evaluador(self):
+        self._evaluar([_historia(1, "A"), _historia(2, "B")])
+        estadisticas, recibidas = {}, []
+        resultados = self._evaluar([_historia(1, "A"), _historia(2, "B"), _historia(3, "C")],
+                                   estadisticas=estadisticas, al_resultado=recibidas.append)
+        self.assertEqual(self.evaluadas, [[1, 2], [3]])
+        self.assertEqual([r["id"] for r in resultados], [1, 2, 3])
+        self.assertEqual(sorted(r["id"] for r in recibidas), [1, 2, 3])
+        self.assertEqual(estadisticas, {"aciertos": 2, "fallos": 1, "tasa_aciertos": 0.667})
+        # Los contadores de la caché acumulan todas las llamadas.
+        self.assertEqual(self.cache.estadisticas()["fallos"], 3)
+
+    def test_todo_en_cache_no_llama_al_evaluador(self):
+        self._evaluar([_historia(1)])
+        self._evaluar([_historia(1)])
+        self.assertEqual(self.evaluadas, [[1]])
+
+if __name__ == "__main__":
+    unittest.main()
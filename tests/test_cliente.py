@@ -0,0 +1,127 @@
+"""
+Pruebas de los reintentos, la concurrencia por host y las pausas de ClienteADO,
+con la sesión de requests simulada (sin red).
+"""
+import threading
+import time
+import unittest
+from unittest import mock
+
+import requests
+
+from src.azure import cliente as modulo_cliente
+from src.azure.cliente import ClienteADO, obtener_cliente
+
+URL = "https://dev.azure.com/Org/_apis/wit/wiql"
+
+def _respuesta(estado=200, cabeceras=None, cuerpo=b"{}"):
+    resp = requests.Response()
+    resp.status_code = estado
+    resp.headers.update(cabeceras or {})
+    resp._content = cuerpo
+    resp.url = URL
+    return resp
+
+class ClienteADOTest(unittest.TestCase):
+    def setUp(self):
+        self.cliente = ClienteADO("pat", reintentos=3, espera_base=1.0, espera_max=60.0)
+        self.esperas = []
+        parche = mock.patch.object(modulo_cliente.time, "sleep", side_effect=self.esperas.append)
+        parche.start()
+        self.addCleanup(parche.stop)
+
+    def _simular(self, *respuestas):
+        peticion = mock.patch.object(self.cliente.session, "request", side_effect=list(respuestas))
+        simulada = peticion.start()
+        self.addCleanup(peticion.stop)
+        return simulada
+
+    def test_429_respeta_retry_after(self):
+        simulada = self._simular(_respuesta(429, {"Retry-After": "7"}), _respuesta(200))
+        self.assertEqual(self.cliente.get(URL).status_code, 200)
+        self.assertEqual(simulada.call_count, 2)
+        self.assertAlmostEqual(self.esperas[0], 7, delta=0.1)
+        # El 429 pausa el host entero, no solo esta petición: los demás hilos también esperan.
+        restante = self.cliente._pausas["dev.azure.com"] - time.monotonic()
+        self.assertAlmostEqual(restante, 7, delta=0.5)
+
+    def test_503_agota_los_reintentos_y_lanza_http_error(self):
+        simulada = self._simular(*[_respuesta(503) for _ in range(4)])
+        with self.assertRaises(requests.HTTPError):
+            self.cliente.get(URL)
+        self.assertEqual(simulada.call_count, 4)
+        # Backoff exponencial con jitter: entre la mitad y el total de 1, 2 y 4 segundos.
+        self.assertEqual(len(self.esperas), 3)
+        for espera, tope in zip(self.esperas, (1, 2, 4)):
+            self.assertTrue(tope / 2 <= espera <= tope, (espera, tope))
+
+    def test_errores_definitivos_no_se_reintentan(self):
+        simulada = self._simular(_respuesta(404))
+        with self.assertRaises(requests.HTTPError):
+            self.cliente.get(URL)
+        self.assertEqual(simulada.call_count, 1)
+        self.assertEqual(self.esperas, [])
+
+    def test_errores_de_conexion_se_reintentan(self):
+        simulada = self._simular(requests.ConnectionError("caída"), requests.Timeout("lento"), _respuesta(200))
+        self.assertEqual(self.cliente.post(URL, json={}).status_code, 200)
+        self.assertEqual(simulada.call_count, 3)
+        self.assertEqual(len(self.esperas), 2)
+
+    def test_error_de_conexion_persistente_se_propaga(self):
+        self._simular(*[requests.ConnectionError("caída") for _ in range(4)])
+        with self.assertRaises(requests.ConnectionError):
+            self.cliente.get(URL)
+
+    def test_x_ratelimit_agotado_pausa_el_host(self):
+        reinicio = time.time() + 5
+        self._simular(
+            _respuesta(200, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(reinicio)}),
+            _respuesta(200),
+            _respuesta(200),
+        )
+        self.cliente.get(URL)
+        self.assertEqual(self.esperas, [])
+        self.cliente.get("https://otro.host/api")
+        self.assertEqual(self.esperas, [], "la pausa es solo del host que la pidió")
+        self.cliente.get(URL)
+        self.assertEqual(len(self.esperas), 1)
+        self.assertAlmostEqual(self.esperas[0], 5, delta=0.5)
+
+class SemaforoPorHostTest(unittest.TestCase):
+    def test_limita_las_peticiones_simultaneas_a_cada_host(self):
+        cliente = ClienteADO("pat", max_por_host=2)
+        lock = threading.Lock()
+        en_curso = {"a": 0, "b": 0}
+        maximos = {"a": 0, "b": 0}
+        liberar = threading.Event()
+
+        def peticion(metodo, url, **kwargs):
+            host = "a" if "host-a" in url else "b"
+            with lock:
+                en_curso[host] += 1
+                maximos[host] = max(maximos[host], en_curso[host])
+            liberar.wait(0.2)
+            with lock:
+                en_curso[host] -= 1
+            return _respuesta(200)
+
+        with mock.patch.object(cliente.session, "request", side_effect=peticion):
+            hilos = [threading.Thread(target=cliente.get, args=(f"https://host-{h}/api",)) for h in "aaaaabbbbb"]
+            for hilo in hilos:
+                hilo.start()
+            for hilo in hilos:
+                hilo.join()
+        self.assertEqual(maximos, {"a": 2, "b": 2})
+
+class ObtenerClienteTest(unittest.TestCase):
+    def test_un_cliente_por_pat(self):
+        self.addCleanup(modulo_cliente._clientes.pop, "pat-uno", None)
+        self.addCleanup(modulo_cliente._clientes.pop, "pat-dos", None)
+        uno = obtener_cliente("pat-uno")
+        self.assertIs(obtener_cliente("pat-uno"), uno)
+        self.assertIsNot(obtener_cliente("pat-dos"), uno)
+        self.assertEqual(uno.session.auth.password, "pat-uno")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+
+from src.evaluation.compactacion import (
+    CARACTERES_POR_TOKEN, MAX_FILAS_TABLA, compactar_historias, compactar_texto, estimar_tokens,
+)
+
+def _historia(wid, descripcion, criterios="", titulo="Título"):
+    return {"id": wid, "titulo": titulo, "descripcion": descripcion, "aceptacion_criterios": criterios}
+
+class CompactarTextoTest(unittest.TestCase):
+    def test_data_uri_suelta_conserva_la_prosa_que_sigue(self):
+        texto = "Ver data:image/png;base64,AAAA y luego el resto del texto importante que sigue aqui. Fin"
+        self.assertEqual(compactar_texto(texto), "Ver y luego el resto del texto importante que sigue aqui. Fin")
+
+    def test_data_uri_partida_en_lineas(self):
+        base64 = "\n".join(["Q" * 76, "Q" * 76, "QQ=="])
+        texto = f"Antes data:image/png;base64,{base64}\nDespués"
+        self.assertEqual(compactar_texto(texto), "Antes\nDespués")
+
+    def test_data_uri_no_se_come_una_linea_corta_de_prosa(self):
+        texto = "data:image/png;base64,QUFB\nFin"
+        self.assertEqual(compactar_texto(texto), "Fin")
+
+    def test_imagenes_y_enlaces(self):
+        texto = ("![captura](data:image/png;base64,iVBORw0KGgo=) y ![](http://x/a.png) "
+                 "<img src=\"x.png\"> ver [la guía](http://wiki/guia_(v2)) o <https://ejemplo.com>")
+        self.assertEqual(compactar_texto(texto), "[imagen: captura] y ver la guía o https://ejemplo.com")
+
+    def test_tablas_largas_se_recortan(self):
+        filas = [f"| fila {i} | valor |" for i in range(MAX_FILAS_TABLA + 5)]
+        lineas = compactar_texto("\n".join(["Tabla:"] + filas + ["Después"])).splitlines()
+        self.assertEqual(lineas[1:MAX_FILAS_TABLA + 1], filas[:MAX_FILAS_TABLA])
+        self.assertEqual(lineas[MAX_FILAS_TABLA + 1], "[… 5 filas de la tabla omitidas]")
+        self.assertEqual(lineas[-1], "Después")
+
+    def test_tabla_al_final_del_texto(self):
+        filas = [f"| {i} |" for i in range(MAX_FILAS_TABLA + 1)]
+        lineas = compactar_texto("\n".join(filas)).splitlines()
+        self.assertEqual(lineas[-1], "[… 1 filas de la tabla omitidas]")
+
+    def test_colapsa_espacios_separadores_y_lineas_vacias(self):
+        texto = "Uno​  \t dos\n\n\n\n* * *\n##\n****\nTres"
+        self.assertEqual(compactar_texto(texto), "Uno dos\n\nTres")
+
+class CompactarHistoriasTest(unittest.TestCase):
+    def test_no_modifica_las_originales_y_cuenta_el_ahorro(self):
+        original = _historia(1, "Texto   con   espacios\n\n\n\nde más")
+        compactadas, estadisticas = compactar_historias([original])
+        self.assertEqual(original["descripcion"], "Texto   con   espacios\n\n\n\nde más")
+        self.assertEqual(compactadas[0]["descripcion"], "Texto con espacios\n\nde más")
+        self.assertGreater(estadisticas["bytes_ahorrados"], 0)
+        self.assertEqual(estadisticas["historias_truncadas"], 0)
+
+    def test_presupuesto_por_prompt_limita_el_de_cada_historia(self):
+        # 1000 tokens por prompt entre 10 historias: 100 tokens (400 caracteres) por historia.
+        historia = _historia(1, "palabra " * 300, titulo="")
+        compactadas, estadisticas = compactar_historias([historia], max_tokens_historia=1500,
+                                                        max_tokens_prompt=1000, tamano_lote=10)
+        self.assertLessEqual(len(compactadas[0]["descripcion"]), 100 * CARACTERES_POR_TOKEN)
+        self.assertTrue(compactadas[0]["descripcion"].endswith(" […]"))
+        self.assertEqual(estadisticas["historias_truncadas"], 1)
+        self.assertLessEqual(estadisticas["tokens_estimados"], 100)
+
+    def test_lo_que_un_campo_no_usa_lo_aprovecha_el_otro(self):
+        historia = _historia(1, "palabra " * 300, criterios="Corto", titulo="")
+        compactadas, _ = compactar_historias([historia], max_tokens_historia=100, tamano_lote=1)
+        presupuesto = 100 * CARACTERES_POR_TOKEN
+        self.assertEqual(compactadas[0]["aceptacion_criterios"], "Corto")
+        self.assertGreater(len(compactadas[0]["descripcion"]), presupuesto // 2)
+        self.assertLessEqual(len(compactadas[0]["descripcion"]) + len("Corto"), presupuesto)
+
+    def test_ambos_campos_largos_reciben_la_mitad(self):
+        historia = _historia(1, "descripcion " * 200, criterios="criterio " * 200, titulo="")
+        compactadas, _ = compactar_historias([historia], max_tokens_historia=100, tamano_lote=1)
+        mitad = 100 * CARACTERES_POR_TOKEN // 2
+        self.assertLessEqual(len(compactadas[0]["descripcion"]), mitad)
+        self.assertLessEqual(len(compactadas[0]["aceptacion_criterios"]), mitad)
+
+    def test_estimar_tokens(self):
+        self.assertEqual(estimar_tokens(""), 0)
+        self.assertEqual(estimar_tokens("a" * (CARACTERES_POR_TOKEN + 1)), 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import subprocess
+import sys
+import unittest
+from unittest import mock
+
+from src.logic import estimation
+from src.logic.estimation import estimar_dias, estimar_dias_lote, simular_sprint
+
+class EstimacionTest(unittest.TestCase):
+    def test_lote_da_los_mismos_valores_que_estimar_dias(self):
+        complejidades = [1, 2.5, 3, 5]
+        for capacidad in (None, {"carga": 0, "historias": 4}, {"carga": 20, "historias": 12}):
+            with self.subTest(capacidad=capacidad):
+                self.assertEqual(
+                    estimar_dias_lote(complejidades, capacidad),
+                    [estimar_dias(c, capacidad) for c in complejidades],
+                )
+        self.assertEqual(estimar_dias_lote([3]), [estimar_dias(3)])
+
+    def test_simulacion_reproducible_con_semilla(self):
+        a = simular_sprint([1, 2.5, 5], escenarios=1000, semilla=7)
+        b = simular_sprint([1, 2.5, 5], escenarios=1000, semilla=7)
+        self.assertEqual(a, b)
+        self.assertEqual(simular_sprint([], escenarios=1000), None)
+
+    def test_sin_numpy_usa_python_puro(self):
+        complejidades = [1, 2.5, 3, 5]
+        con_numpy = estimar_dias_lote(complejidades)
+        with mock.patch.object(estimation, "_numpy", return_value=None):
+            self.assertEqual(estimar_dias_lote(complejidades), con_numpy)
+            resultado = simular_sprint(complejidades, escenarios=2000, semilla=1, capacidad_dias=30)
+        self.assertEqual(resultado["motor"], "python")
+        self.assertEqual(set(resultado["percentiles_dias"]), {"p50", "p80", "p90", "p95"})
+        self.assertTrue(0 <= resultado["probabilidad_cumplir"] <= 1)
+
+    def test_importar_el_modulo_no_carga_numpy(self):
+        salida = subprocess.run(
+            [sys.executable, "-c", "import sys, src.logic.estimation; print('numpy' in sys.modules)"],
+            capture_output=True, text=True, check=True,
+        )
+        self.assertEqual(salida.stdout.strip(), "False")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+"""
+Pruebas del evaluador con gemini-cli, usando el sustituto de benchmarks/gemini_falso.py.
+"""
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import threading
+import time
+import unittest
+from unittest import mock
+
+from src.config import settings
+from src.evaluation import gemini
+from src.evaluation.gemini import _ExtractorObjetos, _ejecutar_gemini, evaluar_historias_cli
+from src.utils.metricas import Metricas, metricas
+
+GEMINI_FALSO = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "gemini_falso.py")
+
+def _historia(wid):
+    return {"id": wid, "titulo": f"HU {wid}", "descripcion": "Descripción", "aceptacion_criterios": "Criterios"}
+
+class ExtractorObjetosTest(unittest.TestCase):
+    def test_objetos_partidos_en_fragmentos(self):
+        extractor = _ExtractorObjetos()
+        self.assertEqual(extractor.alimentar('```json\n[{"id": 1, "a": {"b"'), [])
+        self.assertEqual(extractor.alimentar(': 2}}, {"id"'), [{"id": 1, "a": {"b": 2}}])
+        self.assertEqual(extractor.alimentar(': 2}]\n```'), [{"id": 2}])
+
+    def test_llaves_y_comillas_dentro_de_cadenas(self):
+        extractor = _ExtractorObjetos()
+        texto = '{"id": 1, "t": "usa {llaves} y \\"comillas\\" y \\\\"} {"id": 2}'
+        self.assertEqual(extractor.alimentar(texto),
+                         [{"id": 1, "t": 'usa {llaves} y "comillas" y \\'}, {"id": 2}])
+
+    def test_descarta_texto_entre_llaves_que_no_es_json(self):
+        extractor = _ExtractorObjetos()
+        self.assertEqual(extractor.alimentar('Aquí {no es json} y luego {"id": 3}'), [{"id": 3}])
+
+class GeminiFalsoTest(unittest.TestCase):
+    def setUp(self):
+        parche = mock.patch.object(settings, "gemini_cli", f'"{sys.executable}" "{GEMINI_FALSO}"')
+        parche.start()
+        self.addCleanup(parche.stop)
+
+    def _entorno(self, **variables):
+        parche = mock.patch.dict(os.environ, {nombre: str(valor) for nombre, valor in variables.items()})
+        parche.start()
+        self.addCleanup(parche.stop)
+
+    def test_divide_en_lotes_y_conserva_el_orden(self):
+        registro = Metricas()
+        recibidas = []
+        with metricas.ambito(registro):
+            resultados = evaluar_historias_cli([_historia(i) for i in range(1, 26)], tamano_lote=10,
+                                               max_workers=3, timeout=30, al_resultado=recibidas.append)
+        self.assertEqual([r["id"] for r in resultados], list(range(1, 26)))
+        self.assertEqual(sorted(r["id"] for r in recibidas), list(range(1, 26)))
+        # Un prompt y una invocación de la CLI por lote: 10 + 10 + 5.
+        self.assertEqual(registro.resumen()["prompt"]["llamadas"], 3)
+        self.assertEqual(registro.resumen()["llm"]["llamadas"], 3)
+        self.assertEqual(registro.resumen()["llm"]["elementos"], 25)
+
+    def test_timeout_mata_el_proceso(self):
+        self._entorno(GEMINI_FALSO_DEMORA=30)
+        inicio = time.perf_counter()
+        with self.assertRaises(subprocess.TimeoutExpired):
+            _ejecutar_gemini(gemini._construir_prompt([_historia(1)]), 0.5, lambda obj: None)
+        self.assertLess(time.perf_counter() - inicio, 10)
+
+    def test_objetos_notificados_en_cuanto_llegan(self):
+        self._entorno(GEMINI_FALSO_DEMORA_HISTORIA=0.3)
+        momentos = []
+        inicio = time.perf_counter()
+        _ejecutar_gemini(gemini._construir_prompt([_historia(1), _historia(2), _historia(3)]), 30,
+                         lambda obj: momentos.append(time.perf_counter() - inicio))
+        self.assertEqual(len(momentos), 3)
+        self.assertLess(momentos[0], momentos[2] - 0.4)
+
+    def test_excepcion_en_al_objeto_no_deja_el_proceso_vivo(self):
+        self._entorno(GEMINI_FALSO_DEMORA_HISTORIA=5)
+        procesos = []
+        popen = subprocess.Popen
+
+        def registrar_popen(*args, **kwargs):
+            procesos.append(popen(*args, **kwargs))
+            return procesos[-1]
+
+        def fallar(obj):
+            raise RuntimeError("fallo del consumidor")
+
+        hilos_antes = set(threading.enumerate())
+        inicio = time.perf_counter()
+        with mock.patch.object(gemini.subprocess, "Popen", side_effect=registrar_popen):
+            with self.assertRaises(RuntimeError):
+                _ejecutar_gemini(gemini._construir_prompt([_historia(1), _historia(2)]), 60, fallar)
+        self.assertLess(time.perf_counter() - inicio, 4)
+        self.assertIsNotNone(procesos[0].returncode, "el proceso debe haber terminado y sido recogido")
+        self.assertEqual([h for h in threading.enumerate() if h not in hilos_antes and h.is_alive()], [])
+
+class ReintentosPorLoteTest(unittest.TestCase):
+    def test_solo_se_reintenta_el_lote_fallido(self):
+        llamadas = []
+
+        def ejecutar(prompt, timeout, al_objeto):
+            ids = [int(linea.split(": ")[1]) for linea in prompt.splitlines() if linea.startswith("Historia ID: ")]
+            llamadas.append(ids)
+            if ids == [3, 4] and llamadas.count(ids) == 1:
+                raise subprocess.TimeoutExpired("gemini", timeout)
+            objetos = [{"id": wid} for wid in ids]
+            for obj in objetos:
+                al_objeto(obj)
+            return objetos
+
+        with mock.patch.object(gemini, "_ejecutar_gemini", side_effect=ejecutar), \
+             contextlib.redirect_stdout(io.StringIO()) as salida:
+            resultados = evaluar_historias_cli([_historia(i) for i in range(1, 6)], tamano_lote=2,
+                                               max_workers=1, reintentos=1)
+        self.assertEqual([r["id"] for r in resultados], [1, 2, 3, 4, 5])
+        self.assertEqual(llamadas, [[1, 2], [3, 4], [3, 4], [5]])
+        self.assertIn("Tiempo agotado evaluando las historias [3, 4] (intento 1)", salida.getvalue())
+
+    def test_lote_que_agota_los_reintentos_no_invalida_el_resto(self):
+        def ejecutar(prompt, timeout, al_objeto):
+            if "Historia ID: 1\n" in prompt:
+                raise subprocess.CalledProcessError(1, "gemini", stderr="cuota agotada")
+            al_objeto({"id": 2})
+            return [{"id": 2}]
+
+        with mock.patch.object(gemini, "_ejecutar_gemini", side_effect=ejecutar) as simulada, \
+             contextlib.redirect_stdout(io.StringIO()):
+            resultados = evaluar_historias_cli([_historia(1), _historia(2)], tamano_lote=1, reintentos=2)
+        self.assertEqual([r["id"] for r in resultados], [2])
+        self.assertEqual(simulada.call_count, 4)
+
+if __name__ == "__main__":
+    unittest.main()
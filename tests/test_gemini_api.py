@@ -0,0 +1,74 @@
+import contextlib
+import io
+import os
+import sys
+import time
+import unittest
+from email.utils import formatdate
+
+# gemini_api_falso importa gemini_falso como módulo suelto, igual que al lanzarlo desde benchmarks/.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from gemini_api_falso import iniciar_servidor
+from src.evaluation.gemini_api import evaluar_historias_api
+from src.utils.metricas import Metricas, metricas
+from src.utils.reintentos import espera_reintento
+
+def _historia(wid):
+    return {"id": wid, "titulo": f"HU {wid}", "descripcion": "", "aceptacion_criterios": ""}
+
+class EvaluarHistoriasApiTest(unittest.TestCase):
+    def _evaluar(self, historias, **kwargs):
+        servidor = iniciar_servidor(**kwargs)
+        self.addCleanup(servidor.server_close)
+        self.addCleanup(servidor.shutdown)
+        salida = io.StringIO()
+        with contextlib.redirect_stdout(salida):
+            resultados = evaluar_historias_api(
+                historias, tamano_lote=1, max_workers=2, reintentos=0,
+                url_base=f"http://127.0.0.1:{servidor.server_port}", api_key="clave",
+            )
+        return resultados, salida.getvalue()
+
+    def test_evalua_todas_las_historias(self):
+        resultados, _ = self._evaluar([_historia(1), _historia(2)])
+        self.assertEqual([r["id"] for r in resultados], [1, 2])
+
+    def test_respuesta_html_solo_pierde_su_lote(self):
+        resultados, salida = self._evaluar([_historia(1), _historia(2)], ids_html={2})
+        self.assertEqual([r["id"] for r in resultados], [1])
+        self.assertIn("Respuesta no válida de la API de Gemini para las historias [2]", salida)
+
+    def test_llamadas_sucesivas_reutilizan_las_conexiones(self):
+        servidor = iniciar_servidor()
+        self.addCleanup(servidor.server_close)
+        self.addCleanup(servidor.shutdown)
+        url_base = f"http://127.0.0.1:{servidor.server_port}"
+        # Como las rondas de recuperación: varias llamadas seguidas al evaluador.
+        for wid in (1, 2, 3):
+            resultados = evaluar_historias_api([_historia(wid)], tamano_lote=1, max_workers=1, reintentos=0,
+                                               url_base=url_base, api_key="clave")
+            self.assertEqual([r["id"] for r in resultados], [wid])
+        self.assertEqual(servidor.contadores["peticiones"], 3)
+        self.assertEqual(servidor.contadores["conexiones"], 1)
+
+    def test_registra_las_metricas_en_el_ambito_de_quien_llama(self):
+        registro = Metricas()
+        with metricas.ambito(registro):
+            self._evaluar([_historia(1), _historia(2)])
+        self.assertEqual(registro.resumen()["llm"]["llamadas"], 2)
+
+class EsperaReintentoTest(unittest.TestCase):
+    def test_respeta_retry_after(self):
+        self.assertEqual(espera_reintento({"Retry-After": "3"}, 0), 3.0)
+        self.assertEqual(espera_reintento({"Retry-After": "300"}, 0), 60.0)
+        fecha = formatdate(time.time() + 30, usegmt=True)
+        self.assertAlmostEqual(espera_reintento({"Retry-After": fecha}, 0), 30, delta=2)
+
+    def test_backoff_exponencial_sin_cabeceras(self):
+        for intento in range(4):
+            espera = espera_reintento(None, intento, espera_base=1.0)
+            self.assertTrue(2 ** intento * 0.5 <= espera <= 2 ** intento)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from src.evaluation.historial import HistorialEvaluaciones
+
+DIA = 24 * 3600
+# 2024-05-01T00:00:00Z
+MAYO = 1714521600.0
+
+def _resultado(wid, puntajes, complejidad=None, estimacion_dias=None):
+    return {
+        "id": wid, "titulo": f"Historia {wid}",
+        "evaluacion_invest": {criterio: {"puntaje": p, "justificacion": "..."} for criterio, p in puntajes.items()},
+        "complejidad": complejidad, "estimacion_dias": estimacion_dias,
+    }
+
+def _metadata(sprint, proyecto="Proyecto"):
+    return {"organizacion": "Org", "proyecto": proyecto, "sprint": sprint}
+
+class HistorialEvaluacionesTest(unittest.TestCase):
+    def setUp(self):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        self.ruta = os.path.join(directorio.name, "sub", "historial.sqlite")
+        self.historial = HistorialEvaluaciones(self.ruta)
+        self.addCleanup(self.historial.cerrar)
+
+    def test_evolucion_de_una_historia(self):
+        self.historial.registrar_ejecucion(_metadata("Sprint 1"), [
+            _resultado(1, {"I": 2, "N": 4}, complejidad=3, estimacion_dias=5),
+            _resultado(2, {"I": 5}),
+        ], fecha=MAYO)
+        self.historial.registrar_ejecucion(_metadata("Sprint 2"), [_resultado(1, {"I": 4, "N": 4})], fecha=MAYO + DIA)
+
+        evolucion = self.historial.historia(1)
+        self.assertEqual([e["sprint"] for e in evolucion], ["Sprint 1", "Sprint 2"])
+        self.assertEqual(evolucion[0]["fecha"], "2024-05-01T00:00:00+00:00")
+        self.assertEqual(evolucion[0]["invest"], 3.0)
+        self.assertEqual(evolucion[0]["puntajes"], {"I": 2.0, "N": 4.0})
+        self.assertEqual((evolucion[0]["complejidad"], evolucion[0]["estimacion_dias"]), (3.0, 5.0))
+        self.assertEqual(evolucion[1]["invest"], 4.0)
+        self.assertEqual(self.historial.historia(99), [])
+
+    def test_filtros_por_organizacion_y_proyecto(self):
+        self.historial.registrar_ejecucion(_metadata("S1", "A"), [_resultado(1, {"I": 1})], fecha=MAYO)
+        self.historial.registrar_ejecucion(_metadata("S1", "B"), [_resultado(1, {"I": 5})], fecha=MAYO)
+        self.assertEqual([e["invest"] for e in self.historial.historia(1, proyecto="B")], [5.0])
+        self.assertEqual(len(self.historial.historia(1, organizacion="Org")), 2)
+        self.assertEqual(self.historial.historia(1, organizacion="Otra"), [])
+
+    def test_tendencia_por_sprint(self):
+        self.historial.registrar_ejecucion(_metadata("Sprint 1"), [
+            _resultado(1, {"I": 2}, complejidad=2), _resultado(2, {"I": 4}, complejidad=4),
+        ], fecha=MAYO)
+        # Reevaluar el sprint suma sus evaluaciones a las anteriores.
+        self.historial.registrar_ejecucion(_metadata("Sprint 1"), [_resultado(1, {"I": 3})], fecha=MAYO + DIA)
+        self.historial.registrar_ejecucion(_metadata("Sprint 2"), [_resultado(3, {})], fecha=MAYO + 14 * DIA)
+
+        sprints = self.historial.tendencia_sprints(desde="2024-04-01", hasta="2024-06-01")
+        self.assertEqual([s["sprint"] for s in sprints], ["Sprint 1", "Sprint 2"])
+        primero, segundo = sprints
+        self.assertEqual((primero["evaluaciones"], primero["ejecuciones"]), (3, 2))
+        self.assertEqual(primero["invest_promedio"], 3.0)
+        self.assertEqual(primero["complejidad_promedio"], 3.0)
+        self.assertIsNone(primero["estimacion_dias_promedio"])
+        self.assertEqual(primero["ultima_evaluacion"], "2024-05-02T00:00:00+00:00")
+        self.assertIsNone(segundo["invest_promedio"])
+
+        self.assertEqual([s["sprint"] for s in self.historial.tendencia_sprints("2024-05-10")], ["Sprint 2"])
+        self.assertEqual(self.historial.tendencia_sprints("2024-04-01", "2024-05-01T12:00:00Z")[0]["ejecuciones"], 1)
+        self.assertEqual(self.historial.tendencia_sprints("2024-04-01", "2024-06-01", proyecto="Otro"), [])
+
+    def test_fecha_no_valida(self):
+        with self.assertRaises(ValueError):
+            self.historial.tendencia_sprints("mayo")
+
+    def test_solo_lectura(self):
+        self.historial.registrar_ejecucion(_metadata("Sprint 1"), [_resultado(1, {"I": 2})], fecha=MAYO)
+        lector = HistorialEvaluaciones(self.ruta, solo_lectura=True)
+        self.addCleanup(lector.cerrar)
+        self.assertEqual(len(lector.historia(1)), 1)
+        with self.assertRaises(sqlite3.OperationalError):
+            lector.registrar_ejecucion(_metadata("Sprint 2"), [_resultado(1, {"I": 2})])
+
+    def test_solo_lectura_no_crea_el_archivo(self):
+        ruta = os.path.join(os.path.dirname(self.ruta), "no_existe.sqlite")
+        with self.assertRaises(sqlite3.OperationalError):
+            HistorialEvaluaciones(ruta, solo_lectura=True)
+        self.assertFalse(os.path.exists(ruta))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+
+from src.web.indices import TAMANO_PAGINA_MAX, IndiceReporte
+
+def _historia(wid, complejidad, puntajes, titulo="", mejoras=(), estimacion_dias=0):
+    return {
+        "id": wid, "titulo": titulo or f"Historia {wid}", "complejidad": complejidad,
+        "estimacion_dias": estimacion_dias, "posibles_mejoras": list(mejoras),
+        "evaluacion_invest": {c: {"puntaje": p, "justificacion": f"Justificación de {c}"} for c, p in puntajes.items()},
+    }
+
+DATOS = {
+    "metadata": {"sprint": "Sprint 1"},
+    "data": [
+        _historia(1, 1.0, {"Independiente": 5, "Pequeña": 5}, "Exportar facturación", estimacion_dias=1),
+        _historia(2, 3.0, {"Independiente": 2, "Pequeña": 3}, "Importar clientes", ["Dividir la historia"], 4),
+        _historia(3, 4.5, {"Independiente": 1, "Pequeña": 1}, "Migración completa", estimacion_dias=9),
+        _historia(4, 2.0, {"Independiente": 4, "Pequeña": 4}, "Exportar pedidos", estimacion_dias=2),
+    ],
+}
+
+def _ids(resultado):
+    return [h["id"] for h in resultado["data"]]
+
+class ConsultarTest(unittest.TestCase):
+    def setUp(self):
+        self.indice = IndiceReporte(DATOS)
+
+    def _consultar(self, **params):
+        return self.indice.consultar({nombre: [str(valor)] for nombre, valor in params.items()})
+
+    def test_sin_parametros_ordena_por_id(self):
+        resultado = self._consultar()
+        self.assertEqual(_ids(resultado), [1, 2, 3, 4])
+        self.assertEqual(resultado["paginacion"], {"pagina": 1, "tamano": 50, "total": 4, "paginas": 1})
+        self.assertEqual(resultado["metadata"], DATOS["metadata"])
+
+    def test_rangos_de_complejidad_e_invest_inclusivos(self):
+        self.assertEqual(_ids(self._consultar(complejidad_min=2, complejidad_max=4.5)), [2, 3, 4])
+        self.assertEqual(_ids(self._consultar(complejidad_max=1)), [1])
+        self.assertEqual(_ids(self._consultar(invest_min=2.5, invest_max=4)), [2, 4])
+        self.assertEqual(_ids(self._consultar(complejidad_min=2, invest_min=3)), [4])
+        self.assertEqual(_ids(self._consultar(complejidad_min="")), [1, 2, 3, 4])
+
+    def test_minimo_por_criterio_sin_tildes(self):
+        self.assertEqual(_ids(self._consultar(min_pequena=4)), [1, 4])
+        self.assertEqual(_ids(self._consultar(min_independiente=2, min_pequeña=3)), [1, 2, 4])
+
+    def test_busqueda_por_prefijo_de_todas_las_palabras(self):
+        self.assertEqual(_ids(self._consultar(q="export")), [1, 4])
+        self.assertEqual(_ids(self._consultar(q="export pedi")), [4])
+        self.assertEqual(_ids(self._consultar(q="dividir")), [2])
+        self.assertEqual(_ids(self._consultar(q="migracion")), [3])
+        self.assertEqual(_ids(self._consultar(q="inexistente")), [])
+
+    def test_orden(self):
+        self.assertEqual(_ids(self._consultar(orden="-complejidad")), [3, 2, 4, 1])
+        self.assertEqual(_ids(self._consultar(orden="invest")), [3, 2, 4, 1])
+        self.assertEqual(_ids(self._consultar(orden="-estimacion_dias")), [3, 2, 4, 1])
+        self.assertEqual(_ids(self._consultar(orden="-id")), [4, 3, 2, 1])
+
+    def test_paginacion(self):
+        primera = self._consultar(tamano=3)
+        segunda = self._consultar(tamano=3, pagina=2)
+        self.assertEqual((_ids(primera), _ids(segunda)), ([1, 2, 3], [4]))
+        self.assertEqual(segunda["paginacion"], {"pagina": 2, "tamano": 3, "total": 4, "paginas": 2})
+        self.assertEqual(_ids(self._consultar(pagina=5)), [])
+        self.assertEqual(self._consultar(tamano=10**6)["paginacion"]["tamano"], TAMANO_PAGINA_MAX)
+
+    def test_parametros_no_validos(self):
+        for params in ({"orden": "titulo"}, {"pagina": 0}, {"tamano": -1}, {"pagina": "x"},
+                       {"complejidad_min": "alto"}, {"min_pequena": "mucho"}):
+            with self.subTest(**params), self.assertRaises(ValueError):
+                self._consultar(**params)
+
+class ResumenTest(unittest.TestCase):
+    def test_resumen_precalculado(self):
+        resumen = IndiceReporte(DATOS).resumen
+        self.assertEqual(resumen["total"], 4)
+        self.assertEqual(resumen["complejidad_promedio"], 2.62)
+        self.assertEqual(resumen["estimacion_dias_total"], 16)
+        self.assertEqual(resumen["histograma_complejidad"], {"1": 1, "3": 1, "4.5": 1, "2": 1})
+        self.assertEqual(resumen["histograma_invest"], {"5": 1, "2.5": 1, "1": 1, "4": 1})
+        # Complejidad > 2.5 o INVEST < 2.5.
+        self.assertEqual(resumen["problematicas"], 2)
+        self.assertEqual(resumen["criterios"]["Pequeña"]["promedio"], 3.25)
+
+    def test_reporte_vacio(self):
+        resumen = IndiceReporte({}).resumen
+        self.assertEqual((resumen["total"], resumen["complejidad_promedio"], resumen["invest_promedio"]), (0, 0, 0))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from src.utils.metricas import Metricas, en_contexto
+
+class EtapaTest(unittest.TestCase):
+    def test_acumula_llamadas_elementos_y_bytes(self):
+        registro = Metricas()
+        with registro.etapa("descarga", elementos=2, bytes=100):
+            pass
+        with registro.etapa("descarga") as conteo:
+            # Lo que solo se conoce al terminar se ajusta dentro del bloque.
+            conteo["elementos"], conteo["bytes"] = 3, 50
+        resumen = registro.resumen()["descarga"]
+        self.assertEqual((resumen["llamadas"], resumen["elementos"], resumen["bytes"]), (2, 5, 150))
+        self.assertGreaterEqual(resumen["segundos"], resumen["segundos_max"])
+
+    def test_registra_aunque_el_bloque_falle(self):
+        registro = Metricas()
+        with self.assertRaises(RuntimeError):
+            with registro.etapa("llm"):
+                raise RuntimeError("fallo")
+        self.assertEqual(registro.resumen()["llm"]["llamadas"], 1)
+        self.assertEqual(registro.activas(), [])
+
+    def test_activas_en_el_orden_del_pipeline(self):
+        registro = Metricas()
+        with registro.etapa("escritura"), registro.etapa("otra"), registro.etapa("wiql"):
+            self.assertEqual(registro.activas(), ["wiql", "escritura", "otra"])
+        self.assertEqual(registro.activas(), [])
+
+    def test_resumen_es_una_copia_redondeada(self):
+        registro = Metricas()
+        registro.registrar("parseo", 0.123456789)
+        resumen = registro.resumen()
+        self.assertEqual(resumen["parseo"]["segundos"], 0.1235)
+        resumen["parseo"]["llamadas"] = 99
+        self.assertEqual(registro.resumen()["parseo"]["llamadas"], 1)
+
+    def test_prometheus(self):
+        registro = Metricas()
+        registro.registrar("wiql", 0.5, elementos=10, bytes=2048)
+        lineas = registro.prometheus().splitlines()
+        self.assertIn("# TYPE evaluador_etapa_llamadas_total counter", lineas)
+        self.assertIn("# TYPE evaluador_etapa_segundos_max gauge", lineas)
+        self.assertIn('evaluador_etapa_llamadas_total{etapa="wiql"} 1', lineas)
+        self.assertIn('evaluador_etapa_segundos_total{etapa="wiql"} 0.5', lineas)
+        self.assertIn('evaluador_etapa_elementos_total{etapa="wiql"} 10', lineas)
+        self.assertIn('evaluador_etapa_bytes_total{etapa="wiql"} 2048', lineas)
+        self.assertTrue(registro.prometheus().endswith("\n"))
+
+class AmbitoTest(unittest.TestCase):
+    def test_cada_ambito_recibe_solo_lo_suyo(self):
+        proceso = Metricas()
+        a, b = Metricas(), Metricas()
+        barrera = threading.Barrier(2)
+
+        def ejecutar(registro, veces):
+            with proceso.ambito(registro):
+                barrera.wait()
+                for _ in range(veces):
+                    with proceso.etapa("descarga", elementos=1):
+                        pass
+
+        hilos = [threading.Thread(target=ejecutar, args=(a, 3)), threading.Thread(target=ejecutar, args=(b, 5))]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        self.assertEqual(a.resumen()["descarga"]["llamadas"], 3)
+        self.assertEqual(b.resumen()["descarga"]["llamadas"], 5)
+        self.assertEqual(proceso.resumen()["descarga"]["llamadas"], 8)
+
+    def test_en_contexto_lleva_el_ambito_a_otros_hilos(self):
+        proceso, registro = Metricas(), Metricas()
+        with proceso.ambito(registro):
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                list(executor.map(en_contexto(lambda i: proceso.registrar("llm", 0.1, i)), range(8)))
+            # Sin en_contexto los hilos del pool no ven el ámbito.
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                list(executor.map(lambda i: proceso.registrar("parseo", 0.1), range(2)))
+        self.assertEqual(registro.resumen()["llm"]["llamadas"], 8)
+        self.assertEqual(registro.resumen()["llm"]["elementos"], 28)
+        self.assertNotIn("parseo", registro.resumen())
+        self.assertEqual(proceso.resumen()["parseo"]["llamadas"], 2)
+
+if __name__ == "__main__":
+    unittest.main()
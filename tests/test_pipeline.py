@@ -0,0 +1,82 @@
+"""
+Prueba de extremo a extremo del pipeline con el Azure DevOps y el gemini-cli falsos de benchmarks/.
+"""
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from benchmarks.ado_falso import ITERACION, PROYECTO, iniciar_servidor
+from src.azure import api
+from src.config import settings
+from src.evaluation.cache import CacheEvaluaciones
+from src.pipeline import EvaluacionIteracion
+
+GEMINI_FALSO = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "gemini_falso.py")
+
+class EvaluacionIteracionTest(unittest.TestCase):
+    def setUp(self):
+        servidor = iniciar_servidor(historias=40)
+        self.addCleanup(servidor.server_close)
+        self.addCleanup(servidor.shutdown)
+        for parche in (
+            mock.patch.object(api, "_URL_BASE", f"http://127.0.0.1:{servidor.server_port}"),
+            mock.patch.object(settings, "gemini_cli", f'"{sys.executable}" "{GEMINI_FALSO}"'),
+            mock.patch.object(settings, "evaluador", "cli"),
+            mock.patch.object(settings, "simulacion_escenarios", 1000),
+        ):
+            parche.start()
+            self.addCleanup(parche.stop)
+
+    def test_evalua_todas_las_historias_y_escribe_el_reporte(self):
+        evaluacion = EvaluacionIteracion("OrgFalsa", PROYECTO, ITERACION, "pat-pruebas",
+                                         max_historias=40, incremental=False)
+        self.assertEqual(evaluacion.obtener(), 40)
+
+        recibidas = []
+        resultados = evaluacion.evaluar(al_resultado=recibidas.append)
+        # Las historias casi duplicadas se notifican con la evaluación de su representante.
+        self.assertEqual(sorted(r["id"] for r in recibidas), list(range(1, 41)))
+        self.assertEqual([r["id"] for r in resultados], list(range(1, 41)))
+        self.assertLess(len(evaluacion.representantes), 40)
+        self.assertTrue(all("url" in r and "estimacion_dias" in r for r in recibidas))
+
+        evaluacion.estimar()
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = os.path.join(directorio, "res.json")
+            evaluacion.escribir(ruta)
+            with open(ruta, encoding="utf-8") as f:
+                reporte = json.load(f)
+        self.assertEqual(len(reporte["data"]), 40)
+        for clave in ("compactacion", "dependencias", "similitud", "simulacion_sprint", "metricas"):
+            self.assertIn(clave, reporte["metadata"])
+
+    def _evaluar_con_cache(self, cache):
+        evaluacion = EvaluacionIteracion("OrgFalsa", PROYECTO, ITERACION, "pat-pruebas",
+                                         max_historias=40, incremental=False)
+        evaluacion.obtener()
+        evaluacion.evaluar(cache)
+        evaluacion.estimar()
+        return evaluacion
+
+    def test_metricas_y_cache_de_cada_evaluacion_son_propias(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            cache = CacheEvaluaciones(os.path.join(directorio, "cache.sqlite"))
+            primera = self._evaluar_con_cache(cache)
+            segunda = self._evaluar_con_cache(cache)
+            cache.cerrar()
+
+        representantes = len(primera.representantes)
+        self.assertEqual(primera.metadata["cache"]["fallos"], representantes)
+        self.assertEqual(segunda.metadata["cache"], {"aciertos": representantes, "fallos": 0, "tasa_aciertos": 1.0})
+        # Cada reporte cuenta solo sus propias etapas: la segunda no arrastra las de la primera.
+        for etapa in ("wiql", "descarga", "conversion_html", "dependencias", "estimacion"):
+            self.assertEqual(primera.metricas.resumen()[etapa]["llamadas"],
+                             segunda.metricas.resumen()[etapa]["llamadas"], etapa)
+        self.assertEqual(primera.metricas.resumen()["conversion_html"]["elementos"], 40)
+        self.assertNotIn("llm", segunda.metricas.resumen())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,24 @@
+import unittest
+
+from src.logic.reporte import completar_resultado, completar_resultados
+
+HISTORIAS_MAP = {
+    1: {"id": 1, "url": "https://ado/1", "dependencias": {"depende_de": [2], "fan_in": 1, "fan_out": 0}},
+    2: {"id": 2, "url": "https://ado/2"},
+}
+
+class CompletarResultadosTest(unittest.TestCase):
+    def test_copia_url_y_dependencias(self):
+        resultados = completar_resultados([{"id": 1, "complejidad": 2.5}, {"id": 2}], HISTORIAS_MAP, None, 10, 2)
+        self.assertEqual(resultados[0]["url"], "https://ado/1")
+        self.assertEqual(resultados[0]["dependencias"]["depende_de"], [2])
+        self.assertNotIn("dependencias", resultados[1])
+
+    def test_resultado_sin_historia_no_falla(self):
+        resultados = completar_resultados([{"id": 99, "complejidad": 1}], HISTORIAS_MAP, None, 10, 2)
+        self.assertNotIn("url", resultados[0])
+        self.assertIn("estimacion_dias", resultados[0])
+        self.assertNotIn("url", completar_resultado({"id": 99}, HISTORIAS_MAP, None, 10, 2))
+
+if __name__ == "__main__":
+    unittest.main()
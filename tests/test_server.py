@@ -0,0 +1,158 @@
+"""
+Pruebas de los endpoints del dashboard contra un servidor real en un puerto libre.
+"""
+import gzip
+import http.client
+import json
+import os
+import tempfile
+import threading
+import unittest
+from http.server import ThreadingHTTPServer
+from unittest import mock
+
+from src.config import settings
+from src.evaluation.historial import HistorialEvaluaciones
+from src.utils.metricas import metricas
+from src.web import server
+from src.web.server import CacheReporte, DashboardRequestHandler
+
+class ServidorTest(unittest.TestCase):
+    def setUp(self):
+        servidor = ThreadingHTTPServer(("127.0.0.1", 0), DashboardRequestHandler)
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        self.addCleanup(servidor.server_close)
+        self.addCleanup(servidor.shutdown)
+        self.puerto = servidor.server_port
+
+    def _get(self, ruta, cabeceras=None):
+        conexion = http.client.HTTPConnection("127.0.0.1", self.puerto, timeout=10)
+        self.addCleanup(conexion.close)
+        conexion.request("GET", ruta, headers=cabeceras or {})
+        respuesta = conexion.getresponse()
+        return respuesta, respuesta.read()
+
+class MetricasEndpointTest(ServidorTest):
+    def test_metrics_en_formato_prometheus(self):
+        with metricas.etapa("similitud", elementos=7):
+            pass
+        respuesta, cuerpo = self._get("/metrics")
+        self.assertEqual(respuesta.status, 200)
+        self.assertTrue(respuesta.getheader("Content-Type").startswith("text/plain; version=0.0.4"))
+        lineas = cuerpo.decode("utf-8").splitlines()
+        self.assertIn("# TYPE evaluador_etapa_llamadas_total counter", lineas)
+        self.assertTrue(any(l.startswith('evaluador_etapa_elementos_total{etapa="similitud"} ') for l in lineas))
+
+class ReporteEndpointTest(ServidorTest):
+    def setUp(self):
+        super().setUp()
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        self.ruta = os.path.join(directorio.name, "res.json")
+        parche = mock.patch.object(server, "cache_reporte", CacheReporte(self.ruta))
+        parche.start()
+        self.addCleanup(parche.stop)
+
+    def _escribir_reporte(self, historias=60):
+        datos = {
+            "metadata": {"sprint": "Sprint 1"},
+            "data": [{"id": i, "titulo": f"Historia {i}", "complejidad": 1 + i % 5,
+                      "evaluacion_invest": {"Valiosa": {"puntaje": 1 + i % 5, "justificacion": "..."}}}
+                     for i in range(1, historias + 1)],
+        }
+        with open(self.ruta, "w", encoding="utf-8") as f:
+            json.dump(datos, f)
+        return datos
+
+    def test_sin_reporte_responde_404(self):
+        for ruta in ("/data", "/summary", "/data?pagina=1"):
+            with self.subTest(ruta=ruta):
+                respuesta, _ = self._get(ruta)
+                self.assertEqual(respuesta.status, 404)
+
+    def test_data_summary_y_consulta(self):
+        datos = self._escribir_reporte()
+        respuesta, cuerpo = self._get("/data")
+        self.assertEqual(respuesta.status, 200)
+        self.assertEqual(json.loads(cuerpo), datos)
+        _, cuerpo = self._get("/summary")
+        self.assertEqual(json.loads(cuerpo)["total"], 60)
+        _, cuerpo = self._get("/data?pagina=2&tamano=25&orden=-id")
+        pagina = json.loads(cuerpo)
+        self.assertEqual([h["id"] for h in pagina["data"]][:2], [35, 34])
+        self.assertEqual(pagina["paginacion"]["paginas"], 3)
+
+    def test_etag_y_304(self):
+        self._escribir_reporte()
+        for ruta in ("/data", "/summary", "/data?q=historia"):
+            with self.subTest(ruta=ruta):
+                respuesta, _ = self._get(ruta)
+                etag = respuesta.getheader("ETag")
+                self.assertTrue(etag)
+                respuesta, cuerpo = self._get(ruta, {"If-None-Match": etag})
+                self.assertEqual((respuesta.status, cuerpo), (304, b""))
+        # Otra consulta u otra versión del reporte cambian el ETag.
+        respuesta, _ = self._get("/data?q=historia")
+        etag_consulta = respuesta.getheader("ETag")
+        self.assertNotEqual(self._get("/data?q=otra")[0].getheader("ETag"), etag_consulta)
+        self._escribir_reporte(historias=61)
+        respuesta, _ = self._get("/data?q=historia", {"If-None-Match": etag_consulta})
+        self.assertEqual(respuesta.status, 200)
+
+    def test_gzip_solo_si_el_cliente_lo_acepta(self):
+        datos = self._escribir_reporte()
+        respuesta, cuerpo = self._get("/data", {"Accept-Encoding": "gzip"})
+        self.assertEqual(respuesta.getheader("Content-Encoding"), "gzip")
+        self.assertEqual(respuesta.getheader("Vary"), "Accept-Encoding")
+        self.assertEqual(json.loads(gzip.decompress(cuerpo)), datos)
+        respuesta, cuerpo = self._get("/data")
+        self.assertIsNone(respuesta.getheader("Content-Encoding"))
+        self.assertEqual(json.loads(cuerpo), datos)
+
+    def test_consulta_no_valida_responde_400(self):
+        self._escribir_reporte()
+        for consulta in ("orden=titulo", "pagina=0", "tamano=x", "complejidad_min=alto"):
+            with self.subTest(consulta=consulta):
+                respuesta, _ = self._get(f"/data?{consulta}")
+                self.assertEqual(respuesta.status, 400)
+
+class HistorialEndpointTest(ServidorTest):
+    def setUp(self):
+        super().setUp()
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        self.ruta = os.path.join(directorio.name, "historial.sqlite")
+        for parche in (mock.patch.object(settings, "historial_ruta", self.ruta),
+                       mock.patch.object(server, "_historial", None)):
+            parche.start()
+            self.addCleanup(parche.stop)
+        self.addCleanup(lambda: server._historial and server._historial.cerrar())
+
+    def test_sin_historial_responde_vacio_sin_crear_el_archivo(self):
+        respuesta, cuerpo = self._get("/history?historia=1")
+        self.assertEqual(respuesta.status, 200)
+        self.assertEqual(json.loads(cuerpo), {"historia": 1, "evaluaciones": []})
+        respuesta, cuerpo = self._get("/history/sprints")
+        self.assertEqual(json.loads(cuerpo), {"sprints": []})
+        self.assertFalse(os.path.exists(self.ruta))
+
+    def test_lee_el_historial_existente(self):
+        historial = HistorialEvaluaciones(self.ruta)
+        historial.registrar_ejecucion({"organizacion": "Org", "proyecto": "P", "sprint": "S1"},
+                                      [{"id": 1, "evaluacion_invest": {"I": {"puntaje": 4}}}])
+        historial.cerrar()
+        respuesta, cuerpo = self._get("/history?historia=1&proyecto=P")
+        self.assertEqual(respuesta.status, 200)
+        self.assertEqual([e["invest"] for e in json.loads(cuerpo)["evaluaciones"]], [4.0])
+        _, cuerpo = self._get("/history/sprints")
+        self.assertEqual([s["sprint"] for s in json.loads(cuerpo)["sprints"]], ["S1"])
+
+    def test_parametros_no_validos(self):
+        HistorialEvaluaciones(self.ruta).cerrar()
+        for ruta in ("/history", "/history?historia=abc", "/history/sprints?desde=mayo"):
+            with self.subTest(ruta=ruta):
+                respuesta, _ = self._get(ruta)
+                self.assertEqual(respuesta.status, 400)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+from unittest import mock
+
+from src.logic import similitud
+from src.logic.similitud import agrupar_similares, expandir_evaluaciones
+
+def _historia(wid, titulo, descripcion):
+    return {"id": wid, "titulo": titulo, "descripcion": descripcion, "aceptacion_criterios": ""}
+
+PLANTILLA = ("Como analista quiero exportar el reporte mensual a PDF con filtros por fecha y proyecto "
+             "para compartirlo con la gerencia cada fin de mes")
+
+class AgruparSimilaresTest(unittest.TestCase):
+    def setUp(self):
+        self.historias = [_historia(i, f"Exportar reporte {i}", PLANTILLA) for i in range(1, 5)]
+        self.historias.append(_historia(99, "Login con SSO", "Autenticación con el directorio corporativo"))
+
+    def test_agrupa_casi_duplicados_con_el_primero(self):
+        representantes, duplicados = agrupar_similares(self.historias, 0.9)
+        self.assertEqual([h["id"] for h in representantes], [1, 99])
+        self.assertEqual(duplicados, {2: 1, 3: 1, 4: 1})
+
+    def test_umbral_cero_desactiva(self):
+        representantes, duplicados = agrupar_similares(self.historias, 0)
+        self.assertEqual(len(representantes), len(self.historias))
+        self.assertEqual(duplicados, {})
+
+    def test_no_agrupa_historias_con_dependencias_distintas(self):
+        self.historias[1]["dependencias"] = {"depende_de": [99], "fan_in": 1, "fan_out": 0}
+        _, duplicados = agrupar_similares(self.historias, 0.9)
+        self.assertNotIn(2, duplicados)
+
+    def test_python_puro_da_los_mismos_grupos(self):
+        if similitud.np is None:
+            self.skipTest("NumPy no está instalado")
+        con_numpy = agrupar_similares(self.historias, 0.9)
+        with mock.patch.object(similitud, "np", None):
+            self.assertEqual(agrupar_similares(self.historias, 0.9), con_numpy)
+
+    def test_expandir_reutiliza_la_evaluacion_del_representante(self):
+        representantes, duplicados = agrupar_similares(self.historias, 0.9)
+        resultados = [{"id": h["id"], "titulo": h["titulo"], "complejidad": 2.5} for h in representantes]
+        expandidos = expandir_evaluaciones(self.historias, resultados, duplicados)
+        self.assertEqual([r["id"] for r in expandidos], [h["id"] for h in self.historias])
+        self.assertEqual(expandidos[2]["evaluacion_compartida_con"], 1)
+        self.assertEqual(expandidos[2]["titulo"], "Exportar reporte 3")
+        self.assertNotIn("evaluacion_compartida_con", expandidos[0])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+Pruebas de la sincronización incremental contra el Azure DevOps falso de benchmarks/.
+"""
+import io
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+from benchmarks.ado_falso import ITERACION, PROYECTO, iniciar_servidor
+from src.azure import api
+from src.azure.sync import obtener_historias_incremental
+
+class SincronizacionIncrementalTest(unittest.TestCase):
+    def setUp(self):
+        self.servidor = iniciar_servidor(historias=30)
+        self.addCleanup(self.servidor.server_close)
+        self.addCleanup(self.servidor.shutdown)
+        parche = mock.patch.object(api, "_URL_BASE", f"http://127.0.0.1:{self.servidor.server_port}")
+        parche.start()
+        self.addCleanup(parche.stop)
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        self.directorio = directorio.name
+
+    def _sincronizar(self, max_historias=30):
+        """Sincroniza y devuelve (historias, work items descargados en esta ejecución)."""
+        antes = self.servidor.contadores.get("workitemsbatch", 0)
+        with redirect_stdout(io.StringIO()) as salida:
+            historias = obtener_historias_incremental("OrgFalsa", PROYECTO, ITERACION, "pat-pruebas", "7.0",
+                                                      max_historias, directorio_estado=self.directorio)
+        descargadas = int(salida.getvalue().split("🔁 Sincronización incremental: ")[1].split()[0])
+        self.assertEqual(self.servidor.contadores.get("workitemsbatch", 0) > antes, descargadas > 0)
+        return historias, descargadas
+
+    def test_segunda_sincronizacion_sin_cambios_no_descarga_nada(self):
+        primera, descargadas = self._sincronizar()
+        self.assertEqual(descargadas, 30)
+        segunda, descargadas = self._sincronizar()
+        # Las historias con la fecha de la marca de agua no se vuelven a descargar.
+        self.assertEqual(descargadas, 0)
+        self.assertEqual(segunda, primera)
+
+    def test_solo_descarga_las_modificadas(self):
+        self._sincronizar()
+        self.servidor.cambios[7] = "2024-02-01T10:00:00Z"
+        self.servidor.cambios[9] = "2024-02-01T10:00:00Z"
+        historias, descargadas = self._sincronizar()
+        self.assertEqual(descargadas, 2)
+        self.assertEqual([h["id"] for h in historias], list(range(1, 31)))
+
+        # La nueva marca de agua es la de las dos editadas; tampoco se repiten.
+        _, descargadas = self._sincronizar()
+        self.assertEqual(descargadas, 0)
+
+        # Un cambio en el mismo instante que la marca de agua no se pierde.
+        self.servidor.cambios[3] = "2024-02-01T10:00:00Z"
+        _, descargadas = self._sincronizar()
+        self.assertEqual(descargadas, 1)
+
+    def test_historias_nuevas_en_la_iteracion_se_descargan(self):
+        historias, _ = self._sincronizar(max_historias=20)
+        self.assertEqual(len(historias), 20)
+        historias, descargadas = self._sincronizar(max_historias=25)
+        self.assertEqual(descargadas, 5)
+        self.assertEqual([h["id"] for h in historias], list(range(1, 26)))
+
+    def test_descarta_las_que_salen_de_la_iteracion(self):
+        self._sincronizar(max_historias=25)
+        historias, descargadas = self._sincronizar(max_historias=10)
+        self.assertEqual(descargadas, 0)
+        self.assertEqual([h["id"] for h in historias], list(range(1, 11)))
+
+if __name__ == "__main__":
+    unittest.main()
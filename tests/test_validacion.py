@@ -0,0 +1,67 @@
+import contextlib
+import copy
+import io
+import unittest
+
+from src.evaluation.gemini import CRITERIOS_INVEST, _combinar_resultados, _notificador
+from src.evaluation.validacion import evaluar_con_recuperacion, validar_evaluacion
+
+def _evaluacion(wid):
+    return {
+        "id": wid,
+        "titulo": f"HU {wid}",
+        "evaluacion_invest": {c: {"puntaje": 3, "justificacion": "ok"} for c in CRITERIOS_INVEST},
+        "complejidad": 2.5,
+        "posibles_mejoras": [],
+    }
+
+def _invalida(wid):
+    obj = _evaluacion(wid)
+    del obj["evaluacion_invest"]["Testeable"]
+    return obj
+
+class EvaluadorFalso:
+    """Evaluador con la misma firma que los reales: notifica cada objeto y devuelve los combinados."""
+    def __init__(self, respuestas):
+        self.respuestas = list(respuestas)
+        self.llamadas = []
+
+    def __call__(self, historias, *args, al_resultado=None, **kwargs):
+        self.llamadas.append([h["id"] for h in historias])
+        objetos = [copy.deepcopy(o) for o in self.respuestas.pop(0)]
+        notificar = _notificador(historias, al_resultado)
+        for obj in objetos:
+            notificar(obj)
+        return _combinar_resultados(historias, [objetos])
+
+class ValidacionTest(unittest.TestCase):
+    def test_validar_evaluacion(self):
+        self.assertEqual(validar_evaluacion(_evaluacion(1)), [])
+        self.assertIn("falta el criterio 'Testeable'", validar_evaluacion(_invalida(1)))
+
+    def _evaluar(self, evaluador, historias):
+        salida = io.StringIO()
+        recibidos = []
+        with contextlib.redirect_stdout(salida):
+            resultados = evaluar_con_recuperacion(evaluador, historias, al_resultado=recibidos.append, rondas=2)
+        return resultados, recibidos, salida.getvalue()
+
+    def test_un_objeto_invalido_se_cuenta_una_vez(self):
+        historias = [{"id": 1}, {"id": 2}]
+        evaluador = EvaluadorFalso([[_evaluacion(1), _invalida(2)], [_evaluacion(2)]])
+        resultados, recibidos, salida = self._evaluar(evaluador, historias)
+        self.assertEqual([r["id"] for r in resultados], [1, 2])
+        self.assertEqual(evaluador.llamadas, [[1, 2], [2]])
+        self.assertIn("Se descartaron 1 evaluaciones mal formadas", salida)
+        self.assertEqual(sorted(r["id"] for r in recibidos), [1, 2])
+
+    def test_valido_tras_invalido_del_mismo_id_no_requiere_recuperacion(self):
+        historias = [{"id": 1}]
+        evaluador = EvaluadorFalso([[_invalida(1), _evaluacion(1)]])
+        resultados, recibidos, _ = self._evaluar(evaluador, historias)
+        self.assertEqual(len(evaluador.llamadas), 1)
+        self.assertEqual(resultados, [_evaluacion(1)])
+        self.assertEqual(len(recibidos), 1)
+
+if __name__ == "__main__":
+    unittest.main()